@@ -0,0 +1,64 @@
+"""
+Measures the overhead that the DagsHubFilesystem hooks add to I/O on paths outside of the repository.
+
+Usage::
+
+    python benchmarks/bench_hooks_overhead.py --repo-url https://dagshub.com/<user>/<repo> [--project-root <dir>]
+
+The filesystem is created against a real repository, so the credentials have to be available.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+from dagshub.streaming import DagsHubFilesystem
+
+
+def bench(label, fn, number):
+    per_call = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"{label:<45} {per_call * 1e6:8.2f} us/call")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repo-url", required=True)
+    parser.add_argument("--project-root", default=None)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    project_root = args.project_root or tempfile.mkdtemp()
+    outside_file = os.path.join(os.path.dirname(os.__file__), "os.py")
+    outside_dir = os.path.dirname(outside_file)
+    fs = DagsHubFilesystem(project_root=project_root, repo_url=args.repo_url)
+
+    def run(label):
+        print(f"--- {label}")
+        return [
+            bench("open() + close() outside the repo", lambda: open(outside_file, "rb").close(), args.number),
+            bench("os.stat() outside the repo", lambda: os.stat(outside_file), args.number),
+            bench("os.listdir() outside the repo", lambda: os.listdir(outside_dir), args.number // 10),
+            bench("os.path.exists() of a missing path", lambda: os.path.exists("/nonexistent/file"), args.number),
+        ]
+
+    without_hooks = run("without hooks")
+    fs.install_hooks()
+    try:
+        with_hooks = run("with hooks")
+    finally:
+        fs.uninstall_hooks()
+
+    print("--- overhead added by the hooks")
+    for name, before, after in zip(["open", "stat", "listdir", "exists"], without_hooks, with_hooks):
+        print(f"{name:<45} {(after - before) * 1e6:8.2f} us/call")
+
+    print("--- path classification")
+    bench("_parse_path() outside the repo", lambda: fs._parse_path(outside_file), args.number)
+    in_repo = os.path.join(project_root, "data", "file.txt")
+    bench("_parse_path() inside the repo", lambda: fs._parse_path(in_repo), args.number)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
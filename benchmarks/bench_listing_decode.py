@@ -0,0 +1,97 @@
+"""
+Measures how long it takes to decode a content API listing, comparing dacite with the hand-written decoder,
+and how much overlapping the requests of storage listing pages with their parsing saves.
+
+Usage::
+
+    python benchmarks/bench_listing_decode.py [--entries 1000000] [--page-size 1000] [--page-latency 0.05]
+
+Doesn't need a DagsHub repository, the listing is generated and the requests are simulated with a sleep.
+"""
+import argparse
+import json
+import time
+
+import dacite
+
+from dagshub.common.api.responses import ContentAPIEntry, StorageContentAPIResult
+from dagshub.common.util import prefetching_pages
+
+
+def generate_listing(count):
+    return [
+        {
+            "path": f"s3/bucket/images/{i:08d}.png",
+            "type": "file",
+            "size": 1000 + i,
+            "hash": f"{i:032x}",
+            "versioning": "bucket",
+            "download_url": f"https://dagshub.com/api/v1/repos/user/repo/storage/raw/s3/bucket/images/{i:08d}.png",
+            "content_url": f"https://dagshub.com/api/v1/repos/user/repo/storage/content/s3/bucket/images/{i:08d}.png",
+        }
+        for i in range(count)
+    ]
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {elapsed:8.3f} s")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--page-latency", type=float, default=0.05, help="Simulated latency of a page request")
+    parser.add_argument("--skip-dacite", action="store_true", help="dacite takes a while on big listings")
+    args = parser.parse_args()
+
+    raw = generate_listing(args.entries)
+    print(f"--- decoding {args.entries} entries")
+    if not args.skip_dacite:
+        _, dacite_time = timed("dacite.from_dict", lambda: [dacite.from_dict(ContentAPIEntry, e) for e in raw])
+    _, fast_time = timed("ContentAPIEntry.list_from_dicts", lambda: ContentAPIEntry.list_from_dicts(raw))
+    if not args.skip_dacite:
+        print(f"speedup: {dacite_time / fast_time:.1f}x")
+
+    # Pages are served as JSON, like the API would, decoding the JSON is a part of the request
+    pages = [
+        json.dumps({"entries": raw[i : i + args.page_size], "next_token": str(i + args.page_size)})
+        for i in range(0, len(raw), args.page_size)
+    ]
+    last_token = str(len(pages) * args.page_size)
+
+    def fetch_page(token):
+        time.sleep(args.page_latency)
+        page = json.loads(pages[int(token or 0) // args.page_size])
+        if page["next_token"] == last_token:
+            page["next_token"] = None
+        return page
+
+    def serial():
+        entries, token = [], None
+        while True:
+            page = StorageContentAPIResult.from_dict(fetch_page(token))
+            entries += page.entries
+            token = page.next_token
+            if token is None:
+                return entries
+
+    def overlapped():
+        entries = []
+        for page in prefetching_pages(fetch_page, lambda p: p["next_token"]):
+            entries += StorageContentAPIResult.from_dict(page).entries
+        return entries
+
+    print(f"--- paging {len(pages)} pages of {args.page_size}, {args.page_latency * 1000:.0f}ms latency")
+    serial_entries, serial_time = timed("serial fetch + parse", serial)
+    overlapped_entries, overlapped_time = timed("overlapped fetch + parse", overlapped)
+    assert len(serial_entries) == len(overlapped_entries) == args.entries
+    print(f"speedup: {serial_time / overlapped_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ from dagshub.common.api.responses import (
     ContentAPIEntry,
     StorageContentAPIResult,
 )
-from dagshub.common.util import multi_urljoin
+from dagshub.common.util import multi_urljoin, prefetching_pages
 
 try:
     from functools import cached_property
@@ -137,7 +137,7 @@ class RepoAPI:
             logger.debug(res.content)
             raise RuntimeError(error_msg)
 
-        return [dacite.from_dict(StorageAPIEntry, storage_entry) for storage_entry in res.json()]
+        return [StorageAPIEntry.from_dict(storage_entry) for storage_entry in res.json()]
 
     def list_path(self, path: str, revision: Optional[str] = None, include_size: bool = False) -> List[ContentAPIEntry]:
         """
@@ -162,7 +162,7 @@ class RepoAPI:
         content = res.json()
         if type(content) == dict:
             content = [content]
-        return [dacite.from_dict(ContentAPIEntry, entry) for entry in content]
+        return ContentAPIEntry.list_from_dicts(content)
 
     def list_storage_path(self, path: str, include_size: bool = False) -> List[ContentAPIEntry]:
         """
@@ -176,10 +176,10 @@ class RepoAPI:
         params = {"include_size": include_size, "paging": True}
 
         url = self.storage_content_api_url(path)
-        has_next_page = True
 
-        def _get():
-            res = self._http_request("GET", url, params=params)
+        def _get(token: Optional[str]):
+            page_params = params if token is None else {**params, "from_token": token}
+            res = self._http_request("GET", url, params=page_params)
 
             if res.status_code == 404:
                 raise PathNotFoundError(f"Path {path} not found")
@@ -197,17 +197,12 @@ class RepoAPI:
                     ],
                     "next_token": None,
                 }
-            return dacite.from_dict(StorageContentAPIResult, content)
+            return content
 
         entries = []
-
-        while has_next_page:
-            has_next_page = False
-            resp = _get()
-            entries += resp.entries
-            if resp.next_token is not None:
-                has_next_page = True
-                params["from_token"] = resp.next_token
+        # The next page is requested while the current one is being parsed
+        for page in prefetching_pages(_get, lambda content: content.get("next_token")):
+            entries += StorageContentAPIResult.from_dict(page).entries
 
         return entries
 
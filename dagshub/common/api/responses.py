@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from pathlib import PurePosixPath
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List
 
 try:
     from functools import cached_property
@@ -88,9 +88,22 @@ class StorageAPIEntry:
     def path_in_mount(self) -> PurePosixPath:
         return PurePosixPath(".dagshub/storage") / self.protocol / self.name
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StorageAPIEntry":
+        """
+        Decodes an entry of the storage API response, see :func:`ContentAPIEntry.from_dict`
+        """
+        try:
+            return cls(data["name"], data["protocol"], data["list_path"])
+        except KeyError as e:
+            raise ValueError(f"Storage API entry is missing the field {e}") from None
+
 
 @dataclass
 class ContentAPIEntry:
+    # Listings of storage buckets can have millions of entries, slots keep them small
+    __slots__ = ("path", "type", "size", "hash", "versioning", "download_url", "content_url")
+
     path: str
     # Possible values: dir, file, storage
     type: str
@@ -101,8 +114,48 @@ class ContentAPIEntry:
     download_url: str
     content_url: Optional[str]  # TODO: remove Optional once content_url is exposed in API
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ContentAPIEntry":
+        """
+        Decodes an entry of the content API response.
+        Much faster than ``dacite.from_dict``, because it doesn't do any type checking
+        """
+        try:
+            return cls(
+                data["path"],
+                data["type"],
+                data["size"],
+                data["hash"],
+                data["versioning"],
+                data["download_url"],
+                data.get("content_url"),
+            )
+        except KeyError as e:
+            raise ValueError(f"Content API entry is missing the field {e}") from None
+
+    @classmethod
+    def list_from_dicts(cls, data: List[Dict[str, Any]], skip_storages: bool = False) -> List["ContentAPIEntry"]:
+        """
+        Decodes a content API listing
+
+        Args:
+            data: Entries of the listing
+            skip_storages: Don't include the entries of the connected storages
+        """
+        from_dict = cls.from_dict
+        if skip_storages:
+            return [from_dict(entry) for entry in data if entry.get("type") != "storage"]
+        return [from_dict(entry) for entry in data]
+
 
 @dataclass
 class StorageContentAPIResult:
     entries: List[ContentAPIEntry]
     next_token: Optional[str]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StorageContentAPIResult":
+        """
+        Decodes a page of the storage content API response, see :func:`ContentAPIEntry.from_dict`
+        """
+        return cls(ContentAPIEntry.list_from_dicts(data["entries"]), data.get("next_token"))
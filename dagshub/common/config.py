@@ -57,3 +57,30 @@ if download_threads > DEFAULT_DOWNLOAD_THREADS:
         f"Number of download threads was set to {download_threads}. "
         f"We recommend lowering the value if you get met with rate limits"
     )
+
+STREAMING_PERSISTENT_CACHE_KEY = "DAGSHUB_STREAMING_PERSISTENT_CACHE"
+streaming_persistent_cache = bool(os.environ.get(STREAMING_PERSISTENT_CACHE_KEY, False))
+
+STREAMING_CACHE_LOCATION_KEY = "DAGSHUB_STREAMING_CACHE_LOCATION"
+DEFAULT_STREAMING_CACHE_LOCATION = os.path.join(appdirs.user_cache_dir("dagshub"), "streaming")
+streaming_cache_location = os.environ.get(STREAMING_CACHE_LOCATION_KEY, DEFAULT_STREAMING_CACHE_LOCATION)
+
+STREAMING_STORAGE_LISTING_TTL_KEY = "DAGSHUB_STREAMING_STORAGE_LISTING_TTL"
+streaming_storage_listing_ttl = float(os.environ.get(STREAMING_STORAGE_LISTING_TTL_KEY, 0))
+
+STREAMING_MAX_CONNECTIONS_KEY = "DAGSHUB_STREAMING_MAX_CONNECTIONS"
+DEFAULT_STREAMING_MAX_CONNECTIONS = 32
+streaming_max_connections = int(os.environ.get(STREAMING_MAX_CONNECTIONS_KEY, DEFAULT_STREAMING_MAX_CONNECTIONS))
+
+STREAMING_OBJECT_STORE_KEY = "DAGSHUB_STREAMING_OBJECT_STORE"
+streaming_object_store = os.environ.get(STREAMING_OBJECT_STORE_KEY)
+
+STREAMING_BLOCK_CACHE_BYTES_KEY = "DAGSHUB_STREAMING_BLOCK_CACHE_BYTES"
+DEFAULT_STREAMING_BLOCK_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+streaming_block_cache_bytes = int(os.environ.get(STREAMING_BLOCK_CACHE_BYTES_KEY, DEFAULT_STREAMING_BLOCK_CACHE_BYTES))
+
+STREAMING_NEGATIVE_CACHE_TTL_KEY = "DAGSHUB_STREAMING_NEGATIVE_CACHE_TTL"
+DEFAULT_STREAMING_NEGATIVE_CACHE_TTL = 60
+streaming_negative_cache_ttl = float(
+    os.environ.get(STREAMING_NEGATIVE_CACHE_TTL_KEY, DEFAULT_STREAMING_NEGATIVE_CACHE_TTL)
+)
@@ -113,7 +113,7 @@ def enable_azure_container_downloader(account_url=None, client=None):
         blob_client = client.get_blob_client(container=bucket, blob=path)
         stream = io.BytesIO()
         blob_client.download_blob().readinto(stream)
-        return stream
+        return stream.getvalue()
 
     add_bucket_downloader("azure", get_fn)
 
@@ -153,7 +153,8 @@ def add_bucket_downloader(proto: Literal["gs", "s3", "azure"], func: BucketDownl
 
     Args:
         proto: Protocol for which you're adding the downloader.\
-            This function will handle **all** download requests to this protocol.
+            This function will handle **all** download requests to this protocol,\
+            including the files of connected storages read through the streaming filesystem.
         func: Function that receives the name of the bucket and the path to the object and returns the object content\
             in ``bytes``.
 
@@ -165,6 +166,14 @@ def add_bucket_downloader(proto: Literal["gs", "s3", "azure"], func: BucketDownl
     _bucket_downloader_map[proto] = func
 
 
+def get_bucket_downloader(proto: str) -> Optional[BucketDownloaderFuncType]:
+    """
+    Returns the downloader function added for the protocol with :func:`add_bucket_downloader`,
+    or None if there isn't one.
+    """
+    return _bucket_downloader_map.get(proto)
+
+
 def _download_wrapper(url: str, location: Path, skip_if_exists: bool):
     if skip_if_exists and os.path.exists(location):
         return
@@ -179,7 +188,7 @@ def _download_wrapper(url: str, location: Path, skip_if_exists: bool):
     else:
         # Bucket path - try to look if there's a custom downloader
         proto, bucket_name, bucket_path = bucket_tuple
-        bucket_downloader = _bucket_downloader_map.get(proto)
+        bucket_downloader = get_bucket_downloader(proto)
         if bucket_downloader is None:
             content = _default_downloader(url)
         else:
@@ -1,16 +1,49 @@
 import types
 import logging
 import importlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional, TypeVar
 from urllib.parse import urljoin, quote
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 def multi_urljoin(*parts):
     """Shoutout to https://stackoverflow.com/a/55722792"""
     return urljoin(parts[0] + "/", "/".join(quote(part.strip("/"), safe="/") for part in parts[1:]))
 
 
+def prefetching_pages(
+    fetch_page: Callable[[Optional[str]], T], next_token: Callable[[T], Optional[str]]
+) -> Iterator[T]:
+    """
+    Iterates over the pages of a token-paginated API.
+    While the caller processes a page, the next one is already being fetched in the background.
+
+    Args:
+        fetch_page: Function that gets the page for a token. The first page is fetched with ``None``
+        next_token: Function that returns the token of the page after this one, or ``None`` if it's the last one
+    """
+    page = fetch_page(None)
+    executor: Optional[ThreadPoolExecutor] = None
+    try:
+        while True:
+            token = next_token(page)
+            if token is None:
+                yield page
+                return
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dagshub-paging")
+            future = executor.submit(fetch_page, token)
+            yield page
+            page = future.result()
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
 def lazy_load(module_name, source_package=None, callback=None):
     if source_package is None:
         # TODO: need to have a map for commonly used imports here. Also handle dots
@@ -1,4 +1,5 @@
 from .filesystem import DagsHubFilesystem, install_hooks, uninstall_hooks
+from .async_filesystem import AsyncDagsHubFilesystem
 
 try:
     from .mount import mount
@@ -15,4 +16,10 @@ except OSError as e:
         print(error)
 
 
-__all__ = [DagsHubFilesystem.__name__, install_hooks.__name__, mount.__name__, uninstall_hooks.__name__]
+__all__ = [
+    DagsHubFilesystem.__name__,
+    AsyncDagsHubFilesystem.__name__,
+    install_hooks.__name__,
+    mount.__name__,
+    uninstall_hooks.__name__,
+]
@@ -0,0 +1,405 @@
+import asyncio
+import io
+import logging
+import os
+from contextlib import asynccontextmanager
+from os import PathLike
+from pathlib import Path, PurePosixPath
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Tuple, TypeVar, Union
+
+import httpx
+from httpx import Response
+from tenacity import retry, retry_if_result, stop_after_attempt, wait_exponential, before_sleep_log
+
+from dagshub.common import config
+from dagshub.common.api.responses import ContentAPIEntry
+from dagshub.streaming.dataclasses import DagshubPath, PrefetchResult
+from dagshub.streaming.filesystem import (
+    DagsHubFilesystem,
+    DOWNLOAD_CHUNK_SIZE,
+    SPECIAL_FILES,
+    _create_download_temp_file,
+    _is_server_error,
+    dagshub_stat_result,
+)
+from dagshub.streaming.object_store import ContentHasher
+from dagshub.streaming.single_flight import AsyncSingleFlight
+
+T = TypeVar("T")
+logger = logging.getLogger(__name__)
+
+
+class AsyncDagsHubFilesystem:
+    """
+    asyncio interface to a :class:`~dagshub.streaming.DagsHubFilesystem`.
+
+    Requests are made with an ``httpx.AsyncClient``, so thousands of files can be fetched concurrently
+    on a single event loop, without a thread per request.
+    The caches (listings, missing paths, downloaded files, object store) and the path semantics
+    are shared with the wrapped filesystem, so sync and async calls can be mixed freely.
+
+    Only reading is async. Files are downloaded in full, and :func:`aopen` returns a regular file object.
+    Use the wrapped filesystem (``afs.fs``) for writing.
+    Blocking work of the wrapped filesystem (resolving the authentication, the persistent listing cache,
+    linking files from and adding them to the object store, bucket downloads) runs in the default executor
+    of the loop.
+
+    Args:
+        fs: Filesystem to wrap. If None, a new one is created with ``kwargs``.
+            Creating the filesystem makes blocking requests, create it in a thread if that matters.
+        max_concurrency: Maximum number of requests running at once. Defaults to the ``max_connections``
+            of the filesystem.
+        kwargs: Arguments for the :class:`~dagshub.streaming.DagsHubFilesystem` constructor.
+
+    Example::
+
+        afs = AsyncDagsHubFilesystem(project_root="repo", repo_url="https://dagshub.com/user/repo")
+        async with afs:
+            results = await afs.aprefetch(await afs.alistdir("data/images"))
+            with await afs.aopen("data/labels.csv") as f:
+                labels = f.read()
+    """
+
+    def __init__(self, fs: Optional[DagsHubFilesystem] = None, max_concurrency: Optional[int] = None, **kwargs):
+        if fs is None:
+            fs = DagsHubFilesystem(**kwargs)
+        self.fs = fs
+        self.max_concurrency = max_concurrency or fs.max_connections
+
+        # asyncio objects are bound to the event loop they were created on, so they're recreated on a new loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_closer: Optional[AsyncIterator[None]] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._listing_flight: AsyncSingleFlight[Optional[List[ContentAPIEntry]]] = AsyncSingleFlight()
+        self._download_flight: AsyncSingleFlight[Response] = AsyncSingleFlight()
+
+    def _ensure_loop_state(self):
+        loop = asyncio.get_event_loop()
+        if loop is self._loop:
+            return
+        old_loop, old_client = self._loop, self._client
+        if old_client is not None and not old_loop.is_closed() and not old_loop.is_running():
+            old_loop.run_until_complete(old_client.aclose())
+        self._loop = loop
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        self._client = httpx.AsyncClient(
+            limits=limits,
+            http2=self.fs.http2,
+            timeout=self.fs.timeout,
+            follow_redirects=True,
+            headers=config.requests_headers,
+        )
+        # A client can't be closed once its loop is closed. Loops run by asyncio.run() close their async generators
+        # before closing, so the client gets closed by this generator then
+        self._client_closer = self._close_on_loop_shutdown(self._client)
+        asyncio.ensure_future(self._client_closer.asend(None))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._listing_flight = AsyncSingleFlight()
+        self._download_flight = AsyncSingleFlight()
+
+    @staticmethod
+    async def _close_on_loop_shutdown(client: httpx.AsyncClient) -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            await client.aclose()
+
+    async def _run_blocking(self, fn: Callable[..., T], *args) -> T:
+        return await asyncio.get_event_loop().run_in_executor(None, fn, *args)
+
+    async def _aauth(self):
+        # Resolving the authentication can run "git credential" or ask for OAuth, only the first time
+        if self.fs._auth_resolved:
+            return self.fs._auth
+        return await self._run_blocking(lambda: self.fs.auth)
+
+    async def _acheck_listdir_cache(
+        self, str_path: str, include_size: bool
+    ) -> Tuple[Optional[List[ContentAPIEntry]], bool]:
+        cached, hit = self.fs._check_memory_listdir_cache(str_path, include_size)
+        if hit or self.fs._persistent_listing_cache is None:
+            return cached, hit
+        return await self._run_blocking(self.fs._check_listdir_cache, str_path, include_size)
+
+    async def aclose(self):
+        """
+        Closes the HTTP client. The wrapped filesystem stays usable
+        """
+        if self._client is not None and self._loop is asyncio.get_event_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def alistdir(self, path: Union[str, PathLike] = ".") -> List[str]:
+        """
+        Async version of ``os.listdir()``, lists both the local and the remote contents of the directory
+        """
+        parsed_path = self.fs._parse_path(path)
+        if not parsed_path.is_in_repo:
+            return self.fs._DagsHubFilesystem__listdir(path)
+        if parsed_path.is_passthrough_path:
+            return self.fs._DagsHubFilesystem__listdir(parsed_path.absolute_path)
+        dircontents = set()
+        error = None
+        try:
+            dircontents.update(self.fs._DagsHubFilesystem__listdir(parsed_path.absolute_path))
+        except FileNotFoundError as e:
+            error = e
+        dircontents.update(
+            special.name
+            for special in self.fs._get_special_paths(parsed_path, self.fs.project_root_dagshub_path, False)
+        )
+        # .dagshub/storage/<proto> folders are virtual, there's nothing to list on the API
+        len_parts = len(parsed_path.relative_path.parts)
+        if 0 < len_parts <= 3 and parsed_path.relative_path.parts[0] == ".dagshub":
+            return list(dircontents)
+        resp = await self._aapi_listdir(parsed_path)
+        if resp is None:
+            if error is not None:
+                raise error
+            return list(dircontents)
+        dircontents.update(PurePosixPath(f.path).name for f in resp)
+        self.fs._update_remote_tree(parsed_path, resp)
+        return list(dircontents)
+
+    async def astat(self, path: Union[str, PathLike]):
+        """
+        Async version of ``os.stat()``.
+
+        Sizes of remote files come from the sized listing of their directory, the files aren't downloaded.
+        Accessing other fields of the result downloads the file synchronously,
+        same as with :func:`DagsHubFilesystem.stat`.
+        """
+        parsed_path = self.fs._parse_path(path)
+        if not parsed_path.is_in_repo:
+            return self.fs._DagsHubFilesystem__stat(path)
+        if parsed_path.is_passthrough_path:
+            return self.fs._DagsHubFilesystem__stat(parsed_path.absolute_path)
+        if parsed_path.relative_path in SPECIAL_FILES:
+            return dagshub_stat_result(
+                self.fs, path, is_directory=False, custom_size=len(self.fs._special_file_content(parsed_path))
+            )
+        try:
+            return self.fs._DagsHubFilesystem__stat(parsed_path.absolute_path)
+        except FileNotFoundError as err:
+            parent = self.fs._parse_path(parsed_path.absolute_path.parent)
+            listing = await self._aapi_listdir(parent, include_size=True)
+            if listing is None:
+                raise err
+            self.fs._update_remote_tree(parent, listing)
+            entry = self.fs._listing_entry(parent.relative_path.as_posix(), listing, parsed_path.name)
+            if entry is None:
+                raise err
+            if entry.type == "dir":
+                self.fs._mkdirs(parsed_path.absolute_path)
+                return self.fs._DagsHubFilesystem__stat(parsed_path.absolute_path)
+            return dagshub_stat_result(
+                self.fs, path, is_directory=False, custom_size=entry.size, remote_path=parsed_path
+            )
+
+    async def aopen(
+        self,
+        path: Union[str, PathLike],
+        mode: str = "r",
+        buffering: int = -1,
+        encoding: Optional[str] = None,
+        errors: Optional[str] = None,
+        newline: Optional[str] = None,
+    ):
+        """
+        Downloads the file if it's not on disk yet, and opens it for reading.
+
+        Only reading modes are supported, use the wrapped filesystem (``afs.fs.open()``) for writing.
+
+        Returns:
+            A regular file object. Reading from it doesn't block on the network, the file is already local.
+        """
+        if "w" in mode or "a" in mode or "x" in mode or "+" in mode:
+            raise ValueError(f"aopen() only supports reading, got mode {mode}")
+        parsed_path = self.fs._parse_path(path)
+        if not parsed_path.is_in_repo:
+            return self.fs._DagsHubFilesystem__open(path, mode, buffering, encoding, errors, newline)
+        if parsed_path.relative_path in SPECIAL_FILES:
+            return io.BytesIO(self.fs._special_file_content(parsed_path))
+        if not parsed_path.is_passthrough_path and not self._exists_locally(parsed_path):
+            resp = await self._adownload_file(parsed_path)
+            if resp.status_code == 404:
+                raise FileNotFoundError(f"Error finding {parsed_path.relative_path} in repo or on DagsHub")
+            elif resp.status_code >= 400:
+                raise RuntimeError(
+                    f"Got response code {resp.status_code} from DagsHub while downloading file"
+                    f" {parsed_path.relative_path}"
+                )
+        else:
+            self.fs.local_cache.on_access(parsed_path.absolute_path)
+        return self.fs._DagsHubFilesystem__open(parsed_path.absolute_path, mode, buffering, encoding, errors, newline)
+
+    async def aprefetch(
+        self,
+        paths: Iterable[Union[str, PathLike]],
+        on_progress: Optional[Callable[[PrefetchResult], None]] = None,
+    ) -> List[PrefetchResult]:
+        """
+        Downloads multiple files concurrently, async version of :func:`DagsHubFilesystem.prefetch`.
+
+        The number of concurrent downloads is limited by ``max_concurrency``.
+        Errors are not raised, they are recorded in the ``error`` field of the results instead.
+        """
+
+        async def prefetch_one(p) -> PrefetchResult:
+            parsed_path = self.fs._parse_path(p)
+            result = PrefetchResult(path=p, local_path=parsed_path.absolute_path if parsed_path.is_in_repo else None)
+            try:
+                if not parsed_path.is_in_repo or parsed_path.is_passthrough_path:
+                    raise ValueError(f"Path {p} can't be prefetched, it is not a file in the repository")
+                if not self._exists_locally(parsed_path):
+                    resp = await self._adownload_file(parsed_path)
+                    if resp.status_code == 404:
+                        raise FileNotFoundError(f"Error finding {parsed_path.relative_path} in repo or on DagsHub")
+                    elif resp.status_code >= 400:
+                        raise RuntimeError(
+                            f"Got response code {resp.status_code} from DagsHub while downloading file"
+                            f" {parsed_path.relative_path}"
+                        )
+                    result.downloaded = True
+            except Exception as e:
+                result.error = e
+            if on_progress is not None:
+                on_progress(result)
+            return result
+
+        return list(await asyncio.gather(*(prefetch_one(p) for p in paths)))
+
+    def _exists_locally(self, path: DagshubPath) -> bool:
+        try:
+            self.fs._DagsHubFilesystem__stat(path.absolute_path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def _aget(self, url: str, **kwargs) -> Response:
+        self._ensure_loop_state()
+        async with self._semaphore:
+            resp = await self._client.get(url, auth=await self._aauth(), **kwargs)
+            if resp.status_code == 401:
+                logger.debug(f"Got 401 while accessing {url}, resolving the authentication again")
+                self.fs._invalidate_auth()
+                resp = await self._client.get(url, auth=await self._aauth(), **kwargs)
+        return resp
+
+    @asynccontextmanager
+    async def _astream(self, url: str, **kwargs) -> AsyncIterator[Response]:
+        self._ensure_loop_state()
+        async with self._semaphore:
+            async with self._client.stream("GET", url, auth=await self._aauth(), **kwargs) as resp:
+                if resp.status_code != 401:
+                    yield resp
+                    return
+            logger.debug(f"Got 401 while accessing {url}, resolving the authentication again")
+            self.fs._invalidate_auth()
+            async with self._client.stream("GET", url, auth=await self._aauth(), **kwargs) as resp:
+                yield resp
+
+    async def _aapi_listdir(self, path: DagshubPath, include_size: bool = False) -> Optional[List[ContentAPIEntry]]:
+        fs = self.fs
+        str_path = path.relative_path.as_posix()
+        response, hit = await self._acheck_listdir_cache(str_path, include_size)
+        if hit:
+            fs._stats.incr("listing_cache_hits")
+            return response
+        if fs._negative_cache.is_missing(fs._current_revision, PurePosixPath(path.relative_path)):
+            return None
+        fs._stats.incr("listing_cache_misses")
+
+        async def list_dir() -> Optional[List[ContentAPIEntry]]:
+            cached, cache_hit = await self._acheck_listdir_cache(str_path, include_size)
+            if cache_hit:
+                return cached
+            with fs._stats.track("listing"):
+                params = fs._listing_params(path, include_size)
+                url = fs._content_url_for_path(path)
+                resp = await self._aget(url, params=params, headers=config.requests_headers)
+                # Remembers missing paths in the persistent cache
+                if not await self._run_blocking(fs._check_listing_response, path, resp):
+                    return None
+                res, next_token = fs._parse_listing(path, resp.json())
+                while next_token is not None:
+                    params["from_token"] = next_token
+                    resp = await self._aget(url, params=params, headers=config.requests_headers)
+                    if not await self._run_blocking(fs._check_listing_response, path, resp):
+                        return None
+                    page, next_token = fs._parse_listing(path, resp.json())
+                    res += page
+                # Writes to the persistent cache
+                await self._run_blocking(fs._store_listing, path, res, include_size)
+                return res
+
+        self._ensure_loop_state()
+        return await self._listing_flight.do((str_path, include_size), list_dir)
+
+    async def _adownload_file(self, path: DagshubPath) -> Response:
+        fs = self.fs
+        if fs._negative_cache.is_missing(fs._current_revision, PurePosixPath(path.relative_path)):
+            return Response(404)
+
+        async def download() -> Response:
+            # The file might have been downloaded by a call that finished right before this one started
+            if fs.local_cache.is_tracked(path.absolute_path) and self._exists_locally(path):
+                return Response(200)
+            resp = await self._aapi_download_file(path)
+            if resp.status_code == 404:
+                fs._negative_cache.add(fs._current_revision, PurePosixPath(path.relative_path))
+            return resp
+
+        self._ensure_loop_state()
+        return await self._download_flight.do(path.absolute_path, download)
+
+    @retry(
+        retry=retry_if_result(_is_server_error),
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+    )
+    async def _aapi_download_file(self, path: DagshubPath) -> Response:
+        fs = self.fs
+        # Looking up the key can read the persistent listing cache
+        object_key = await self._run_blocking(fs._object_key, path)
+        if object_key is not None and await self._run_blocking(fs._link_from_object_store, path, object_key):
+            return Response(200)
+        # Bucket clients are blocking, so they run in a thread
+        if fs._bucket_object(path) is not None:
+            if await self._run_blocking(fs._download_from_bucket, path, object_key):
+                return Response(200)
+        url = fs._raw_url_for_path(path)
+        with fs._stats.track("download"):
+            async with self._astream(url, headers=config.requests_headers, timeout=None) as resp:
+                if resp.status_code < 400:
+                    hasher = ContentHasher(object_key) if object_key is not None else None
+                    await self._awrite_file_atomically(fs._download_destination(path), resp, hasher)
+                    # Verifying git blob hashes reads the whole file again
+                    await self._run_blocking(fs._finish_download, path, object_key, hasher)
+        return resp
+
+    async def _awrite_file_atomically(self, destination: Path, resp: Response, hasher: Optional[ContentHasher]):
+        tmp_path, fd = _create_download_temp_file(destination)
+        try:
+            with os.fdopen(fd, "wb") as output:
+                async for chunk in resp.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    self.fs._stats.incr("bytes_downloaded", len(chunk))
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    output.write(chunk)
+            os.replace(tmp_path, destination)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,309 @@
+import hashlib
+import logging
+import os
+import secrets
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple, TYPE_CHECKING, Union
+
+from dagshub.streaming.dataclasses import DagshubPath
+from dagshub.streaming.range_file import (
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_READAHEAD_BLOCKS,
+    RangesNotSupported,
+    fetch_range,
+)
+
+if TYPE_CHECKING:
+    from dagshub.streaming.filesystem import DagsHubFilesystem
+
+logger = logging.getLogger(__name__)
+
+
+class _BlockEvicted(Exception):
+    pass
+
+
+class BlockCache:
+    """
+    On-disk cache of blocks of remote files, bounded in size.
+    Once the blocks take up more than ``max_bytes``, the least recently used ones get deleted.
+
+    Every cache gets its own directory inside of ``location``, which is deleted on :func:`close`.
+
+    Args:
+        location: Directory in which the blocks are stored
+        max_bytes: Budget in bytes for the stored blocks
+    """
+
+    def __init__(self, location: Union[str, "os.PathLike[str]"], max_bytes: int):
+        self.location = Path(location) / f"blocks-{os.getpid()}-{secrets.token_hex(4)}"
+        self.max_bytes = max_bytes
+        # Key: (file key, block index), value: size of the block
+        self._blocks: "OrderedDict[Tuple[str, int], int]" = OrderedDict()
+        # Key: file key, value: number of its blocks in the cache
+        self._block_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "blocks": len(self._blocks),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _block_path(self, key: str, index: int) -> Path:
+        return self.location / key / str(index)
+
+    def num_blocks(self, key: str) -> int:
+        """
+        Number of blocks of the file that are in the cache
+        """
+        with self._lock:
+            return self._block_counts.get(key, 0)
+
+    def get(self, key: str, index: int) -> Optional[bytes]:
+        with self._lock:
+            if (key, index) not in self._blocks:
+                self.misses += 1
+                return None
+            self._blocks.move_to_end((key, index))
+        try:
+            with open(self._block_path(key, index), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            # Got evicted in the meantime
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, index: int, data: bytes):
+        block_path = self._block_path(key, index)
+        os.makedirs(block_path.parent, exist_ok=True)
+        tmp_path = block_path.with_name(f"{index}.{secrets.token_hex(4)}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, block_path)
+        with self._lock:
+            old_size = self._blocks.pop((key, index), None)
+            if old_size is not None:
+                self.total_bytes -= old_size
+            else:
+                self._block_counts[key] = self._block_counts.get(key, 0) + 1
+            self._blocks[(key, index)] = len(data)
+            self.total_bytes += len(data)
+            self._evict()
+
+    def remove(self, key: str):
+        """
+        Deletes all the blocks of the file
+        """
+        with self._lock:
+            for block in [b for b in self._blocks if b[0] == key]:
+                self.total_bytes -= self._blocks.pop(block)
+            self._block_counts.pop(key, None)
+        shutil.rmtree(self.location / key, ignore_errors=True)
+
+    def close(self):
+        with self._lock:
+            self._blocks.clear()
+            self._block_counts.clear()
+            self.total_bytes = 0
+        shutil.rmtree(self.location, ignore_errors=True)
+
+    def _evict(self):
+        # Never evict the most recent block, even if it alone is bigger than the budget
+        while self.total_bytes > self.max_bytes and len(self._blocks) > 1:
+            (key, index), size = self._blocks.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            self._block_counts[key] -= 1
+            if self._block_counts[key] == 0:
+                del self._block_counts[key]
+            try:
+                os.remove(self._block_path(key, index))
+            except OSError:
+                pass
+
+
+class BlockCachedFile:
+    """
+    Remote file that is fetched block by block with HTTP range requests, as it's being read.
+    Fetched blocks are kept in a :class:`BlockCache`.
+    When reads are sequential, ``readahead_blocks`` additional blocks are fetched in the same request.
+
+    Once all the blocks of the file were fetched, the file gets assembled in the project root from the cached blocks,
+    and all further reads go to the local file.
+    If some of the blocks were evicted by then (the file is bigger than the cache), the file stays in blocks.
+    If the server doesn't support range requests, the whole file is downloaded right away.
+
+    Reads are thread-safe and positional, the object can be shared by all the handles of the file.
+
+    Args:
+        fs: Filesystem to which the file belongs
+        path: Path of the file
+        cache: Cache for the blocks
+        block_size: Size of the fetched blocks
+        readahead_blocks: How many blocks to fetch in advance when reading sequentially
+    """
+
+    def __init__(
+        self,
+        fs: "DagsHubFilesystem",
+        path: DagshubPath,
+        cache: BlockCache,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        readahead_blocks: int = DEFAULT_READAHEAD_BLOCKS,
+    ):
+        self._fs = fs
+        self._path = path
+        self._cache = cache
+        self._url = fs._raw_url_for_path(path)
+        self.block_size = block_size
+        self.readahead_blocks = readahead_blocks
+
+        str_path = path.relative_path.as_posix()
+        revision = fs._shared_cache_revision(str_path)
+        self._key = hashlib.sha256(f"{fs._api.full_name}/{revision}/{str_path}".encode()).hexdigest()
+        self._lock = threading.Lock()
+        self._fetched: Set[int] = set()
+        self._last_block: Optional[int] = None
+        self._local_fd: Optional[int] = None
+        # Set once the file can't be assembled from the cache anymore
+        self._can_materialize = True
+        self.size: Optional[int] = None
+
+        # Fetch the first block right away: gets the size of the file and checks that ranges are supported
+        with self._lock:
+            self._fetch_blocks(0, 0)
+            self._materialize_if_complete()
+
+    @property
+    def num_blocks(self) -> int:
+        return (self.size + self.block_size - 1) // self.block_size
+
+    @property
+    def is_local(self) -> bool:
+        """
+        Whether the file is in the project root already
+        """
+        return self._local_fd is not None
+
+    def read(self, size: int, offset: int) -> bytes:
+        if self._local_fd is not None:
+            return os.pread(self._local_fd, size, offset)
+        end = min(offset + size, self.size)
+        if offset >= end:
+            return b""
+        first_block = offset // self.block_size
+        last_block = (end - 1) // self.block_size
+
+        blocks = []
+        for index in range(first_block, last_block + 1):
+            data = self._cache.get(self._key, index)
+            if data is None:
+                with self._lock:
+                    if self._local_fd is not None:
+                        return os.pread(self._local_fd, size, offset)
+                    # Another reader might have fetched it while this one was waiting
+                    data = self._cache.get(self._key, index)
+                    if data is None:
+                        fetched = self._fetch_blocks(index, self._fetch_until(index, last_block))
+                        if self._local_fd is not None:
+                            return os.pread(self._local_fd, size, offset)
+                        data = fetched[index]
+            blocks.append(data)
+        self._last_block = last_block
+
+        if self._can_materialize and len(self._fetched) == self.num_blocks:
+            with self._lock:
+                self._materialize_if_complete()
+        start = offset - first_block * self.block_size
+        return b"".join(blocks)[start : start + end - offset]
+
+    def _fetch_until(self, first_block: int, last_block: int) -> int:
+        is_sequential = self._last_block is not None and first_block in (self._last_block, self._last_block + 1)
+        if is_sequential:
+            last_block += self.readahead_blocks
+        return min(last_block, self.num_blocks - 1)
+
+    def _fetch_blocks(self, first_block: int, last_block: int) -> Dict[int, bytes]:
+        start = first_block * self.block_size
+        end = (last_block + 1) * self.block_size
+        if self.size is not None:
+            end = min(end, self.size)
+        try:
+            data, size = fetch_range(self._fs, self._path, self._url, start, end)
+        except RangesNotSupported:
+            logger.debug(f"Server doesn't support range requests for {self._path.relative_path}, downloaded the file")
+            self._open_local()
+            return {}
+        if size is not None:
+            self.size = size
+        elif self.size is None:
+            self.size = len(data)
+        res = {}
+        for i in range(0, len(data), self.block_size):
+            index = first_block + i // self.block_size
+            block = data[i : i + self.block_size]
+            self._cache.put(self._key, index, block)
+            self._fetched.add(index)
+            res[index] = block
+        return res
+
+    def _materialize_if_complete(self):
+        """
+        Puts the file into the project root once all of its blocks were fetched. Has to be called with the lock held.
+
+        Only done if all the blocks are still in the cache, re-fetching evicted blocks here would block all
+        the readers of the file until the whole file is downloaded again.
+        """
+        if self._local_fd is not None or not self._can_materialize or len(self._fetched) < self.num_blocks:
+            return
+        if self._cache.num_blocks(self._key) < self.num_blocks:
+            logger.debug(f"{self._path.relative_path} doesn't fit into the block cache, not storing it")
+            self._can_materialize = False
+            return
+        logger.debug(f"All blocks of {self._path.relative_path} were read, storing the file")
+        try:
+            self._fs._store_downloaded_file(self._path, self._iter_blocks())
+        except _BlockEvicted:
+            logger.debug(f"Blocks of {self._path.relative_path} got evicted while storing it, not storing it")
+            self._can_materialize = False
+            return
+        self._open_local()
+        self._cache.remove(self._key)
+
+    def _iter_blocks(self) -> Iterator[bytes]:
+        for index in range(self.num_blocks):
+            data = self._cache.get(self._key, index)
+            if data is None:
+                # Evicted by reads of other files in the meantime
+                raise _BlockEvicted()
+            yield data
+
+    def _open_local(self):
+        self._local_fd = os.open(self._path.absolute_path, os.O_RDONLY)
+        self.size = os.fstat(self._local_fd).st_size
+
+    def close(self):
+        if self._local_fd is not None:
+            os.close(self._local_fd)
+            self._local_fd = None
+
+    def __repr__(self):
+        return f"<BlockCachedFile '{self._path.relative_path}' size={self.size}>"
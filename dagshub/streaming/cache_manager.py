@@ -0,0 +1,147 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedFile:
+    size: int
+    mtime_ns: int
+
+
+class LocalCacheManager:
+    """
+    Keeps track of the files that the filesystem downloaded into the project root, in order of their last access.
+
+    If ``max_bytes`` is set, the least recently used files get deleted once the downloaded files take up more space.
+    Only files that weren't modified since they were downloaded are deleted,
+    they are still listed from the remote and get downloaded again on the next ``open()``.
+    Files that were created locally or modified are never touched.
+
+    Args:
+        stat_fn: Unpatched ``os.stat`` function
+        max_bytes: Size budget for the downloaded files. If None, files are never deleted
+    """
+
+    def __init__(self, stat_fn: Callable[..., os.stat_result], max_bytes: Optional[int] = None):
+        self._stat = stat_fn
+        self.max_bytes = max_bytes
+        self._files: "OrderedDict[Path, CachedFile]" = OrderedDict()
+        self._pinned: Dict[Path, int] = {}
+        self._lock = threading.RLock()
+
+        self.total_bytes = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+            }
+
+    def is_tracked(self, path: Path) -> bool:
+        with self._lock:
+            return path in self._files
+
+    def tracked_files(self) -> List[Path]:
+        with self._lock:
+            return list(self._files.keys())
+
+    def get(self, path: Path) -> Optional[CachedFile]:
+        with self._lock:
+            return self._files.get(path)
+
+    def on_download(self, path: Path):
+        """
+        Records a freshly downloaded file, and evicts older files if the budget is exceeded
+        """
+        try:
+            st = self._stat(path)
+        except OSError:
+            return
+        with self._lock:
+            self.forget(path)
+            self._files[path] = CachedFile(size=st.st_size, mtime_ns=st.st_mtime_ns)
+            self.total_bytes += st.st_size
+            self._evict()
+
+    def on_access(self, path: Path):
+        with self._lock:
+            if path in self._files:
+                self._files.move_to_end(path)
+
+    def forget(self, path: Path):
+        """
+        Stops tracking the file, for example because it was deleted or changed
+        """
+        with self._lock:
+            entry = self._files.pop(path, None)
+            if entry is not None:
+                self.total_bytes -= entry.size
+
+    def is_unmodified(self, path: Path) -> bool:
+        """
+        Checks that the file on disk is still the same file that was downloaded
+        """
+        entry = self.get(path)
+        if entry is None:
+            return False
+        try:
+            st = self._stat(path)
+        except OSError:
+            return False
+        return st.st_size == entry.size and st.st_mtime_ns == entry.mtime_ns
+
+    @contextmanager
+    def pin(self, path: Path):
+        """
+        Prevents the file from being evicted inside the context
+        (e.g. between it getting downloaded and opened)
+        """
+        with self._lock:
+            self._pinned[path] = self._pinned.get(path, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pinned[path] -= 1
+                if self._pinned[path] == 0:
+                    del self._pinned[path]
+
+    def _evict(self):
+        if self.max_bytes is None or self.total_bytes <= self.max_bytes:
+            return
+        # Never evict the most recent file, even if it alone is bigger than the budget
+        candidates = list(self._files.keys())[:-1]
+        for path in candidates:
+            if self.total_bytes <= self.max_bytes:
+                break
+            if path in self._pinned:
+                continue
+            entry = self._files[path]
+            if not self.is_unmodified(path):
+                logger.debug(f"{path} was changed locally, it won't be evicted")
+                self.forget(path)
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.debug(f"Couldn't evict {path}: {e}")
+                continue
+            self.forget(path)
+            self.evictions += 1
+            self.evicted_bytes += entry.size
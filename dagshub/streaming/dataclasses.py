@@ -17,10 +17,12 @@ class DagshubPath:
 
     Attributes:
         fs (DagsHubFilesystem): Filesystem from which this path is assigned
-        absolute_path (Path): Absolute path in the system
+        absolute_path (Optional[Path]): Absolute path in the system
         relative_path (Optional[Path]): Path relative to the root of the encapsulating FileSystem.
                                         If None, path is outside the FS
-        original_path (Path): Original path as it was accessed by the user
+        original_path (Optional[Path]): Original path as it was accessed by the user
+
+    Paths that are recognized as being outside the FS without parsing them have all three of the paths set to None.
     """
 
     # TODO: this couples this class hard to the fs, need to decouple later
@@ -77,3 +79,25 @@ class DagshubPath:
             original_path=self.original_path / other,
             fs=self.fs,
         )
+
+
+@dataclass
+class PrefetchResult:
+    """
+    Result of prefetching a single file with :func:`DagsHubFilesystem.prefetch()`
+
+    Attributes:
+        path: Path as it was passed to the prefetch function
+        local_path (Optional[Path]): Where the file is stored on disk. None if the path is outside the repository
+        downloaded (bool): True if the file was downloaded, False if it already existed locally or the download failed
+        error (Optional[Exception]): Error that happened while downloading the file
+    """
+
+    path: Any
+    local_path: Optional[Path]
+    downloaded: bool = False
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
@@ -1,28 +1,45 @@
 import builtins
 import io
+import json
 import logging
 import os
 import re
+import secrets
 import subprocess
 import sys
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
 from configparser import ConfigParser
-from functools import wraps
+from contextlib import contextmanager
+from functools import wraps, lru_cache
 from multiprocessing import AuthenticationError
 from os import PathLike
 from pathlib import Path, PurePosixPath
-from typing import Optional, TypeVar, Union, Dict, Set, Tuple, List, Any
+from typing import Optional, TypeVar, Union, Dict, Set, Tuple, List, Any, Iterable, Iterator, Callable
 from urllib.parse import urlparse, ParseResult
 
-import dacite
+import httpx
 from httpx import Response
 from tenacity import retry, retry_if_result, stop_after_attempt, wait_exponential, before_sleep_log, RetryError
 
 from dagshub.common import config, is_inside_notebook, is_inside_colab
 from dagshub.common.api.repo import RepoAPI, CommitNotFoundError
 from dagshub.common.api.responses import ContentAPIEntry, StorageContentAPIResult
-from dagshub.common.helpers import http_request, get_project_root
-from dagshub.streaming.dataclasses import DagshubPath
+from dagshub.common.download import BucketDownloaderFuncType, get_bucket_downloader
+from dagshub.common.helpers import get_project_root
+from dagshub.common.util import prefetching_pages
+from dagshub.streaming.cache_manager import LocalCacheManager
+from dagshub.streaming.dataclasses import DagshubPath, PrefetchResult
 from dagshub.streaming.errors import FilesystemAlreadyMountedError
+from dagshub.streaming.listing_cache import PersistentListingCache
+from dagshub.streaming.negative_cache import NegativeLookupCache
+from dagshub.streaming.object_store import ContentAddressedStore, ContentHasher
+from dagshub.streaming.range_file import DagsHubRangeFile, DEFAULT_BLOCK_SIZE
+from dagshub.streaming.readahead import ReadAheadPolicy
+from dagshub.streaming.single_flight import SingleFlight
+from dagshub.streaming.stats import StreamingStats
 
 # Pre 3.11 - need to patch _NormalAccessor for _pathlib, because it pre-caches open and other functions.
 # In 3.11 _NormalAccessor was removed
@@ -68,6 +85,37 @@ class dagshub_ScandirIterator:
 
 
 SPECIAL_FILE = Path(".dagshub-streaming")
+# JSON with the counters and latencies from DagsHubFilesystem.stats()
+STATS_FILE = Path(".dagshub-streaming-stats")
+SPECIAL_FILES = (SPECIAL_FILE, STATS_FILE)
+
+# Files are downloaded in chunks of this size, so memory usage doesn't depend on the size of the file
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+PARSED_PATHS_CACHE_SIZE = 4096
+# Revision under which storage bucket listings are stored in the persistent cache
+STORAGE_CACHE_REVISION = "storage"
+
+if os.sep == "/" and os.altsep is None:
+
+    def _needs_normalization(path: str) -> bool:
+        # Plain substring checks, a regex is slower than the rest of the fast path combined
+        return "//" in path or "/./" in path or "/../" in path or path.endswith(("/.", "/.."))
+
+else:
+
+    def _needs_normalization(path: str) -> bool:
+        # Too many ways to spell the same path, always do the full parsing
+        return True
+
+
+def _create_download_temp_file(destination: Path) -> Tuple[Path, int]:
+    """
+    Creates a uniquely named temporary file next to the destination, returns its path and an open descriptor
+    """
+    tmp_path = destination.parent / f".{destination.name}.{secrets.token_hex(8)}.dagshub-download"
+    # os.open instead of tempfile, so the created file respects the umask
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    return tmp_path, fd
 
 
 def _is_server_error(resp: Response):
@@ -90,6 +138,36 @@ class DagsHubFilesystem:
     :param password: DagsHub password (as an alternative to using the token)
     :param timeout: Timeout in seconds for HTTP requests.
         Influences all requests except for file download, which has no timeout
+    :param persistent_cache: Store directory listings in an on-disk cache, shared between processes and runs.
+        Listings of a pinned commit are stored there permanently, so the cache never goes stale.
+        Missing paths are stored for ``negative_cache_ttl`` seconds, and storage bucket listings
+        for ``DAGSHUB_STREAMING_STORAGE_LISTING_TTL`` seconds (not stored by default).
+        Can be a path to the directory of the cache, for example to keep a separate cache per project.
+        If None, enabled by setting the ``DAGSHUB_STREAMING_PERSISTENT_CACHE`` environment variable
+    :param lazy_open: Opening a remote file for reading doesn't download it,
+        instead the returned file fetches the parts that are being read with HTTP range requests.
+        See :func:`open_lazy` for the caveats
+    :param max_connections: Maximum number of simultaneous connections to DagsHub.
+        Connections are kept alive and reused between listing and download requests.
+        If None, uses the ``DAGSHUB_STREAMING_MAX_CONNECTIONS`` environment variable (default 32)
+    :param http2: Use HTTP/2 for the requests. Requires the ``h2`` package (``pip install httpx[http2]``)
+    :param readahead: When files of a directory are being opened in sorted order,
+        download this many of the next files of the directory in the background.
+        Only works for directories that were already listed. 0 disables the read-ahead.
+        Statistics are available with ``fs.readahead.stats()``
+    :param max_cache_bytes: Budget in bytes for the files downloaded into the project root.
+        When the downloaded files take up more space, the least recently used ones that weren't modified are deleted.
+        They are downloaded again if opened later. If None, downloaded files are never deleted.
+        Only files downloaded by this filesystem object count towards the budget
+    :param object_store: Directory of a content-addressed store, shared between all filesystems on the machine.
+        Files with a known content hash (DVC md5 or git blob hash) are downloaded into the store once,
+        and hardlinked into the project root of every filesystem that needs them.
+        If None, uses the ``DAGSHUB_STREAMING_OBJECT_STORE`` environment variable. Disabled if that's not set
+    :param negative_cache_ttl: Number of seconds to remember that a path doesn't exist on the remote,
+        so checking it again doesn't make a request. 0 disables this.
+        If None, uses the ``DAGSHUB_STREAMING_NEGATIVE_CACHE_TTL`` environment variable (default: 60)
+    :param refresh_interval: Check for new commits on the branch every this many seconds in the background,
+        and :func:`refresh` the filesystem when there are. If None, the filesystem stays on the commit it started with
     """
 
     already_mounted_filesystems: Dict[Path, "DagsHubFilesystem"] = {}
@@ -104,6 +182,15 @@ class DagsHubFilesystem:
         password: Optional[str] = None,
         token: Optional[str] = None,
         timeout: Optional[int] = None,
+        persistent_cache: Optional[Union[bool, str, PathLike]] = None,
+        lazy_open: bool = False,
+        max_connections: Optional[int] = None,
+        http2: bool = False,
+        readahead: int = 0,
+        max_cache_bytes: Optional[int] = None,
+        object_store: Optional[Union[PathLike, str]] = None,
+        negative_cache_ttl: Optional[float] = None,
+        refresh_interval: Optional[float] = None,
     ):
         # Find root directory of Git project
         if not project_root:
@@ -129,6 +216,11 @@ class DagsHubFilesystem:
             else:
                 raise ValueError("No DagsHub git remote detected, please specify repo_url= argument or --repo_url flag")
 
+        self._project_root_str = str(self.project_root)
+        self._project_root_prefix = os.path.join(self._project_root_str, "")
+        self._parse_path_cached = lru_cache(maxsize=PARSED_PATHS_CACHE_SIZE)(self._parse_path_uncached)
+        self._outside_repo_path = DagshubPath(self, None, None, None)
+
         self.user_specified_branch = branch
         self.parsed_repo_url = urlparse(repo_url)
         # Key: path, value: dict of {name, type} on that path (in remote)
@@ -139,8 +231,48 @@ class DagsHubFilesystem:
         self.password = password or config.password
         self.token = token or config.token
         self.timeout = timeout or config.http_timeout
+        self._auth = None
+        self._auth_resolved = False
+        self._auth_lock = threading.Lock()
+        # Concurrent requests for the same file or directory are made only once, the other callers wait for them
+        self._download_flight: SingleFlight[Response] = SingleFlight()
+        self._listing_flight: SingleFlight[Optional[List[ContentAPIEntry]]] = SingleFlight()
+        # Guards the updates of the in-memory listing caches
+        self._cache_lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_poller: Optional[Tuple[threading.Thread, threading.Event]] = None
+        # Number of times the authentication had to be figured out
+        self.auth_resolutions = 0
+        self._stats = StreamingStats()
+        self.lazy_open = lazy_open
+        self.max_connections = max_connections or config.streaming_max_connections
+        self.http2 = http2
+        if self.http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requires the h2 package (pip install httpx[http2]), falling back to HTTP/1.1")
+                self.http2 = False
+        self.__http_client: Optional[httpx.Client] = None
+        self.__http_client_pid: Optional[int] = None
 
         self._listdir_cache: Dict[str, Optional[Tuple[List[ContentAPIEntry], bool]]] = {}
+        # Key: path, value: a cached listing of the path and its entries by name, see _listing_entry()
+        self._listing_indexes: Dict[str, Tuple[List[ContentAPIEntry], Dict[str, ContentAPIEntry]]] = {}
+        self.local_cache = LocalCacheManager(self.__stat, max_bytes=max_cache_bytes)
+        if negative_cache_ttl is None:
+            negative_cache_ttl = config.streaming_negative_cache_ttl
+        self._negative_cache = NegativeLookupCache(negative_cache_ttl)
+        object_store = object_store or config.streaming_object_store
+        self.object_store: Optional[ContentAddressedStore] = (
+            ContentAddressedStore(object_store) if object_store else None
+        )
+        if persistent_cache is None:
+            persistent_cache = config.streaming_persistent_cache
+        self._persistent_listing_cache: Optional[PersistentListingCache] = None
+        if persistent_cache:
+            cache_location = config.streaming_cache_location if persistent_cache is True else persistent_cache
+            self._persistent_listing_cache = PersistentListingCache(cache_location)
 
         self._api = self._generate_repo_api(self.parsed_repo_url)
 
@@ -154,6 +286,11 @@ class DagsHubFilesystem:
 
         self._storages = self._api.get_connected_storages()
 
+        self.readahead: Optional[ReadAheadPolicy] = ReadAheadPolicy(self, readahead) if readahead > 0 else None
+
+        if refresh_interval:
+            self.start_refresh_poller(refresh_interval)
+
     def _generate_repo_api(self, repo_url: ParseResult) -> RepoAPI:
         host = f"{repo_url.scheme}://{repo_url.netloc}"
         repo = repo_url.path
@@ -161,6 +298,12 @@ class DagsHubFilesystem:
 
     @cached_property
     def _current_revision(self) -> str:
+        """
+        Revision that the filesystem works with. It's resolved once, :func:`refresh` moves it to a newer commit
+        """
+        return self._resolve_revision()
+
+    def _resolve_revision(self) -> str:
         """
         Gets current revision on repo:
         - If User specified a branch, returns HEAD of that brunch on the remote
@@ -205,6 +348,211 @@ class DagsHubFilesystem:
 
         return self._api.last_commit_sha(branch)
 
+    def refresh(self) -> List[str]:
+        """
+        Moves the filesystem to the latest commit of the tracked branch, keeping everything that didn't change.
+
+        The listings of the old and the new commit are compared by their hashes, starting from the root,
+        so only the directories that changed get listed again.
+        Files that changed or were deleted on the remote are deleted from the project root,
+        if they were downloaded by this filesystem and weren't modified locally since.
+        They get downloaded from the new commit the next time they're opened.
+
+        Does nothing if the filesystem works with a specific commit instead of a branch.
+
+        Returns:
+            Paths, relative to the project root, of the files and directories that changed between the commits.
+            Only the parts of the tree that the filesystem has seen are compared.
+
+        Example::
+
+            fs = DagsHubFilesystem(branch="main")
+            ...
+            changed = fs.refresh()
+        """
+        with self._refresh_lock:
+            old_revision = self._current_revision
+            new_revision = self._resolve_revision()
+            if new_revision == old_revision:
+                return []
+            logger.debug(f"Refreshing the filesystem from {old_revision} to {new_revision}")
+
+            # Storage buckets aren't versioned, their listings don't depend on the revision
+            with self._cache_lock:
+                old_listings = {
+                    path: cached
+                    for path, cached in self._listdir_cache.items()
+                    if cached is not None and not path.startswith(".dagshub/storage")
+                }
+            downloaded: Dict[str, Path] = {}
+            for file in self.local_cache.tracked_files():
+                try:
+                    downloaded[file.relative_to(self.project_root).as_posix()] = file
+                except ValueError:
+                    continue
+            # Directories that have cached listings or downloaded files in them, and all of their parents
+            seen_dirs: Set[str] = set()
+            for path in [*old_listings, *(PurePosixPath(f).parent.as_posix() for f in downloaded)]:
+                if path.startswith(".dagshub/storage"):
+                    continue
+                seen_dirs.add(path)
+                seen_dirs.update(p.as_posix() for p in PurePosixPath(path).parents)
+
+            new_listings, changed = self._diff_revisions(old_revision, new_revision, old_listings, seen_dirs)
+
+            removed_dirs = [p for p in changed if p in seen_dirs and p not in new_listings]
+            with self._cache_lock:
+                self.__dict__["_current_revision"] = new_revision
+                for path in removed_dirs:
+                    for cached_path in [p for p in self._listdir_cache if p == path or p.startswith(path + "/")]:
+                        self._listdir_cache.pop(cached_path, None)
+                        self._listing_indexes.pop(cached_path, None)
+                        self.remote_tree.pop(str(Path(cached_path)), None)
+                for path, (entries, with_size) in new_listings.items():
+                    self._listdir_cache[path] = (entries, with_size)
+                    if str(Path(path)) in self.remote_tree:
+                        self.remote_tree[str(Path(path))] = {PurePosixPath(e.path).name: e.type for e in entries}
+                kept_listings = [
+                    (path, cached) for path, cached in self._listdir_cache.items()
+                    if cached is not None and not path.startswith(".dagshub/storage")
+                ]
+            self._negative_cache.clear()
+
+            # Directories that were walked are up to date now, the files and subtrees that changed under them aren't
+            for path in (p for p in changed if p not in new_listings):
+                for rel_path, file in downloaded.items():
+                    if rel_path == path or rel_path.startswith(path + "/"):
+                        self._discard_downloaded_file(file)
+
+            if self._persistent_listing_cache is not None:
+                for path, (entries, with_size) in kept_listings:
+                    self._persistent_listing_cache.put(self._api.full_name, new_revision, path, entries, with_size)
+
+            return changed
+
+    def _diff_revisions(
+        self,
+        old_revision: str,
+        new_revision: str,
+        old_listings: Dict[str, Tuple[List[ContentAPIEntry], bool]],
+        seen_dirs: Set[str],
+    ) -> Tuple[Dict[str, Tuple[List[ContentAPIEntry], bool]], List[str]]:
+        """
+        Walks down the seen directories, descending only into those whose hash changed between the revisions.
+        Returns the new listings of the walked directories and the paths that changed
+        """
+        new_listings: Dict[str, Tuple[List[ContentAPIEntry], bool]] = {}
+        changed: List[str] = []
+        if not seen_dirs:
+            return new_listings, changed
+        to_check = deque(["."])
+        while to_check:
+            dir_path = to_check.popleft()
+            with_size = old_listings[dir_path][1] if dir_path in old_listings else False
+            if dir_path in old_listings:
+                old_entries = old_listings[dir_path][0]
+            else:
+                old_entries = self._list_at_revision(dir_path, old_revision, with_size) or []
+            new_entries = self._list_at_revision(dir_path, new_revision, with_size) or []
+            new_listings[dir_path] = (new_entries, with_size)
+
+            old_by_name = {PurePosixPath(e.path).name: e for e in old_entries}
+            new_by_name = {PurePosixPath(e.path).name: e for e in new_entries}
+            for name in sorted(old_by_name.keys() | new_by_name.keys()):
+                old_entry, new_entry = old_by_name.get(name), new_by_name.get(name)
+                # No hash means there's nothing to compare, so it counts as changed
+                if (
+                    old_entry is not None
+                    and new_entry is not None
+                    and old_entry.type == new_entry.type
+                    and old_entry.hash
+                    and old_entry.hash == new_entry.hash
+                ):
+                    continue
+                child = name if dir_path == "." else f"{dir_path}/{name}"
+                changed.append(child)
+                is_dir_in_both = old_entry is not None and new_entry is not None and old_entry.type == new_entry.type
+                if is_dir_in_both and new_entry.type == "dir" and child in seen_dirs:
+                    to_check.append(child)
+        return new_listings, changed
+
+    def _list_at_revision(self, path: str, revision: str, include_size: bool) -> Optional[List[ContentAPIEntry]]:
+        """
+        Lists the directory at a specific revision, bypassing all caches. Returns None if it doesn't exist
+        """
+        params = {"include_size": "true"} if include_size else {}
+        url = self._api.content_api_url(path, revision)
+        resp = self.http_get(url, params=params, headers=config.requests_headers)
+        if resp.status_code == 404:
+            return None
+        elif resp.status_code >= 400:
+            raise RuntimeError(f"Got status code {resp.status_code} when listing {path} at revision {revision}")
+        body = resp.json()
+        if isinstance(body, dict):
+            return None
+        return ContentAPIEntry.list_from_dicts(body, skip_storages=True)
+
+    def _discard_downloaded_file(self, file: Path):
+        """
+        Deletes a downloaded file that's out of date, unless it was modified locally
+        """
+        if not self.local_cache.is_unmodified(file):
+            logger.warning(f"{file} changed on the remote, but it was modified locally, so it was kept")
+            self.local_cache.forget(file)
+            return
+        try:
+            os.remove(file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Couldn't delete the outdated file {file}: {e}")
+            return
+        self.local_cache.forget(file)
+
+    def start_refresh_poller(self, interval: float):
+        """
+        Calls :func:`refresh` every ``interval`` seconds in a background thread,
+        for long-running processes that should follow a branch.
+        Errors are logged, and the poller keeps running.
+
+        Args:
+            interval: Number of seconds between the checks for new commits
+        """
+        self.stop_refresh_poller()
+        stop = threading.Event()
+        # The thread doesn't keep the filesystem alive, so it still gets cleaned up once it's not used anymore
+        fs_ref = weakref.ref(self)
+
+        def poll():
+            while not stop.wait(interval):
+                fs = fs_ref()
+                if fs is None:
+                    return
+                try:
+                    changed = fs.refresh()
+                    if changed:
+                        logger.info(f"Refreshed to {fs._current_revision}, {len(changed)} paths changed")
+                except Exception as e:
+                    logger.warning(f"Couldn't refresh the filesystem: {e}")
+                del fs
+
+        thread = threading.Thread(target=poll, name="dagshub-refresh-poller", daemon=True)
+        self._refresh_poller = (thread, stop)
+        thread.start()
+
+    def stop_refresh_poller(self):
+        """
+        Stops the poller started by :func:`start_refresh_poller`
+        """
+        poller = getattr(self, "_refresh_poller", None)
+        if poller is None:
+            return
+        thread, stop = poller
+        stop.set()
+        if thread is not threading.current_thread():
+            thread.join()
+        self._refresh_poller = None
+
     def is_commit_on_remote(self, sha1):
         try:
             self._api.get_commit_info(sha1)
@@ -258,6 +606,23 @@ class DagsHubFilesystem:
 
     @property
     def auth(self):
+        """
+        Authentication used for the requests.
+        Resolved once and then reused, until a request gets rejected with a 401.
+        """
+        with self._auth_lock:
+            if not self._auth_resolved:
+                self._auth = self._resolve_auth()
+                self._auth_resolved = True
+                self.auth_resolutions += 1
+            return self._auth
+
+    def _invalidate_auth(self):
+        with self._auth_lock:
+            self._auth_resolved = False
+            self._auth = None
+
+    def _resolve_auth(self):
         import dagshub.auth
 
         if self.username is not None and self.password is not None:
@@ -269,7 +634,9 @@ class DagsHubFilesystem:
             logger.debug("Failed to perform OAuth in a non interactive shell")
 
         # Try to fetch credentials from the git credential file
-        proc = subprocess.run(["git", "credential", "fill"], input=f"url={self.repo_url}".encode(), capture_output=True)
+        proc = subprocess.run(
+            ["git", "credential", "fill"], input=f"url={self.parsed_repo_url.geturl()}".encode(), capture_output=True
+        )
         answer = {line[: line.index("=")]: line[line.index("=") + 1 :] for line in proc.stdout.decode().splitlines()}
         if "username" in answer and "password" in answer:
             return answer["username"], answer["password"]
@@ -303,14 +670,40 @@ class DagsHubFilesystem:
         # Remove from map of mounted filesystems
         if hasattr(self, "project_root") and self.project_root in DagsHubFilesystem.already_mounted_filesystems:
             DagsHubFilesystem.already_mounted_filesystems.pop(self.project_root)
+        # The client gets recreated if the filesystem is used again
+        if getattr(self, "readahead", None) is not None:
+            self.readahead.shutdown()
+        self.stop_refresh_poller()
+        client = getattr(self, "_DagsHubFilesystem__http_client", None)
+        if client is not None and self.__http_client_pid == os.getpid():
+            client.close()
+        self.__http_client = None
 
     def _parse_path(self, file: Union[str, PathLike, int]) -> DagshubPath:
-        orig_path = Path(file)
         if isinstance(file, int):
-            return DagshubPath(self, None, None, orig_path)
+            return DagshubPath(self, None, None, Path(file))
         if file == "":
-            return DagshubPath(self, None, None, orig_path)
-        abspath = Path(os.path.abspath(file))
+            return DagshubPath(self, None, None, Path(file))
+        str_path = file if isinstance(file, str) else os.fspath(file)
+        if os.path.isabs(str_path):
+            # Most calls with hooks installed are for unrelated absolute paths (site-packages, /tmp, ...),
+            # reject them with string checks only, without any parsing
+            if (
+                not str_path.startswith(self._project_root_prefix)
+                and str_path != self._project_root_str
+                and not _needs_normalization(str_path)
+            ):
+                return self._outside_repo_path
+            return self._parse_path_cached(None, str_path)
+        return self._parse_path_cached(os.getcwd(), str_path)
+
+    def _parse_path_uncached(self, cwd: Optional[str], file: str) -> DagshubPath:
+        """
+        Full path parsing, memoized per instance as ``_parse_path_cached``.
+        ``cwd`` is part of the key, because relative paths resolve differently after a ``chdir()``
+        """
+        orig_path = Path(file)
+        abspath = Path(os.path.normpath(os.path.join(cwd, file)) if cwd is not None else os.path.abspath(file))
         try:
             relpath = abspath.relative_to(os.path.abspath(self.project_root))
             if str(relpath).startswith("<"):
@@ -323,6 +716,43 @@ class DagsHubFilesystem:
         # TODO Include more information in this file
         return b"v0\n"
 
+    def _special_file_content(self, path: DagshubPath) -> Optional[bytes]:
+        """
+        Returns the content of the special file at the path, or None if the path isn't a special file
+        """
+        if path.relative_path == SPECIAL_FILE:
+            return self._special_file()
+        if path.relative_path == STATS_FILE:
+            return self._stats_file()
+        return None
+
+    def _stats_file(self) -> bytes:
+        return (json.dumps(self.stats(), indent=2) + "\n").encode()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the performance counters of the filesystem, the same ones that are in
+        the ``.dagshub-streaming-stats`` file in the root of the repository:
+
+        - ``counters`` - cache hits and misses, requests in flight, downloaded bytes, deduplicated requests...
+        - ``latency`` - count, mean, p50, p99 and max duration in seconds of listings and downloads
+        - ``local_cache`` - downloaded files kept on disk, see :class:`LocalCacheManager`
+        - ``readahead`` - read-ahead statistics, if it's enabled
+        """
+        res = self._stats.snapshot()
+        res["counters"].update(
+            {
+                "auth_resolutions": self.auth_resolutions,
+                "negative_cache_saved_lookups": self.negative_cache_saved_lookups,
+                "shared_downloads": self._download_flight.shared_calls,
+                "shared_listings": self._listing_flight.shared_calls,
+            }
+        )
+        res["local_cache"] = self.local_cache.stats()
+        if self.readahead is not None:
+            res["readahead"] = self.readahead.stats()
+        return res
+
     def open(self, file, mode='r', buffering=-1, encoding=None,
              errors=None, newline=None, closefd=True, opener=None):
         """
@@ -359,25 +789,44 @@ class DagsHubFilesystem:
                 raise NotImplementedError("DagsHub's patched open() does not support custom openers")
             if path.is_passthrough_path:
                 return self.__open(path.absolute_path, mode, buffering, encoding, errors, newline, closefd)
-            elif path.relative_path == SPECIAL_FILE:
-                return io.BytesIO(self._special_file())
+            elif path.relative_path in SPECIAL_FILES:
+                return io.BytesIO(self._special_file_content(path))
             else:
+                is_read_only = "r" in mode and "+" not in mode
+                if not is_read_only and self.object_store is not None:
+                    # Don't let writes go through to the shared object
+                    ContentAddressedStore.unshare(path.absolute_path)
                 try:
-                    return self.__open(path.absolute_path, mode, buffering, encoding, errors, newline, closefd)
+                    f = self.__open(path.absolute_path, mode, buffering, encoding, errors, newline, closefd)
+                    if is_read_only:
+                        self._stats.incr("file_cache_hits")
+                        self.local_cache.on_access(path.absolute_path)
+                        if self.readahead is not None:
+                            self.readahead.on_open(path, was_local=True)
+                    else:
+                        # Files opened for writing are the user's now, the cache shouldn't delete them
+                        self.local_cache.forget(path.absolute_path)
+                    return f
                 except FileNotFoundError as err:
                     # Open for reading - try to download the file
                     if "r" in mode:
-                        try:
-                            resp = self._api_download_file_git(path)
-                        except RetryError:
-                            raise RuntimeError(f"Couldn't download {path.relative_path} after multiple attempts")
-                        if resp.status_code < 400:
-                            self._mkdirs(path.absolute_path.parent)
-                            # TODO: Handle symlinks
-                            with self.__open(path.absolute_path, "wb") as output:
-                                output.write(resp.content)
-                            return self.__open(path.absolute_path, mode, buffering, encoding, errors, newline, closefd)
-                        elif resp.status_code == 404:
+                        self._stats.incr("file_cache_misses")
+                        if self.readahead is not None and "+" not in mode:
+                            self.readahead.on_open(path, was_local=False)
+                        # Files that can be downloaded straight from the bucket are faster to get in full
+                        if self.lazy_open and "+" not in mode and self._bucket_object(path) is None:
+                            return self._open_lazy(path, mode, encoding, errors, newline)
+                        with self.local_cache.pin(path.absolute_path):
+                            try:
+                                resp = self._download_file(path)
+                            except RetryError:
+                                raise RuntimeError(f"Couldn't download {path.relative_path} after multiple attempts")
+                            if resp.status_code < 400:
+                                # TODO: Handle symlinks
+                                return self.__open(
+                                    path.absolute_path, mode, buffering, encoding, errors, newline, closefd
+                                )
+                        if resp.status_code == 404:
                             raise FileNotFoundError(f"Error finding {path.relative_path} in repo or on DagsHub")
                         else:
                             raise RuntimeError(
@@ -395,17 +844,83 @@ class DagsHubFilesystem:
                         # Try to download the file if we're in append modes
                         if "a" in mode or "+" in mode:
                             try:
-                                resp = self._api_download_file_git(path)
+                                self._download_file(path)
                             except RetryError:
                                 raise RuntimeError(f"Couldn't download {path.relative_path} after multiple attempts")
-                            if resp.status_code < 400:
-                                with self.__open(path.absolute_path, "wb") as output:
-                                    output.write(resp.content)
+                        self.local_cache.forget(path.absolute_path)
                         return self.__open(path.absolute_path, mode, buffering, encoding, errors, newline, closefd)
 
         else:
             return self.__open(file, mode, buffering, encoding, errors, newline, closefd, opener)
 
+    def open_lazy(
+        self,
+        file: Union[str, PathLike],
+        mode: str = "rb",
+        encoding: Optional[str] = None,
+        errors: Optional[str] = None,
+        newline: Optional[str] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        """
+        Open a repository file for reading without downloading it.
+
+        Parts of the file are fetched with HTTP range requests as they are being read, and kept in a block cache.
+        This is useful when only a small part of a big file is needed,
+        for example the footer of a Parquet file or a single record in a shard.
+        If the server doesn't support range requests, the file is downloaded in full instead.
+
+        If the file already exists locally, it is opened as usual.
+
+        .. note::
+            The returned object isn't backed by a file descriptor, so ``fileno()`` doesn't work on it.
+
+        Args:
+            file: Path of the file to open.
+            mode: ``"rb"`` or ``"r"``. Only reading modes are supported.
+            encoding: Encoding to use in text mode.
+            errors: Encoding error handling strategy in text mode.
+            newline: Newline handling in text mode.
+            block_size: Size of the blocks that are fetched and cached.
+
+        Returns:
+            A buffered binary file object, or a text file object in text mode.
+        """
+        if "w" in mode or "a" in mode or "x" in mode or "+" in mode:
+            raise ValueError(f"open_lazy() only supports reading, got mode {mode}")
+        if type(file) is bytes:
+            file = os.fsdecode(file)
+        path = self._parse_path(file)
+        if not path.is_in_repo or path.is_passthrough_path:
+            return self.__open(file, mode, encoding=encoding, errors=errors, newline=newline)
+        try:
+            return self.__open(path.absolute_path, mode, encoding=encoding, errors=errors, newline=newline)
+        except FileNotFoundError:
+            return self._open_lazy(path, mode, encoding, errors, newline, block_size)
+
+    def _open_lazy(
+        self,
+        path: DagshubPath,
+        mode: str,
+        encoding: Optional[str],
+        errors: Optional[str],
+        newline: Optional[str],
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        if self._negative_cache.is_missing(self._current_revision, PurePosixPath(path.relative_path)):
+            raise FileNotFoundError(f"Error finding {path.relative_path} in repo or on DagsHub")
+        try:
+            raw = DagsHubRangeFile(self, path, block_size=block_size)
+        except FileNotFoundError:
+            self._negative_cache.add(self._current_revision, PurePosixPath(path.relative_path))
+            raise
+        except RetryError:
+            raise RuntimeError(f"Couldn't read {path.relative_path} after multiple attempts")
+        buffered = io.BufferedReader(raw, buffer_size=block_size)
+        if "b" in mode:
+            return buffered
+        return io.TextIOWrapper(buffered, encoding=encoding, errors=errors, newline=newline)
+
     def os_open(self, path, flags, mode=0o777, *, dir_fd=None):
         """
         os.open is supposed to be lower level, but it's still being used by e.g. Pathlib
@@ -421,6 +936,7 @@ class DagsHubFilesystem:
         if dir_fd is not None:  # If dir_fd supplied, path is relative to that dir's fd, will handle in the future
             logger.debug("fs.os_open - NotImplemented")
             raise NotImplementedError("DagsHub's patched os.open() (for pathlib only) does not support dir_fd")
+        path_arg = path
         path = self._parse_path(path)
         if path.is_in_repo:
             try:
@@ -435,7 +951,8 @@ class DagsHubFilesystem:
                 logger.debug("fs.os_open - successfully materialized path")
             except FileNotFoundError:
                 logger.debug("fs.os_open - failed to materialize path, os.open will throw")
-        return os.open(path.absolute_path, flags, mode, dir_fd=dir_fd)
+            return os.open(path.absolute_path, flags, mode, dir_fd=dir_fd)
+        return os.open(path_arg, flags, mode, dir_fd=dir_fd)
 
     def stat(self, path, *args, dir_fd=None, follow_symlinks=True):
         """
@@ -470,8 +987,10 @@ class DagsHubFilesystem:
             logger.debug("fs.stat - is relative path")
             if parsed_path.is_passthrough_path:
                 return self.__stat(parsed_path.absolute_path)
-            elif parsed_path.relative_path == SPECIAL_FILE:
-                return dagshub_stat_result(self, path, is_directory=False, custom_size=len(self._special_file()))
+            elif parsed_path.relative_path in SPECIAL_FILES:
+                return dagshub_stat_result(
+                    self, path, is_directory=False, custom_size=len(self._special_file_content(parsed_path))
+                )
             else:
                 try:
                     logger.debug(f"fs.stat - calling __stat - relative_path: {path}")
@@ -498,7 +1017,7 @@ class DagsHubFilesystem:
                         raise err
 
                     if filetype == "file":
-                        return dagshub_stat_result(self, path, is_directory=False)
+                        return dagshub_stat_result(self, path, is_directory=False, remote_path=parsed_path)
                     elif filetype == "dir":
                         self._mkdirs(parsed_path.absolute_path)
                         return self.__stat(parsed_path.absolute_path)
@@ -600,7 +1119,7 @@ class DagsHubFilesystem:
                 resp = self._api_listdir(parsed_path)
                 if resp is not None:
                     dircontents.update(Path(f.path).name for f in resp)
-                    self.remote_tree[str(parsed_path.relative_path)] = {Path(f.path).name: f.type for f in resp}
+                    self._update_remote_tree(parsed_path, resp)
                     return encode_results(dircontents)
                 else:
                     if error is not None:
@@ -611,6 +1130,92 @@ class DagsHubFilesystem:
         else:
             return self.__listdir(path)
 
+    def _update_remote_tree(self, path: DagshubPath, entries: List[ContentAPIEntry]):
+        tree = {PurePosixPath(f.path).name: f.type for f in entries}
+        with self._cache_lock:
+            self.remote_tree[str(path.relative_path)] = tree
+
+    def prefetch_tree(
+        self,
+        path: Union[str, PathLike] = ".",
+        max_depth: Optional[int] = None,
+        workers: int = config.download_threads,
+    ) -> int:
+        """
+        Lists a whole directory subtree in parallel and caches the results,
+        so that subsequent ``os.walk()``, ``listdir()`` and ``scandir()`` calls on it are served from memory.
+
+        Directories are listed breadth-first. Connected storage buckets are included if they are inside of ``path``.
+
+        Args:
+            path: Directory from which to start listing.
+            max_depth: How many levels below ``path`` to list. ``0`` lists only ``path`` itself.
+                If None, lists the whole subtree.
+            workers: Maximum number of concurrent listing requests.
+
+        Returns:
+            Number of directories that were listed.
+
+        Example::
+
+            fs = DagsHubFilesystem()
+            fs.install_hooks()
+            fs.prefetch_tree("data/images", workers=16)
+            for root, dirs, files in os.walk("data/images"):
+                ...
+        """
+        root = self._parse_path(path)
+        if not root.is_in_repo:
+            raise ValueError(f"Path {path} is outside of the repository mounted at {self.project_root}")
+        # Resolve the revision before spawning threads, so they don't race on the cached property
+        _ = self._current_revision
+
+        def get_depth(p: DagshubPath) -> int:
+            return len(p.relative_path.parts) - len(root.relative_path.parts)
+
+        def list_dir(p: DagshubPath) -> Optional[List[ContentAPIEntry]]:
+            # .dagshub/storage/<proto> folders are virtual, buckets get queued up separately
+            len_parts = len(p.relative_path.parts)
+            if 0 < len_parts <= 3 and p.relative_path.parts[0] == ".dagshub":
+                return None
+            entries = self._api_listdir(p)
+            if entries is not None:
+                self._update_remote_tree(p, entries)
+            return entries
+
+        to_list = [root]
+        # Storage buckets don't show up in the content API listings, queue up those that are in the subtree
+        for storage in self._storages:
+            storage_path = Path(storage.path_in_mount)
+            if storage_path == root.relative_path:
+                continue
+            try:
+                storage_path.relative_to(root.relative_path)
+            except ValueError:
+                continue
+            storage_dh_path = DagshubPath(self, self.project_root / storage_path, storage_path, storage_path)
+            if max_depth is None or get_depth(storage_dh_path) <= max_depth:
+                to_list.append(storage_dh_path)
+
+        listed = 0
+        with ThreadPoolExecutor(max_workers=workers) as tp:
+            futures = {tp.submit(list_dir, p): p for p in to_list}
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    dir_path = futures.pop(future)
+                    entries = future.result()
+                    if entries is None:
+                        continue
+                    listed += 1
+                    if max_depth is not None and get_depth(dir_path) >= max_depth:
+                        continue
+                    for entry in entries:
+                        if entry.type == "dir":
+                            child = dir_path / PurePosixPath(entry.path).name
+                            futures[tp.submit(list_dir, child)] = child
+        return listed
+
     @cached_property
     def project_root_dagshub_path(self):
         return DagshubPath(absolute_path=self.project_root, relative_path=Path(), original_path=Path(), fs=self)
@@ -667,6 +1272,7 @@ class DagsHubFilesystem:
         str_path = dh_path.relative_path.as_posix()
         if str_path == ".":
             res.add(generate_entry(SPECIAL_FILE, False))
+            res.add(generate_entry(STATS_FILE, False))
             if has_storages:
                 res.add(generate_entry(".dagshub", True))
         elif str_path.startswith(".dagshub") and has_storages:
@@ -681,57 +1287,182 @@ class DagsHubFilesystem:
         return res
 
     def _api_listdir(self, path: DagshubPath, include_size: bool = False) -> Optional[List[ContentAPIEntry]]:
-        response, hit = self._check_listdir_cache(path.relative_path.as_posix(), include_size)
+        str_path = path.relative_path.as_posix()
+        response, hit = self._check_listdir_cache(str_path, include_size)
         if hit:
+            self._stats.incr("listing_cache_hits")
             return response
-        params: Dict[str, Any] = {"include_size": "true"} if include_size else {}
-        if path.is_storage_path:
-            params["paging"] = True
+        if self._negative_cache.is_missing(self._current_revision, PurePosixPath(path.relative_path)):
+            return None
+        self._stats.incr("listing_cache_misses")
+
+        def list_dir() -> Optional[List[ContentAPIEntry]]:
+            # The listing might have been cached by a call that finished right before this one started
+            cached, cache_hit = self._check_listdir_cache(str_path, include_size)
+            if cache_hit:
+                return cached
+            with self._stats.track("listing"):
+                return self._api_listdir_uncached(path, include_size)
+
+        return self._listing_flight.do((str_path, include_size), list_dir)
+
+    def _api_listdir_uncached(self, path: DagshubPath, include_size: bool) -> Optional[List[ContentAPIEntry]]:
         url = self._content_url_for_path(path)
 
-        def _get() -> Optional[Response]:
+        def fetch_page(token: Optional[str]) -> Optional[Any]:
+            params = self._listing_params(path, include_size)
+            if token is not None:
+                params["from_token"] = token
             resp = self.http_get(url, params=params, headers=config.requests_headers)
-            if resp.status_code == 404:
-                logger.debug(f"Got HTTP code {resp.status_code} while listing {path}, no results will be returned")
-                return None
-            elif resp.status_code >= 400:
-                logger.warning(f"Got HTTP code {resp.status_code} while listing {path}, no results will be returned")
-                return None
-            return resp
+            return resp.json() if self._check_listing_response(path, resp) else None
 
-        response = _get()
-        if response is None:
-            return None
         res: List[ContentAPIEntry] = []
-        # Storage - token pagination, different return structure + if there's a token we do another request
-        if path.is_storage_path:
-            result = dacite.from_dict(StorageContentAPIResult, response.json())
-            res += result.entries
-            while result.next_token is not None:
-                params["from_token"] = result.next_token
-                new_resp = _get()
-                if new_resp is None:
-                    return None
-                result = dacite.from_dict(StorageContentAPIResult, new_resp.json())
-                res += result.entries
-        else:
-            for entry_raw in response.json():
-                entry = dacite.from_dict(ContentAPIEntry, entry_raw)
-                # Ignore storage root entries, we handle them separately in a different place
-                if entry.type == "storage":
-                    continue
-                res.append(entry)
+        # Storage - token pagination, the next page is requested while the current one is being parsed
+        for body in prefetching_pages(fetch_page, lambda b: self._listing_next_token(path, b)):
+            if body is None:
+                return None
+            page, _ = self._parse_listing(path, body)
+            res += page
 
-        self._listdir_cache[path.relative_path.as_posix()] = (res, include_size)
+        self._store_listing(path, res, include_size)
         return res
 
+    @staticmethod
+    def _listing_params(path: DagshubPath, include_size: bool) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"include_size": "true"} if include_size else {}
+        if path.is_storage_path:
+            params["paging"] = True
+        return params
+
+    def _check_listing_response(self, path: DagshubPath, resp: Response) -> bool:
+        """
+        Returns whether the listing request was successful. Remembers the path as missing on a 404
+        """
+        if resp.status_code == 404:
+            logger.debug(f"Got HTTP code {resp.status_code} while listing {path}, no results will be returned")
+            self._negative_cache.add(self._current_revision, PurePosixPath(path.relative_path))
+            if self._persistent_listing_cache is not None:
+                self._persistent_listing_cache.put_missing(
+                    self._api.full_name,
+                    self._shared_cache_revision(path.relative_path.as_posix()),
+                    path.relative_path.as_posix(),
+                    self._negative_cache.ttl,
+                )
+            return False
+        elif resp.status_code >= 400:
+            logger.warning(f"Got HTTP code {resp.status_code} while listing {path}, no results will be returned")
+            return False
+        return True
+
+    @staticmethod
+    def _parse_listing(path: DagshubPath, body: Any) -> Tuple[List[ContentAPIEntry], Optional[str]]:
+        """
+        Parses a page of the listing response. Returns the entries and the token of the next page, if there is one
+        """
+        # Storage has a different return structure
+        if path.is_storage_path:
+            result = StorageContentAPIResult.from_dict(body)
+            return result.entries, result.next_token
+        # Ignore storage root entries, we handle them separately in a different place
+        return ContentAPIEntry.list_from_dicts(body, skip_storages=True), None
+
+    @staticmethod
+    def _listing_next_token(path: DagshubPath, body: Any) -> Optional[str]:
+        if body is None or not path.is_storage_path:
+            return None
+        return body.get("next_token")
+
+    def _store_listing(self, path: DagshubPath, res: List[ContentAPIEntry], include_size: bool):
+        str_path = path.relative_path.as_posix()
+        with self._cache_lock:
+            cached = self._listdir_cache.get(str_path)
+            # Don't replace a listing with sizes with one without them, if they were requested at the same time
+            if cached is None or include_size or not cached[1]:
+                self._listdir_cache[str_path] = (res, include_size)
+        if self._persistent_listing_cache is not None:
+            # Storage buckets aren't versioned, so their listings can only be persisted for a limited time
+            if not path.is_storage_path:
+                self._persistent_listing_cache.put(
+                    self._api.full_name, self._current_revision, str_path, res, include_size
+                )
+            elif config.streaming_storage_listing_ttl > 0:
+                self._persistent_listing_cache.put(
+                    self._api.full_name,
+                    self._shared_cache_revision(str_path),
+                    str_path,
+                    res,
+                    include_size,
+                    ttl=config.streaming_storage_listing_ttl,
+                )
+
+    def _shared_cache_revision(self, path: str) -> str:
+        """
+        Revision under which the listing of the path is stored in the persistent cache.
+        Storage buckets are the same for every revision of the repo
+        """
+        return STORAGE_CACHE_REVISION if path.startswith(".dagshub/storage") else self._current_revision
+
+    def _get_remote_file_size(self, path: DagshubPath) -> Optional[int]:
+        """
+        Gets the size of the remote file from the sized listing of its directory.
+        The sizes of the whole directory come in one request, so getting sizes of the sibling files is free.
+        """
+        parent = self._parse_path(path.absolute_path.parent)
+        listing = self._api_listdir(parent, include_size=True)
+        if listing is None:
+            return None
+        entry = self._listing_entry(parent.relative_path.as_posix(), listing, path.name)
+        return entry.size if entry is not None else None
+
+    def _listing_entry(self, dir_path: str, listing: List[ContentAPIEntry], name: str) -> Optional[ContentAPIEntry]:
+        """
+        Finds the entry with the name in the listing of the directory.
+        Entries of a listing are indexed by name the first time one of them is looked up,
+        so looking up every file of a big directory doesn't scan the listing every time.
+        """
+        index = self._listing_indexes.get(dir_path)
+        if index is None or index[0] is not listing:
+            index = (listing, {PurePosixPath(e.path).name: e for e in listing})
+            self._listing_indexes[dir_path] = index
+        return index[1].get(name)
+
+    def _check_memory_listdir_cache(
+        self, path: str, include_size: bool
+    ) -> Tuple[Optional[List[ContentAPIEntry]], bool]:
+        """
+        Same as :func:`_check_listdir_cache`, but only checks the in-memory cache, so it never blocks on disk
+        """
+        # Single lookup, so a concurrent update can't slip in between checking the key and getting it
+        cached = self._listdir_cache.get(path)
+        if cached is not None:
+            cache_val, with_size = cached
+            if not include_size or (include_size and with_size):
+                return cache_val, True
+        return None, False
+
     def _check_listdir_cache(self, path: str, include_size: bool) -> Tuple[Optional[List[ContentAPIEntry]], bool]:
         # Checks that path has a pre-cached response
         # If include_size is True, but only a response without size is cached, that's a cache miss
-        if path in self._listdir_cache:
-            cache_val, with_size = self._listdir_cache[path]
-            if not include_size or (include_size and with_size):
-                return cache_val, True
+        cached, hit = self._check_memory_listdir_cache(path, include_size)
+        if hit:
+            return cached, True
+        if self._persistent_listing_cache is None:
+            return None, False
+        is_storage = path.startswith(".dagshub/storage")
+        if is_storage and config.streaming_storage_listing_ttl <= 0:
+            return None, False
+        cached = self._persistent_listing_cache.get(self._api.full_name, self._shared_cache_revision(path), path)
+        if cached is None:
+            return None, False
+        cache_val, with_size = cached
+        if cache_val is None:
+            # Another process found out that the path is missing
+            self._negative_cache.add(self._current_revision, PurePosixPath(path))
+            return None, True
+        with self._cache_lock:
+            self._listdir_cache.setdefault(path, cached)
+        if not include_size or (include_size and with_size):
+            return cache_val, True
         return None, False
 
     def _content_url_for_path(self, path: DagshubPath):
@@ -752,22 +1483,306 @@ class DagsHubFilesystem:
             return self._api.storage_raw_api_url(path_to_access)
         return self._api.raw_api_url(str_path, self._current_revision)
 
+    def prefetch(
+        self,
+        paths: Iterable[Union[str, PathLike]],
+        workers: int = config.download_threads,
+        on_progress: Optional[Callable[[PrefetchResult], None]] = None,
+    ) -> List[PrefetchResult]:
+        """
+        Downloads multiple files into the project root concurrently,
+        so that opening them later doesn't need to wait for the network.
+
+        Files that already exist locally are skipped.
+        If a file gets opened while it's still being prefetched, ``open()`` waits for the ongoing download.
+
+        Args:
+            paths: Paths of the files in the repository, or in connected storages.
+            workers: Maximum number of concurrent downloads.
+            on_progress: Function that gets called with the result of each file, as soon as it is done.
+
+        Returns:
+            Results for each of the paths, in the same order as ``paths``.
+            Errors are not raised, they are recorded in the ``error`` field of the results instead.
+
+        Example::
+
+            fs = DagsHubFilesystem()
+            results = fs.prefetch(["data/1.png", "data/2.png"], workers=8)
+            failed = [r for r in results if not r.ok]
+        """
+        # Resolve the revision before spawning threads, so they don't race on the cached property
+        _ = self._current_revision
+        results = []
+        with ThreadPoolExecutor(max_workers=workers) as tp:
+            futures = {}
+            for p in paths:
+                parsed_path = self._parse_path(os.fsdecode(p) if type(p) is bytes else p)
+                local_path = parsed_path.absolute_path if parsed_path.is_in_repo else None
+                result = PrefetchResult(path=p, local_path=local_path)
+                results.append(result)
+                futures[tp.submit(self._prefetch_file, parsed_path, p)] = result
+            for future in as_completed(futures):
+                result = futures[future]
+                try:
+                    result.downloaded = future.result()
+                except Exception as e:
+                    result.error = e
+                if on_progress is not None:
+                    on_progress(result)
+        return results
+
+    def _prefetch_file(self, path: DagshubPath, requested_path: Optional[Union[str, PathLike]] = None) -> bool:
+        """
+        Downloads the file if it doesn't exist locally yet.
+        Returns whether the file was downloaded
+
+        ``requested_path`` is the path as the caller passed it, used in the error messages
+        """
+        if not path.is_in_repo or path.is_passthrough_path:
+            if requested_path is None:
+                requested_path = path.original_path
+            raise ValueError(f"Path {requested_path} can't be prefetched, it is not a file in the repository")
+        try:
+            self.__stat(path.absolute_path)
+            return False
+        except FileNotFoundError:
+            pass
+        try:
+            resp = self._download_file(path)
+        except RetryError:
+            raise RuntimeError(f"Couldn't download {path.relative_path} after multiple attempts")
+        if resp.status_code == 404:
+            raise FileNotFoundError(f"Error finding {path.relative_path} in repo or on DagsHub")
+        elif resp.status_code >= 400:
+            raise RuntimeError(
+                f"Got response code {resp.status_code} from DagsHub while downloading file {path.relative_path}"
+            )
+        return True
+
+    def _download_file(self, path: DagshubPath) -> Response:
+        """
+        Downloads the file, making sure that the same file is not being downloaded multiple times at once.
+        If another thread is already downloading it, waits for that download and returns its response.
+        """
+        if self._negative_cache.is_missing(self._current_revision, PurePosixPath(path.relative_path)):
+            return Response(404)
+
+        def download() -> Response:
+            # The file might have been downloaded by a call that finished right before this one started
+            if self.local_cache.is_tracked(path.absolute_path):
+                try:
+                    self.__stat(path.absolute_path)
+                    return Response(200)
+                except FileNotFoundError:
+                    pass
+            resp = self._api_download_file_git(path)
+            if resp.status_code == 404:
+                self._negative_cache.add(self._current_revision, PurePosixPath(path.relative_path))
+            return resp
+
+        return self._download_flight.do(path.absolute_path, download)
+
     @retry(
         retry=retry_if_result(_is_server_error),
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
         before_sleep=before_sleep_log(logger, logging.WARNING),
     )
-    def _api_download_file_git(self, path: DagshubPath):
-        resp = self.http_get(self._raw_url_for_path(path), headers=config.requests_headers, timeout=None)
+    def _api_download_file_git(self, path: DagshubPath) -> Response:
+        """
+        Downloads the file into its place in the project root.
+        The body of the response is only read if the request was successful, otherwise nothing is written.
+        """
+        object_key = self._object_key(path)
+        if self._link_from_object_store(path, object_key):
+            return Response(200)
+        if self._download_from_bucket(path, object_key):
+            return Response(200)
+        with self._stats.track("download"):
+            with self.http_stream(self._raw_url_for_path(path), headers=config.requests_headers, timeout=None) as resp:
+                if resp.status_code < 400:
+                    chunks = self._count_downloaded_bytes(resp.iter_bytes(DOWNLOAD_CHUNK_SIZE))
+                    self._store_downloaded_file(path, chunks, object_key)
         return resp
 
+    def _count_downloaded_bytes(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        for chunk in chunks:
+            self._stats.incr("bytes_downloaded", len(chunk))
+            yield chunk
+
+    def _store_downloaded_file(self, path: DagshubPath, chunks: Iterable[bytes], object_key: Optional[str] = None):
+        """
+        Puts the downloaded content of the file into its place in the project root.
+        If there's an object store and the content matches the hash of the object, it's added to the store too.
+        """
+        hasher = ContentHasher(object_key) if object_key is not None else None
+        self._write_file_atomically(self._download_destination(path), self._hash_chunks(chunks, hasher))
+        self._finish_download(path, object_key, hasher)
+
+    @staticmethod
+    def _hash_chunks(chunks: Iterable[bytes], hasher: Optional[ContentHasher]) -> Iterator[bytes]:
+        for chunk in chunks:
+            if hasher is not None:
+                hasher.update(chunk)
+            yield chunk
+
+    @staticmethod
+    def _bucket_object(path: DagshubPath) -> Optional[Tuple[BucketDownloaderFuncType, str, str]]:
+        """
+        For a storage path, returns the downloader added with :func:`dagshub.common.download.add_bucket_downloader`
+        for its protocol, the name of the bucket and the path of the object in it.
+        Returns None if the path isn't in a storage or there's no downloader for its protocol
+        """
+        if not path.is_storage_path:
+            return None
+        # .dagshub/storage/<proto>/<bucket>/<path>
+        parts = path.relative_path.parts
+        if len(parts) < 5:
+            return None
+        downloader = get_bucket_downloader(parts[2])
+        if downloader is None:
+            return None
+        return downloader, parts[3], "/".join(parts[4:])
+
+    def _download_from_bucket(self, path: DagshubPath, object_key: Optional[str]) -> bool:
+        """
+        Downloads a storage file straight from the bucket instead of going through DagsHub, if there's a downloader
+        for the bucket's protocol. Returns whether it was downloaded.
+        If the downloader fails, the file should be downloaded through DagsHub instead
+        """
+        bucket_object = self._bucket_object(path)
+        if bucket_object is None:
+            return False
+        downloader, bucket, object_path = bucket_object
+        try:
+            with self._stats.track("bucket_download"):
+                content = downloader(bucket, object_path)
+        except Exception as e:
+            logger.warning(
+                f"Couldn't download {path.relative_path} from the bucket, downloading it through DagsHub instead: {e}"
+            )
+            return False
+        self._stats.incr("bytes_downloaded", len(content))
+        self._store_downloaded_file(path, [content], object_key)
+        return True
+
+    def _link_from_object_store(self, path: DagshubPath, object_key: Optional[str]) -> bool:
+        """
+        Puts the file into the project root from the object store, if it's there. Returns whether it was
+        """
+        if object_key is None or not self.object_store.has(object_key):
+            return False
+        logger.debug(f"Found {path.relative_path} in the object store, linking it")
+        self._stats.incr("object_store_hits")
+        self._mkdirs(path.absolute_path.parent)
+        self.object_store.link(object_key, path.absolute_path)
+        self.local_cache.on_download(path.absolute_path)
+        return True
+
+    def _download_destination(self, path: DagshubPath) -> Path:
+        """
+        Prepares the directories for the download, and returns where the downloaded content should be written to
+        """
+        self._mkdirs(path.absolute_path.parent)
+        return path.absolute_path
+
+    def _finish_download(self, path: DagshubPath, object_key: Optional[str], hasher: Optional[ContentHasher]):
+        if object_key is not None:
+            if hasher.matches(path.absolute_path):
+                self.object_store.add(object_key, path.absolute_path)
+            else:
+                logger.warning(
+                    f"Content of {path.relative_path} doesn't match its hash {object_key}, not adding it to the store"
+                )
+        self.local_cache.on_download(path.absolute_path)
+
+    def _object_key(self, path: DagshubPath) -> Optional[str]:
+        """
+        Returns the key of the file in the object store.
+        Only files which hashes are known from an already cached listing of their directory have keys.
+        """
+        if self.object_store is None or path.is_storage_path:
+            return None
+        dir_path = path.relative_path.parent.as_posix()
+        listing, hit = self._check_listdir_cache(dir_path, include_size=False)
+        if not hit or listing is None:
+            return None
+        entry = self._listing_entry(dir_path, listing, path.name)
+        return ContentAddressedStore.key_for_entry(entry) if entry is not None else None
+
+    def _write_file_atomically(self, destination: Path, chunks: Iterable[bytes]):
+        """
+        Writes the chunks into a temporary file in the same directory, then renames it to the destination.
+        This way nobody can ever read a partially written file.
+        """
+        tmp_path, fd = _create_download_temp_file(destination)
+        try:
+            with self.__open(fd, "wb") as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            os.replace(tmp_path, destination)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @property
+    def negative_cache_saved_lookups(self) -> int:
+        """
+        Number of remote lookups that weren't made, because the path was already known to be missing
+        """
+        return self._negative_cache.saved_lookups
+
+    @property
+    def _http_client(self) -> httpx.Client:
+        """
+        Connection-pooling client that is used for all listing and download requests.
+        Sockets can't be shared with a forked process, so every process creates its own client.
+        """
+        if self.__http_client is None or self.__http_client_pid != os.getpid():
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            )
+            self.__http_client = httpx.Client(
+                limits=limits,
+                http2=self.http2,
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers=config.requests_headers,
+            )
+            self.__http_client_pid = os.getpid()
+        return self.__http_client
+
     def http_get(self, path: str, **kwargs):
         timeout = self.timeout
         if "timeout" in kwargs:
             timeout = kwargs["timeout"]
             del kwargs["timeout"]
-        return http_request("GET", path, auth=self.auth, timeout=timeout, **kwargs)
+        resp = self._http_client.get(path, auth=self.auth, timeout=timeout, **kwargs)
+        if resp.status_code == 401:
+            logger.debug(f"Got 401 while accessing {path}, resolving the authentication again")
+            self._invalidate_auth()
+            resp = self._http_client.get(path, auth=self.auth, timeout=timeout, **kwargs)
+        return resp
+
+    @contextmanager
+    def http_stream(self, path: str, **kwargs) -> Iterator[Response]:
+        timeout = self.timeout
+        if "timeout" in kwargs:
+            timeout = kwargs["timeout"]
+            del kwargs["timeout"]
+        with self._http_client.stream("GET", path, auth=self.auth, timeout=timeout, **kwargs) as resp:
+            if resp.status_code != 401:
+                yield resp
+                return
+        logger.debug(f"Got 401 while accessing {path}, resolving the authentication again")
+        self._invalidate_auth()
+        with self._http_client.stream("GET", path, auth=self.auth, timeout=timeout, **kwargs) as resp:
+            yield resp
 
     def install_hooks(self):
         """
@@ -862,15 +1877,15 @@ class DagsHubFilesystem:
             DagsHubFilesystem.hooked_instance = None
 
     def _mkdirs(self, absolute_path: Path):
-        for parent in list(absolute_path.parents)[::-1]:
+        for parent in list(absolute_path.parents)[::-1] + [absolute_path]:
             try:
                 self.__stat(parent)
             except (OSError, ValueError):
-                os.mkdir(parent)
-        try:
-            self.__stat(absolute_path)
-        except (OSError, ValueError):
-            os.mkdir(absolute_path)
+                try:
+                    os.mkdir(parent)
+                except FileExistsError:
+                    # Another thread created it in the meantime
+                    pass
 
     @classmethod
     def __get_unpatched(cls, key, alt: T) -> T:
@@ -908,6 +1923,15 @@ def install_hooks(
     password: Optional[str] = None,
     token: Optional[str] = None,
     timeout: Optional[int] = None,
+    persistent_cache: Optional[Union[bool, str, PathLike]] = None,
+    lazy_open: bool = False,
+    max_connections: Optional[int] = None,
+    http2: bool = False,
+    readahead: int = 0,
+    max_cache_bytes: Optional[int] = None,
+    object_store: Optional[Union[PathLike, str]] = None,
+    negative_cache_ttl: Optional[float] = None,
+    refresh_interval: Optional[float] = None,
 ):
     """
     Monkey patches builtin Python functions to make them DagsHub-repo aware.
@@ -929,6 +1953,15 @@ def install_hooks(
         password=password,
         token=token,
         timeout=timeout,
+        persistent_cache=persistent_cache,
+        lazy_open=lazy_open,
+        max_connections=max_connections,
+        http2=http2,
+        readahead=readahead,
+        max_cache_bytes=max_cache_bytes,
+        object_store=object_store,
+        negative_cache_ttl=negative_cache_ttl,
+        refresh_interval=refresh_interval,
     )
     fs.install_hooks()
 
@@ -941,11 +1974,20 @@ def uninstall_hooks():
 
 
 class dagshub_stat_result:
-    def __init__(self, fs: "DagsHubFilesystem", path: DagshubPath, is_directory: bool, custom_size: int = None):
+    def __init__(
+        self,
+        fs: "DagsHubFilesystem",
+        path: DagshubPath,
+        is_directory: bool,
+        custom_size: int = None,
+        remote_path: Optional[DagshubPath] = None,
+    ):
         self._fs = fs
         self._path = path
         self._is_directory = is_directory
         self._custom_size = custom_size
+        # If set, the size is taken from the sized listing of the remote directory, without downloading the file
+        self._remote_path = remote_path
         assert not self._is_directory  # TODO make folder stats lazy?
 
     def __getattr__(self, name: str):
@@ -962,11 +2004,14 @@ class dagshub_stat_result:
         elif name == "st_mode":
             return 0o100644
         elif name == "st_size":
-            if self._custom_size:
+            if self._custom_size is None and self._remote_path is not None:
+                self._custom_size = self._fs._get_remote_file_size(self._remote_path)
+            if self._custom_size is not None:
                 return self._custom_size
-            return 1100  # hardcoded size because size requests take a disproportionate amount of time
-        self._fs.open(self._path)
-        self._true_stat = self._fs._DagsHubFilesystem__stat(self._path.absolute_path)
+        # The path the stat was called with can be relative to a directory that isn't current anymore
+        path = self._remote_path.absolute_path if self._remote_path is not None else self._path
+        self._fs.open(path, "rb").close()
+        self._true_stat = self._fs._DagsHubFilesystem__stat(path)
         return os.stat_result.__getattribute__(self._true_stat, name)
 
     def __repr__(self):
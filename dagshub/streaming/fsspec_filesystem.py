@@ -0,0 +1,386 @@
+import asyncio
+import logging
+import os
+import threading
+from pathlib import PurePosixPath
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import httpx
+from httpx import Response
+
+from dagshub.common import config
+from dagshub.common.api.repo import RepoAPI
+from dagshub.common.api.responses import ContentAPIEntry, StorageAPIEntry, StorageContentAPIResult
+
+try:
+    from fsspec.asyn import AsyncFileSystem, sync
+    from fsspec.callbacks import DEFAULT_CALLBACK
+    from fsspec.spec import AbstractBufferedFile
+except ImportError:
+    raise ImportError("DagsHubFsspecFileSystem requires fsspec, install it with `pip install dagshub[fsspec]`")
+
+logger = logging.getLogger(__name__)
+
+STORAGE_ROOT = ".dagshub/storage"
+
+
+class _RangesIgnored(Exception):
+    """
+    Raised when the server answered a range request with the whole file, the content of the file is in ``content``
+    """
+
+    def __init__(self, content: bytes):
+        super().__init__()
+        self.content = content
+
+
+class _RepoPath(NamedTuple):
+    owner: str
+    repo: str
+    # None means the default branch
+    revision: Optional[str]
+    # Path inside the repo, "" for the root
+    path: str
+    # "owner/repo[@revision]" the way it was written in the path, names in listings are prefixed with it
+    prefix: str
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.owner}/{self.repo}"
+
+    @property
+    def is_storage_path(self) -> bool:
+        return self.path == STORAGE_ROOT or self.path.startswith(STORAGE_ROOT + "/")
+
+    def join(self, name: str) -> str:
+        return f"{self.prefix}/{self.path}/{name}" if self.path else f"{self.prefix}/{name}"
+
+
+class DagsHubFsspecFileSystem(AsyncFileSystem):
+    """
+    `fsspec <https://filesystem-spec.readthedocs.io>`_ filesystem of DagsHub repositories,
+    backed by the content API. Doesn't need any hooks or a local clone of the repository.
+
+    Paths have the form ``dagshub://<owner>/<repo>[@<revision>]/<path>``, where ``revision`` is a branch or a commit.
+    If no revision is specified, the default branch is used.
+    Connected storage buckets are under ``dagshub://<owner>/<repo>/.dagshub/storage/<scheme>/<bucket>/...``,
+    same as with :class:`~dagshub.streaming.DagsHubFilesystem`.
+
+    The filesystem is read-only. ``cat()`` and ``get()`` of multiple files run concurrently,
+    and opened files support all of fsspec's cache types (``cache_type="blockcache"``, ``"readahead"``, ``"all"``...),
+    reading only the requested byte ranges of the file.
+
+    Args:
+        host: URL of the DagsHub instance. Defaults to the configured host.
+        token: Token to use. If None, uses the regular DagsHub authentication.
+        max_concurrency: Maximum number of requests running at once.
+
+    Example::
+
+        import pandas as pd
+        df = pd.read_csv("dagshub://user/repo@main/data/table.csv")
+
+        import fsspec
+        fs = fsspec.filesystem("dagshub")
+        fs.get("user/repo/data/images/", "images/", recursive=True)
+    """
+
+    protocol = "dagshub"
+    root_marker = ""
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        token: Optional[str] = None,
+        max_concurrency: int = config.streaming_max_connections,
+        asynchronous: bool = False,
+        loop=None,
+        batch_size: Optional[int] = None,
+        **storage_options,
+    ):
+        super().__init__(
+            asynchronous=asynchronous, loop=loop, batch_size=batch_size or max_concurrency, **storage_options
+        )
+        self.host = host or config.host
+        self.token = token
+        self.max_concurrency = max_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+        self._auth = None
+        self._auth_lock = threading.Lock()
+        self._repo_apis: Dict[str, RepoAPI] = {}
+        self._storages: Dict[str, List[StorageAPIEntry]] = {}
+
+    @classmethod
+    def _strip_protocol(cls, path):
+        if isinstance(path, list):
+            return [cls._strip_protocol(p) for p in path]
+        path = str(path)
+        if path.startswith(f"{cls.protocol}://"):
+            path = path[len(cls.protocol) + 3 :]
+        return path.rstrip("/")
+
+    @staticmethod
+    def _get_kwargs_from_urls(path):
+        return {}
+
+    def _split_path(self, path: str) -> _RepoPath:
+        path = self._strip_protocol(path)
+        parts = path.split("/", 2)
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            raise ValueError(f"Path {path} should have the form <owner>/<repo>[@<revision>]/<path>")
+        owner, repo_and_revision = parts[0], parts[1]
+        if "@" in repo_and_revision:
+            repo, revision = repo_and_revision.split("@", 1)
+        else:
+            repo, revision = repo_and_revision, None
+        return _RepoPath(owner, repo, revision, parts[2] if len(parts) > 2 else "", f"{owner}/{repo_and_revision}")
+
+    @property
+    def auth(self):
+        with self._auth_lock:
+            if self._auth is None:
+                import dagshub.auth
+                from dagshub.auth.token_auth import HTTPBearerAuth
+
+                if self.token is not None:
+                    self._auth = HTTPBearerAuth(self.token)
+                else:
+                    self._auth = dagshub.auth.get_authenticator(host=self.host)
+            return self._auth
+
+    async def _get_auth(self):
+        if self._auth is not None:
+            return self._auth
+        # Resolving the authentication can read or refresh tokens, keep it off the event loop
+        return await asyncio.get_event_loop().run_in_executor(None, lambda: self.auth)
+
+    async def _get_repo_api(self, path: _RepoPath) -> RepoAPI:
+        api = self._repo_apis.get(path.full_name)
+        if api is None:
+            api = RepoAPI(path.full_name, host=self.host, auth=await self._get_auth())
+            self._repo_apis[path.full_name] = api
+        return api
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # Created inside the event loop of the filesystem, the client can't be used from other loops
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            self._client = httpx.AsyncClient(
+                limits=limits,
+                timeout=config.http_timeout,
+                follow_redirects=True,
+                headers=config.requests_headers,
+            )
+        return self._client
+
+    async def _http_get(self, url: str, **kwargs) -> Response:
+        client = await self._get_client()
+        return await client.get(url, auth=await self._get_auth(), **kwargs)
+
+    async def _revision(self, path: _RepoPath) -> str:
+        if path.revision is not None:
+            return path.revision
+        api = await self._get_repo_api(path)
+        # default_branch is a blocking request, but it's made only once per repo
+        return await asyncio.get_event_loop().run_in_executor(None, lambda: api.default_branch)
+
+    async def _get_storages(self, path: _RepoPath) -> List[StorageAPIEntry]:
+        storages = self._storages.get(path.full_name)
+        if storages is None:
+            resp = await self._http_get((await self._get_repo_api(path)).storage_api_url())
+            if resp.status_code >= 400:
+                raise FileNotFoundError(f"Couldn't get the storages of {path.full_name} (status {resp.status_code})")
+            storages = [StorageAPIEntry.from_dict(s) for s in resp.json()]
+            self._storages[path.full_name] = storages
+        return storages
+
+    def _entry_info(self, path: _RepoPath, entry: ContentAPIEntry) -> Dict[str, Any]:
+        is_dir = entry.type == "dir"
+        return {
+            "name": path.join(PurePosixPath(entry.path).name),
+            "size": 0 if is_dir else entry.size,
+            "type": "directory" if is_dir else "file",
+            "hash": entry.hash,
+            "versioning": entry.versioning,
+        }
+
+    @staticmethod
+    def _dir_info(name: str) -> Dict[str, Any]:
+        return {"name": name, "size": 0, "type": "directory"}
+
+    async def _ls(self, path, detail=True, refresh=False, **kwargs):
+        path = self._strip_protocol(path)
+        if not refresh:
+            try:
+                listing = self._ls_from_cache(path)
+            except FileNotFoundError:
+                listing = None
+            if listing is not None:
+                return listing if detail else [e["name"] for e in listing]
+        repo_path = self._split_path(path)
+        if repo_path.path == ".dagshub" or repo_path.is_storage_path:
+            listing = await self._ls_storage(repo_path)
+        else:
+            listing = await self._ls_repo(repo_path)
+        # A listing of a file returns the file itself, that doesn't go into the directory cache
+        if not (len(listing) == 1 and listing[0]["name"] == path and listing[0]["type"] == "file"):
+            self.dircache[path] = listing
+        return listing if detail else [e["name"] for e in listing]
+
+    async def _ls_repo(self, path: _RepoPath) -> List[Dict[str, Any]]:
+        api = await self._get_repo_api(path)
+        url = api.content_api_url(path.path, await self._revision(path))
+        resp = await self._http_get(url, params={"include_size": "true"})
+        if resp.status_code == 404:
+            raise FileNotFoundError(path.join("").rstrip("/"))
+        elif resp.status_code >= 400:
+            raise RuntimeError(f"Got status code {resp.status_code} when listing {path.prefix}/{path.path}")
+        body = resp.json()
+        if isinstance(body, dict):
+            # Path is a file
+            entry = ContentAPIEntry.from_dict(body)
+            info = self._entry_info(path, entry)
+            info["name"] = f"{path.prefix}/{path.path}"
+            return [info]
+        # Storages are listed under .dagshub/storage instead
+        res = [self._entry_info(path, entry) for entry in ContentAPIEntry.list_from_dicts(body, skip_storages=True)]
+        if path.path == "" and len(await self._get_storages(path)) > 0:
+            res.append(self._dir_info(path.join(".dagshub")))
+        return res
+
+    async def _ls_storage(self, path: _RepoPath) -> List[Dict[str, Any]]:
+        storages = await self._get_storages(path)
+        current = PurePosixPath(path.path)
+        # Directories above the buckets are virtual, they are made up from the paths of the connected storages
+        children = set()
+        for storage in storages:
+            try:
+                relpath = storage.path_in_mount.relative_to(current)
+            except ValueError:
+                continue
+            if relpath != PurePosixPath("."):
+                children.add(relpath.parts[0])
+        if children:
+            return [self._dir_info(path.join(child)) for child in sorted(children)]
+
+        if not any(current == s.path_in_mount or s.path_in_mount in current.parents for s in storages):
+            raise FileNotFoundError(f"{path.prefix}/{path.path}")
+        url = (await self._get_repo_api(path)).storage_content_api_url(path.path[len(STORAGE_ROOT) + 1 :])
+        params: Dict[str, Any] = {"include_size": "true", "paging": "true"}
+        res = []
+        while True:
+            resp = await self._http_get(url, params=params)
+            if resp.status_code == 404:
+                raise FileNotFoundError(f"{path.prefix}/{path.path}")
+            elif resp.status_code >= 400:
+                raise RuntimeError(f"Got status code {resp.status_code} when listing {path.prefix}/{path.path}")
+            result = StorageContentAPIResult.from_dict(resp.json())
+            res += [self._entry_info(path, entry) for entry in result.entries]
+            if result.next_token is None:
+                break
+            params["from_token"] = result.next_token
+        return res
+
+    async def _info(self, path, **kwargs):
+        path = self._strip_protocol(path)
+        repo_path = self._split_path(path)
+        if repo_path.path == "":
+            return self._dir_info(path)
+        parent = self._parent(path)
+        for entry in await self._ls(parent, detail=True):
+            if entry["name"] == path:
+                return entry
+        raise FileNotFoundError(path)
+
+    async def _raw_url(self, path: _RepoPath, revision: str) -> str:
+        api = await self._get_repo_api(path)
+        if path.is_storage_path:
+            return api.storage_raw_api_url(path.path[len(STORAGE_ROOT) + 1 :])
+        return api.raw_api_url(path.path, revision)
+
+    async def _cat_file(self, path, start=None, end=None, **kwargs):
+        try:
+            return await self._cat_range(path, start, end)
+        except _RangesIgnored as e:
+            return e.content[start:end]
+
+    async def _cat_range(self, path, start=None, end=None):
+        """
+        Same as :func:`_cat_file`, but raises :class:`_RangesIgnored` if the server sent the whole file
+        instead of the requested range, so the caller can keep the content instead of downloading it again
+        """
+        path = self._strip_protocol(path)
+        repo_path = self._split_path(path)
+        if (start is not None and start < 0) or (end is not None and end < 0):
+            size = (await self._info(path))["size"]
+            if start is not None and start < 0:
+                start = max(size + start, 0)
+            if end is not None and end < 0:
+                end = size + end
+        headers = {}
+        if start is not None or end is not None:
+            start = start or 0
+            if end is not None and end <= start:
+                return b""
+            headers["Range"] = f"bytes={start}-{end - 1 if end is not None else ''}"
+        url = await self._raw_url(repo_path, await self._revision(repo_path))
+        resp = await self._http_get(url, headers=headers)
+        if resp.status_code == 404:
+            raise FileNotFoundError(path)
+        elif resp.status_code == 416:
+            return b""
+        elif resp.status_code >= 400:
+            raise RuntimeError(f"Got status code {resp.status_code} when getting file {path}")
+        if resp.status_code == 200 and "Range" in headers:
+            raise _RangesIgnored(resp.content)
+        return resp.content
+
+    async def _get_file(self, rpath, lpath, callback=DEFAULT_CALLBACK, **kwargs):
+        rpath = self._strip_protocol(rpath)
+        if os.path.isdir(lpath):
+            return
+        repo_path = self._split_path(rpath)
+        client = await self._get_client()
+        url = await self._raw_url(repo_path, await self._revision(repo_path))
+        async with client.stream("GET", url, auth=await self._get_auth(), timeout=None) as resp:
+            if resp.status_code == 404:
+                raise FileNotFoundError(rpath)
+            elif resp.status_code >= 400:
+                raise RuntimeError(f"Got status code {resp.status_code} when getting file {rpath}")
+            if "Content-Length" in resp.headers:
+                callback.set_size(int(resp.headers["Content-Length"]))
+            os.makedirs(os.path.dirname(os.path.abspath(lpath)), exist_ok=True)
+            with open(lpath, "wb") as f:
+                async for chunk in resp.aiter_bytes(1024 * 1024):
+                    f.write(chunk)
+                    callback.relative_update(len(chunk))
+
+    def _open(self, path, mode="rb", block_size=None, autocommit=True, cache_options=None, **kwargs):
+        if mode != "rb":
+            raise NotImplementedError("DagsHubFsspecFileSystem is read-only")
+        return DagsHubFile(self, path, mode, block_size, autocommit, cache_options=cache_options, **kwargs)
+
+    def ukey(self, path):
+        info = self.info(path)
+        return info.get("hash") or super().ukey(path)
+
+
+class DagsHubFile(AbstractBufferedFile):
+    """
+    File of a DagsHub repository. Only the requested byte ranges are fetched, caching is done by fsspec.
+    If the server doesn't support range requests for the file, the whole file is kept in memory after the first read
+    """
+
+    def __init__(self, *args, **kwargs):
+        # Set before the fsspec cache is created, the "all" cache reads the file right away
+        self._content: Optional[bytes] = None
+        super().__init__(*args, **kwargs)
+
+    def _fetch_range(self, start, end):
+        if self._content is None:
+            try:
+                return sync(self.fs.loop, self.fs._cat_range, self.path, start, end)
+            except _RangesIgnored as e:
+                logger.debug(f"Server sent the whole file {self.path} for a range request, keeping it in memory")
+                self._content = e.content
+        return self._content[start:end]
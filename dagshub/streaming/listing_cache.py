@@ -0,0 +1,144 @@
+import dataclasses
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple, List, Union
+
+from dagshub.common.api.responses import ContentAPIEntry
+
+logger = logging.getLogger(__name__)
+
+CACHE_SCHEMA_VERSION = 2
+MMAP_SIZE = 256 * 1024 * 1024
+
+
+class PersistentListingCache:
+    """
+    On-disk cache of content API listings, backed by SQLite.
+
+    Listings of a repository at a specific commit never change,
+    so they are keyed by (repo, revision, path) and can be shared between all processes on the machine,
+    e.g. the forked workers of a DataLoader.
+    Listings of mutable things (storage buckets) and paths that were found missing can be stored with a TTL.
+
+    Reads don't take any locks thanks to WAL mode, and the database is memory-mapped,
+    so a read is about as expensive as a lookup in a local index.
+
+    Args:
+        location: Directory where the cache database is stored
+    """
+
+    def __init__(self, location: Union[str, "os.PathLike[str]"]):
+        self.location = Path(location)
+        self.db_path = self.location / f"listings-v{CACHE_SCHEMA_VERSION}.sqlite"
+        self._local = threading.local()
+        self._inherited_connections: List[sqlite3.Connection] = []
+        self._disabled = False
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._disabled:
+            return None
+        # Connections can't be shared between threads or carried over a fork, so keep one per thread per process
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            if self._local.pid == os.getpid():
+                return conn
+            # Connection was inherited from the parent process. Closing it here could mess with the parent's locks,
+            # so just let it be
+            self._inherited_connections.append(conn)
+        try:
+            os.makedirs(self.location, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            # entries is NULL for paths that don't exist, expires_at is NULL for entries that never expire
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS listings ("
+                "repo TEXT NOT NULL, "
+                "revision TEXT NOT NULL, "
+                "path TEXT NOT NULL, "
+                "with_size INTEGER NOT NULL, "
+                "entries TEXT, "
+                "expires_at REAL, "
+                "PRIMARY KEY (repo, revision, path))"
+            )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Couldn't open the persistent listing cache at {self.db_path}, disabling it: {e}")
+            self._disabled = True
+            return None
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, repo: str, revision: str, path: str) -> Optional[Tuple[Optional[List[ContentAPIEntry]], bool]]:
+        """
+        Returns a tuple of (entries, with_size) if the listing is cached, None otherwise.
+        If the path is known to be missing, entries are None.
+        """
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT entries, with_size FROM listings WHERE repo = ? AND revision = ? AND path = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (repo, revision, path, time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"Failed to read listing of {path} from the persistent cache: {e}")
+            return None
+        if row is None:
+            return None
+        if row[0] is None:
+            return None, bool(row[1])
+        entries = [ContentAPIEntry(**entry) for entry in json.loads(row[0])]
+        return entries, bool(row[1])
+
+    def put(
+        self,
+        repo: str,
+        revision: str,
+        path: str,
+        entries: List[ContentAPIEntry],
+        with_size: bool,
+        ttl: Optional[float] = None,
+    ):
+        """
+        Stores the listing. If ``ttl`` is set, the listing expires after that many seconds
+        """
+        serialized = json.dumps([dataclasses.asdict(entry) for entry in entries])
+        self._put(repo, revision, path, serialized, with_size, ttl)
+
+    def put_missing(self, repo: str, revision: str, path: str, ttl: float):
+        """
+        Stores that the path doesn't exist, for ``ttl`` seconds
+        """
+        if ttl <= 0:
+            return
+        # A missing path is missing no matter if the sizes were requested, so it counts as a listing with sizes
+        self._put(repo, revision, path, None, True, ttl)
+
+    def _put(
+        self, repo: str, revision: str, path: str, serialized: Optional[str], with_size: bool, ttl: Optional[float]
+    ):
+        conn = self._connection()
+        if conn is None:
+            return
+        expires_at = time.time() + ttl if ttl is not None else None
+        try:
+            # Never overwrite a permanent listing that has sizes with one that doesn't.
+            # Not using ON CONFLICT ... DO UPDATE, it needs SQLite 3.24, which some older distributions don't have
+            conn.execute(
+                "INSERT OR REPLACE INTO listings (repo, revision, path, with_size, entries, expires_at) "
+                "SELECT ?, ?, ?, ?, ?, ? WHERE NOT EXISTS ("
+                "SELECT 1 FROM listings WHERE repo = ? AND revision = ? AND path = ? "
+                "AND expires_at IS NULL AND with_size > ?)",
+                (repo, revision, path, int(with_size), serialized, expires_at, repo, revision, path, int(with_size)),
+            )
+        except sqlite3.Error as e:
+            logger.debug(f"Failed to write listing of {path} to the persistent cache: {e}")
@@ -1,20 +1,35 @@
 import errno
+import json
 import logging
 import os
 import platform
 import sys
 from argparse import ArgumentParser
 from os import PathLike
+from itertools import count
 from pathlib import Path
 from threading import Lock
-from typing import Optional
-from dagshub.common import rich_console
+from typing import Any, Dict, Optional, Tuple
 
-from .filesystem import SPECIAL_FILE, DagsHubFilesystem
+import dateutil.parser
+
+from dagshub.common import config, rich_console
+from dagshub.common.helpers import get_project_root
+
+from .block_cache import BlockCache, BlockCachedFile
+from .filesystem import SPECIAL_FILE, STATS_FILE, DagsHubFilesystem, dagshub_stat_result
+from .object_store import ContentAddressedStore
+from .range_file import DEFAULT_BLOCK_SIZE
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 SPECIAL_FILE_FH = (1 << 64) - 1
+# Handles of the files that are being fetched block by block and of the stats files, way above any real file descriptor
+LAZY_FH_START = 1 << 40
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT | os.O_TRUNC
+DEFAULT_ATTR_TIMEOUT = 60.0
+STAT_KEYS = ("st_atime", "st_ctime", "st_gid", "st_mode", "st_mtime", "st_size", "st_uid")
 
 fuse_enabled_systems = ["Linux"]
 system = platform.system()
@@ -36,18 +51,67 @@ class DagsHubFUSE(LoggingMixIn, Operations):
         username: Optional[str] = None,
         password: Optional[str] = None,
         token: Optional[str] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        block_cache_bytes: Optional[int] = None,
+        attr_timeout: float = DEFAULT_ATTR_TIMEOUT,
+        entry_timeout: float = DEFAULT_ATTR_TIMEOUT,
+        kernel_cache: bool = True,
+        commit_mtime: bool = False,
     ):
         # FIXME TODO move autoconfiguration out of FUSE object constructor and to main method
+        if project_root is None:
+            project_root = get_project_root(Path(os.path.abspath(".")))
+        self.mountpoint = Path(os.path.abspath(project_root))
+        # The filesystem gets mounted on top of the project root, hiding the files that are already there.
+        # A descriptor opened before mounting keeps pointing at the real directory, and /proc/self/fd/<fd>
+        # resolves to it, so the filesystem reads and downloads files there without going through the mount.
+        self.project_root_fd = os.open(self.mountpoint, os.O_RDONLY | os.O_DIRECTORY)
         self.fs = DagsHubFilesystem(
-            project_root=project_root,
+            project_root=f"/proc/self/fd/{self.project_root_fd}",
             repo_url=repo_url,
             branch=branch,
             username=username,
             password=password,
             token=token,
         )
+        # Files that aren't local yet are read block by block, instead of being downloaded in full on open
+        self.block_size = block_size
+        self.block_cache = BlockCache(
+            Path(config.streaming_cache_location) / "fuse",
+            block_cache_bytes if block_cache_bytes is not None else config.streaming_block_cache_bytes,
+        )
+        # Key: path, value: the file and the number of its open handles
+        self._lazy_files: Dict[Path, Tuple[BlockCachedFile, int]] = {}
+        self._lazy_handles: Dict[int, Path] = {}
+        self._lazy_lock = Lock()
+        self._lazy_fh_counter = count(LAZY_FH_START)
+        self._lazy_open_flight: SingleFlight[BlockCachedFile] = SingleFlight()
+        # How long the kernel can keep the attributes and the names of the files without asking again
+        self.attr_timeout = attr_timeout
+        self.entry_timeout = entry_timeout
+        # Let the kernel keep the pages of a file between opens. Only for the files of the mounted commit,
+        # the files of storage buckets can change
+        self.kernel_cache = kernel_cache
+        # Key: handle of an opened stats file, value: the stats at the time it was opened
+        self._stats_snapshots: Dict[int, bytes] = {}
+        # Report the time of the mounted commit as the modification time of files that weren't downloaded yet
+        self.commit_mtime = commit_mtime
+        # Key: revision, value: timestamp of the commit
+        self._commit_times: Dict[str, float] = {}
         logger.debug("__init__")
-        self.rwlock = Lock()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the performance counters of the mount: the ones of the filesystem
+        (see :func:`DagsHubFilesystem.stats() <dagshub.streaming.DagsHubFilesystem.stats>`),
+        plus the statistics of the block cache and of the files that are being read block by block.
+        """
+        res = self.fs.stats()
+        res["counters"]["shared_lazy_opens"] = self._lazy_open_flight.shared_calls
+        with self._lazy_lock:
+            res["counters"]["lazy_open_files"] = len(self._lazy_files)
+        res["block_cache"] = self.block_cache.stats()
+        return res
 
     def __call__(self, op, path, *args):
         return super(DagsHubFUSE, self).__call__(op, self.fs.project_root / path[1:], *args)
@@ -84,7 +148,7 @@ class DagsHubFUSE(LoggingMixIn, Operations):
         except FileNotFoundError:
             return False
 
-    def open(self, path, flags):
+    def open(self, path, fi):
         """
         NOTE: This is a wrapper function for python's built-in file operations
             (https://docs.python.org/3/library/functions.html#open)
@@ -94,26 +158,72 @@ class DagsHubFUSE(LoggingMixIn, Operations):
         Args:
             path (Union[str, int, bytes]): The path of the file to open.
                 It can be a path (str), file descriptor (int), or bytes-like object.
-            flags (int): The flags for opening the file.
+            fi (fuse_file_info): Info of the file that is being opened,
+                the file descriptor of the opened file gets set in it.
 
         Raises:
             FuseOSError: If an error occurs while opening the file, a FuseOSError is raised.
 
-        Returns:
-            int: The file descriptor for the opened file.
-
         """
-        logger.debug(f"open - path: {path}, flags: {flags}")
+        logger.debug(f"open - path: {path}, flags: {fi.flags}")
+        if path == Path(self.fs.project_root / STATS_FILE):
+            fi.fh = next(self._lazy_fh_counter)
+            self._stats_snapshots[fi.fh] = (json.dumps(self.stats(), indent=2) + "\n").encode()
+            # The size in getattr is of an older snapshot, direct_io makes the kernel read until the end anyway
+            fi.direct_io = 1
+            return 0
+        fi.fh = self._open(path, fi.flags)
+        fi.keep_cache = int(self.kernel_cache and not self.fs._parse_path(path).is_storage_path)
+        return 0
+
+    def _open(self, path, flags) -> int:
         if path == Path(self.fs.project_root / SPECIAL_FILE):
             return SPECIAL_FILE_FH
+        if not flags & WRITE_FLAGS:
+            try:
+                return os.open(path, flags)
+            except FileNotFoundError:
+                pass
+            parsed_path = self.fs._parse_path(path)
+            # Files that can be downloaded straight from the bucket are faster to get in full
+            if (
+                parsed_path.is_in_repo
+                and not parsed_path.is_passthrough_path
+                and self.fs._bucket_object(parsed_path) is None
+            ):
+                return self._open_lazy(parsed_path)
         try:
             self.fs.open(path).close()
         except FileNotFoundError:
             raise FuseOSError(errno.ENOENT)
         logger.debug("finished fs.open")
-        return os.open(self.fs._relative_path(path), flags, dir_fd=self.fs.project_root_fd)
+        if flags & WRITE_FLAGS and self.fs.object_store is not None:
+            # Don't let writes go through to the shared object
+            ContentAddressedStore.unshare(path)
+        return os.open(path, flags)
 
-    def getattr(self, path, fd=None):
+    def _open_lazy(self, path) -> int:
+        """
+        Opens a remote file for reading without downloading it. All handles of the same file share the blocks
+        """
+        with self._lazy_lock:
+            lazy_file, handles = self._lazy_files.get(path.absolute_path, (None, 0))
+        if lazy_file is None:
+            try:
+                lazy_file = self._lazy_open_flight.do(
+                    path.absolute_path,
+                    lambda: BlockCachedFile(self.fs, path, self.block_cache, block_size=self.block_size),
+                )
+            except FileNotFoundError:
+                raise FuseOSError(errno.ENOENT)
+        with self._lazy_lock:
+            lazy_file, handles = self._lazy_files.get(path.absolute_path, (lazy_file, 0))
+            self._lazy_files[path.absolute_path] = (lazy_file, handles + 1)
+            fh = next(self._lazy_fh_counter)
+            self._lazy_handles[fh] = path.absolute_path
+        return fh
+
+    def getattr(self, path, fi=None):
         """
         NOTE: This is a wrapper function for python's built-in file operations
             (https://docs.python.org/3/library/functions.html#getattr)
@@ -123,15 +233,16 @@ class DagsHubFUSE(LoggingMixIn, Operations):
         Args:
             path (Union[str, int, bytes]): The path to the file or directory.
                 It can be a path (str), file descriptor (int), or bytes-like object.
-            fd (int, optional): An optional file descriptor. Defaults to None.
+            fi (fuse_file_info, optional): Info of the file if it's open. Defaults to None.
 
         Raises:
             FuseOSError: If the file or directory does not exist, a FuseOSError is raised.
 
         """
+        fd = fi.fh if fi is not None else None
         logger.debug(f"getattr - path:{str(path)}, fd:{fd}")
         try:
-            if fd:
+            if fd is not None and fd < LAZY_FH_START:
                 logger.debug("with __stat")
                 st = self.fs._DagsHubFilesystem__stat(fd)
             else:
@@ -139,24 +250,17 @@ class DagsHubFUSE(LoggingMixIn, Operations):
                 st = self.fs.stat(path)
 
             logger.debug(f"st: {st}")
-            return {
-                key: getattr(st, key)
-                for key in (
-                    "st_atime",
-                    "st_ctime",
-                    "st_gid",
-                    "st_mode",
-                    "st_mtime",
-                    # 'st_nlink',
-                    "st_size",
-                    "st_uid",
-                )
-            }
+            attrs = {key: getattr(st, key) for key in STAT_KEYS}
+            # Files that weren't downloaded yet have no times of their own
+            if self.commit_mtime and isinstance(st, dagshub_stat_result) and st._remote_path is not None:
+                if not st._remote_path.is_storage_path:
+                    attrs["st_atime"] = attrs["st_mtime"] = attrs["st_ctime"] = self._commit_time()
+            return attrs
         except FileNotFoundError:
             logger.debug("FileNotFound")
             raise FuseOSError(errno.ENOENT)
 
-    def read(self, path, size, offset, fh):
+    def read(self, path, size, offset, fi):
         """
          NOTE: This is a wrapper function for python's built-in file operations
             (https://docs.python.org/3/library/os.html#os.read)
@@ -168,15 +272,20 @@ class DagsHubFUSE(LoggingMixIn, Operations):
                 file descriptor (int), or bytes-like object.
             size (int): The size of data to read.
             offset (int): The offset in the file.
-            fh (int): The file descriptor.
+            fi (fuse_file_info): Info of the open file.
 
         """
+        fh = fi.fh
         logger.debug(f"read - path: {path}, offset: {offset}, fh: {fh}")
         if fh == SPECIAL_FILE_FH:
             return self.fs._special_file()[offset : offset + size]
-        with self.rwlock:
-            os.lseek(fh, offset, 0)
-            return os.read(fh, size)
+        if fh in self._stats_snapshots:
+            return self._stats_snapshots[fh][offset : offset + size]
+        lazy_path = self._lazy_handles.get(fh)
+        if lazy_path is not None:
+            return self._lazy_files[lazy_path][0].read(size, offset)
+        # Positional reads don't touch the shared file offset, so reads can run in parallel without a lock
+        return os.pread(fh, size, offset)
 
     def readdir(self, path, fh):
         """
@@ -192,9 +301,33 @@ class DagsHubFUSE(LoggingMixIn, Operations):
 
         """
         logger.debug(f"readdir - path: {path}, fh: {fh}")
+        self._prefetch_sizes(path)
         return [".", ".."] + self.fs.listdir(path)
 
-    def release(self, path, fh):
+    def _prefetch_sizes(self, path):
+        """
+        Lists the remote directory with sizes. The listing is cached by the filesystem,
+        so stat-ing all the files of the directory afterwards (``ls -l``, ``find``) doesn't make more requests
+        """
+        parsed_path = self.fs._parse_path(path)
+        if not parsed_path.is_in_repo or parsed_path.is_passthrough_path:
+            return
+        self.fs._api_listdir(parsed_path, include_size=True)
+
+    def _commit_time(self) -> float:
+        revision = self.fs._current_revision
+        commit_time = self._commit_times.get(revision)
+        if commit_time is None:
+            try:
+                commit = self.fs._api.get_commit_info(revision)
+                commit_time = dateutil.parser.parse(commit.timestamp).timestamp()
+            except Exception:
+                logger.warning(f"Couldn't get the time of commit {revision}", exc_info=True)
+                commit_time = 0
+            self._commit_times[revision] = commit_time
+        return commit_time
+
+    def release(self, path, fi):
         """
         Release the resources associated with an open file.
 
@@ -202,8 +335,8 @@ class DagsHubFUSE(LoggingMixIn, Operations):
             path (Union[str, int, bytes]):
                 The path of the file.
                 It can be a path (str), file descriptor (int), or bytes-like object.
-            fh (int):
-                The file descriptor.
+            fi (fuse_file_info):
+                Info of the open file.
 
         Notes:
             - If the provided 'path' argument is an integer (file descriptor),
@@ -216,10 +349,27 @@ class DagsHubFUSE(LoggingMixIn, Operations):
             dh.release('file.txt', file_descriptor)
             ```
         """
+        fh = fi.fh
         logger.debug(f"release - path: {path}, fh: {fh}")
+        if fh in self._lazy_handles:
+            with self._lazy_lock:
+                lazy_path = self._lazy_handles.pop(fh)
+                lazy_file, handles = self._lazy_files[lazy_path]
+                if handles > 1:
+                    self._lazy_files[lazy_path] = (lazy_file, handles - 1)
+                    return
+                del self._lazy_files[lazy_path]
+            lazy_file.close()
+            return
+        if fh in self._stats_snapshots:
+            del self._stats_snapshots[fh]
+            return
         if fh != SPECIAL_FILE_FH:
             return os.close(fh)
 
+    def destroy(self, path):
+        self.block_cache.close()
+
 
 def mount(
     debug=False,
@@ -229,6 +379,11 @@ def mount(
     username: Optional[str] = None,
     password: Optional[str] = None,
     token: Optional[str] = None,
+    block_cache_bytes: Optional[int] = None,
+    attr_timeout: float = DEFAULT_ATTR_TIMEOUT,
+    entry_timeout: float = DEFAULT_ATTR_TIMEOUT,
+    kernel_cache: bool = True,
+    commit_mtime: bool = False,
 ):
     """
     Mount a DagsHubFUSE filesystem.
@@ -243,6 +398,19 @@ def mount(
         username (Optional[str], optional): The username for authentication. Defaults to None.
         password (Optional[str], optional): The password for authentication. Defaults to None.
         token (Optional[str], optional): The token for authentication. Defaults to None.
+        block_cache_bytes (Optional[int], optional): Budget for the on-disk cache of blocks of files
+            that are being read without being downloaded.
+            Files are only stored whole once all of their blocks were read.
+            Defaults to the ``DAGSHUB_STREAMING_BLOCK_CACHE_BYTES`` environment variable (2 GiB).
+        attr_timeout (float, optional): Number of seconds the kernel caches the attributes of files and directories.
+            Defaults to 60.
+        entry_timeout (float, optional): Number of seconds the kernel caches the names in directories.
+            Defaults to 60.
+        kernel_cache (bool, optional): Let the kernel keep the content of files in its page cache between opens.
+            Only applies to the files of the repository, files of connected storage buckets can change.
+            Defaults to True.
+        commit_mtime (bool, optional): Report the time of the mounted commit as the modification time
+            of files that weren't downloaded yet, instead of 0. Defaults to False.
 
     Notes:
         - If the 'debug' parameter is True, the filesystem is run in the foreground with debug logging.
@@ -255,13 +423,35 @@ def mount(
     """
     logging.basicConfig(level=logging.DEBUG)
     fuse = DagsHubFUSE(
-        project_root=project_root, repo_url=repo_url, branch=branch, username=username, password=password, token=token
+        project_root=project_root,
+        repo_url=repo_url,
+        branch=branch,
+        username=username,
+        password=password,
+        token=token,
+        block_cache_bytes=block_cache_bytes,
+        attr_timeout=attr_timeout,
+        entry_timeout=entry_timeout,
+        kernel_cache=kernel_cache,
+        commit_mtime=commit_mtime,
     )
     rich_console.print(
-        f"Mounting DagsHubFUSE filesystem at {fuse.fs.project_root}\n"
+        f"Mounting DagsHubFUSE filesystem at {fuse.mountpoint}\n"
         f"Run `cd .` in any existing terminals to utilize mounted FS."
     )
-    FUSE(fuse, str(fuse.fs.project_root), foreground=debug, nonempty=True)
+    # Requests are handled in multiple threads, so readers of different files (e.g. DataLoader workers) don't wait
+    # for each other
+    # raw_fi gives open() access to keep_cache
+    FUSE(
+        fuse,
+        str(fuse.mountpoint),
+        foreground=debug,
+        nonempty=True,
+        nothreads=False,
+        raw_fi=True,
+        attr_timeout=fuse.attr_timeout,
+        entry_timeout=fuse.entry_timeout,
+    )
     if not debug:
         os.chdir(os.path.realpath(os.curdir))
     # TODO: Clean unmounting procedure
@@ -0,0 +1,55 @@
+import threading
+import time
+from pathlib import PurePosixPath
+from typing import Dict, Tuple
+
+
+class NegativeLookupCache:
+    """
+    Remembers the paths that don't exist on the remote, so they're not looked up again until the TTL runs out.
+
+    Entries are scoped by revision. A missing directory also means that everything under it is missing.
+
+    Args:
+        ttl: Number of seconds a missing path is remembered for. If 0, nothing is remembered
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # Key: (revision, path), value: monotonic time after which the entry expires
+        self._entries: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        # Number of remote lookups that didn't have to be done, because the path was known to be missing
+        self.saved_lookups = 0
+
+    def add(self, revision: str, path: PurePosixPath):
+        # The root missing would mean that everything is missing, that's not something to cache
+        if self.ttl <= 0 or path == PurePosixPath("."):
+            return
+        with self._lock:
+            self._entries[(revision, path.as_posix())] = time.monotonic() + self.ttl
+
+    def is_missing(self, revision: str, path: PurePosixPath) -> bool:
+        """
+        Checks whether the path or any of its parent directories is known to be missing.
+        A positive answer counts as a saved lookup.
+        """
+        if not self._entries:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            for p in (path, *path.parents):
+                key = (revision, p.as_posix())
+                expires_at = self._entries.get(key)
+                if expires_at is None:
+                    continue
+                if expires_at < now:
+                    del self._entries[key]
+                    continue
+                self.saved_lookups += 1
+                return True
+        return False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import os
+import re
+import secrets
+import shutil
+import stat
+from pathlib import Path
+from typing import Optional, Union
+
+from dagshub.common.api.responses import ContentAPIEntry
+
+logger = logging.getLogger(__name__)
+
+hash_regex = re.compile(r"^[0-9a-f]{32,64}$")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ContentHasher:
+    """
+    Hashes the content of a file while it's being downloaded, to check that it matches the key of the object.
+
+    DVC keys are md5 of the content, so it's hashed as it streams in.
+    Git blob hashes start with the size of the content, so they're computed from the written file instead.
+    """
+
+    def __init__(self, key: str):
+        self.versioning, self.expected = key.split("/")
+        self._md5 = hashlib.md5() if self.versioning == "dvc" else None
+
+    def update(self, chunk: bytes):
+        if self._md5 is not None:
+            self._md5.update(chunk)
+
+    def matches(self, written_path: Path) -> bool:
+        if self._md5 is not None:
+            return self._md5.hexdigest() == self.expected
+        size = os.stat(written_path).st_size
+        blob_hash = hashlib.sha1() if len(self.expected) == 40 else hashlib.sha256()
+        blob_hash.update(f"blob {size}\0".encode())
+        with open(written_path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                blob_hash.update(chunk)
+        return blob_hash.hexdigest() == self.expected
+
+
+class ContentAddressedStore:
+    """
+    Machine-wide store of downloaded file contents, keyed by their content hash.
+
+    Filesystems that have the same object (e.g. different revisions of the same repo,
+    or repos sharing DVC-tracked data) download it once into the store,
+    and then hardlink it into their project roots.
+    If hardlinks aren't possible (e.g. the store is on a different device), the object is copied instead.
+
+    Only content that matches its hash gets added, and stored objects are read-only,
+    so writing to a hardlinked file can't change the object for everyone else.
+
+    Args:
+        location: Directory where the objects are stored
+    """
+
+    def __init__(self, location: Union[str, "os.PathLike[str]"]):
+        self.location = Path(location)
+
+    @staticmethod
+    def key_for_entry(entry: ContentAPIEntry) -> Optional[str]:
+        """
+        Returns the key of the object described by the listing entry,
+        or None if the entry doesn't have a hash that can be relied on
+        """
+        if entry.type != "file" or entry.versioning not in ("dvc", "git"):
+            return None
+        if entry.hash is None or not hash_regex.match(entry.hash):
+            return None
+        # DVC md5 and git blob sha hash the content differently, so keep them apart
+        return f"{entry.versioning}/{entry.hash}"
+
+    def object_path(self, key: str) -> Path:
+        algo, content_hash = key.split("/")
+        return self.location / algo / content_hash[:2] / content_hash[2:]
+
+    def has(self, key: str) -> bool:
+        return self.object_path(key).is_file()
+
+    def add(self, key: str, source: Path):
+        """
+        Adds the file as the object with the key, by hardlinking it into the store (or copying it).
+        The object is made read-only, which also makes the hardlinked source read-only
+        """
+        obj = self.object_path(key)
+        os.makedirs(obj.parent, exist_ok=True)
+        tmp_path = obj.parent / f".{obj.name}.{secrets.token_hex(8)}.dagshub-link"
+        try:
+            try:
+                os.link(source, tmp_path)
+            except OSError as e:
+                logger.debug(f"Couldn't hardlink {source} into the store, copying it instead: {e}")
+                shutil.copyfile(source, tmp_path)
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, obj)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def link(self, key: str, destination: Path):
+        """
+        Atomically places the object at the destination, replacing anything that was there
+        """
+        tmp_path = destination.parent / f".{destination.name}.{secrets.token_hex(8)}.dagshub-link"
+        obj = self.object_path(key)
+        try:
+            try:
+                os.link(obj, tmp_path)
+            except OSError as e:
+                logger.debug(f"Couldn't hardlink {obj} to {destination}, copying it instead: {e}")
+                shutil.copyfile(obj, tmp_path)
+            os.replace(tmp_path, destination)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def unshare(path: Path):
+        """
+        Replaces a hardlinked file with its own writable copy, so writing to it doesn't change the stored object
+        """
+        try:
+            st = os.lstat(path)
+        except FileNotFoundError:
+            return
+        if st.st_nlink <= 1:
+            return
+        tmp_path = path.parent / f".{path.name}.{secrets.token_hex(8)}.dagshub-link"
+        try:
+            shutil.copy2(path, tmp_path)
+            os.chmod(tmp_path, stat.S_IMODE(st.st_mode) | stat.S_IWUSR)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
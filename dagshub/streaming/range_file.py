@@ -0,0 +1,251 @@
+import io
+import logging
+import re
+from collections import OrderedDict
+from typing import Optional, Tuple, TYPE_CHECKING
+
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential, before_sleep_log
+
+from dagshub.streaming.dataclasses import DagshubPath
+
+if TYPE_CHECKING:
+    from dagshub.streaming.filesystem import DagsHubFilesystem
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+DEFAULT_READAHEAD_BLOCKS = 4
+DEFAULT_MAX_CACHED_BLOCKS = 32
+
+content_range_regex = re.compile(r"bytes (?:\d+-\d+|\*)/(?P<size>\d+)")
+
+
+class _ServerError(Exception):
+    pass
+
+
+class RangesNotSupported(Exception):
+    """
+    Raised when the server answered a range request with the whole file.
+    By the time it's raised, the file was already downloaded into the project root.
+    """
+
+
+class DagsHubRangeFile(io.RawIOBase):
+    """
+    Read-only seekable file object that fetches the content of a remote file on demand,
+    using HTTP ``Range`` requests.
+
+    The file is split into blocks of ``block_size`` bytes, recently read blocks are kept in an LRU cache.
+    When reads are sequential, ``readahead_blocks`` additional blocks are fetched in the same request.
+
+    If the server ignores the ``Range`` header, the whole file gets downloaded into the project root instead,
+    and all the reads are served from the local file.
+
+    Use :func:`DagsHubFilesystem.open_lazy() <dagshub.streaming.DagsHubFilesystem.open_lazy>` to create these.
+    """
+
+    def __init__(
+        self,
+        fs: "DagsHubFilesystem",
+        path: DagshubPath,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        readahead_blocks: int = DEFAULT_READAHEAD_BLOCKS,
+        max_cached_blocks: int = DEFAULT_MAX_CACHED_BLOCKS,
+    ):
+        super().__init__()
+        self._fs = fs
+        self._path = path
+        self._url = fs._raw_url_for_path(path)
+        self.block_size = block_size
+        self.readahead_blocks = readahead_blocks
+        self.max_cached_blocks = max(max_cached_blocks, readahead_blocks + 1)
+
+        self._pos = 0
+        self._size: Optional[int] = None
+        self._blocks: "OrderedDict[int, bytes]" = OrderedDict()
+        self._last_block: Optional[int] = None
+        self._local_file: Optional[io.BufferedReader] = None
+
+        # Fetch the first block right away: gets the size of the file and checks that ranges are supported
+        self._load_blocks(0, 1)
+
+    @property
+    def name(self):
+        return str(self._path.original_path)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def is_local(self) -> bool:
+        """
+        Whether the file got fully downloaded, because the server didn't support ranges
+        """
+        return self._local_file is not None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if self._local_file is not None:
+            self._pos = self._local_file.seek(offset, whence)
+            return self._pos
+        if whence == io.SEEK_SET:
+            new_pos = offset
+        elif whence == io.SEEK_CUR:
+            new_pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            new_pos = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if new_pos < 0:
+            raise OSError(f"Negative seek position {new_pos}")
+        self._pos = new_pos
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def readinto(self, b) -> int:
+        if self._local_file is not None:
+            self._local_file.seek(self._pos)
+            n = self._local_file.readinto(b)
+            self._pos += n
+            return n
+
+        to_read = min(len(b), self._size - self._pos)
+        if to_read <= 0:
+            return 0
+        first_block = self._pos // self.block_size
+        last_block = (self._pos + to_read - 1) // self.block_size
+        # Don't read more than fits into the cache in one go, otherwise blocks get evicted before being copied
+        max_last_block = first_block + self.max_cached_blocks - self.readahead_blocks - 1
+        if last_block > max_last_block:
+            last_block = max_last_block
+            to_read = (last_block + 1) * self.block_size - self._pos
+        if first_block in self._blocks:
+            # Short reads are allowed, so serve whatever is cached contiguously instead of fetching more
+            cached_until = first_block
+            while cached_until < last_block and cached_until + 1 in self._blocks:
+                cached_until += 1
+            last_block = cached_until
+            to_read = min(to_read, (last_block + 1) * self.block_size - self._pos)
+        else:
+            self._ensure_blocks(first_block, last_block)
+            if self._local_file is not None:
+                # Fell back to the full download while fetching
+                return self.readinto(b)
+
+        view = memoryview(b)
+        written = 0
+        for block_idx in range(first_block, last_block + 1):
+            block = self._blocks[block_idx]
+            self._blocks.move_to_end(block_idx)
+            start = (self._pos + written) - block_idx * self.block_size
+            chunk = block[start : start + to_read - written]
+            view[written : written + len(chunk)] = chunk
+            written += len(chunk)
+        self._pos += written
+        self._last_block = last_block
+        return written
+
+    def _ensure_blocks(self, first_block: int, last_block: int):
+        missing = [i for i in range(first_block, last_block + 1) if i not in self._blocks]
+        if not missing:
+            return
+        fetch_from = missing[0]
+        fetch_to = missing[-1]
+        is_sequential = self._last_block is not None and first_block in (self._last_block, self._last_block + 1)
+        if is_sequential:
+            num_blocks = (self._size + self.block_size - 1) // self.block_size
+            fetch_to = min(fetch_to + self.readahead_blocks, num_blocks - 1)
+        self._load_blocks(fetch_from, fetch_to - fetch_from + 1)
+
+    def _load_blocks(self, first_block: int, num_blocks: int):
+        start = first_block * self.block_size
+        end = start + num_blocks * self.block_size
+        if self._size is not None:
+            end = min(end, self._size)
+        try:
+            data = self._fetch_range(start, end)
+        except RangesNotSupported:
+            logger.debug(f"Server doesn't support range requests for {self._path.relative_path}, downloaded the file")
+            self._blocks.clear()
+            self._local_file = self._fs._DagsHubFilesystem__open(self._path.absolute_path, "rb")
+            self._size = self._local_file.seek(0, io.SEEK_END)
+            return
+        for i in range(0, len(data), self.block_size):
+            self._blocks[first_block + i // self.block_size] = data[i : i + self.block_size]
+        while len(self._blocks) > self.max_cached_blocks:
+            self._blocks.popitem(last=False)
+
+    def _fetch_range(self, start: int, end: int) -> bytes:
+        data, size = fetch_range(self._fs, self._path, self._url, start, end)
+        if size is not None:
+            self._size = size
+        return data
+
+    def close(self):
+        if self._local_file is not None:
+            self._local_file.close()
+        self._blocks.clear()
+        super().close()
+
+    def __repr__(self):
+        return f"<DagsHubRangeFile '{self._path.relative_path}' size={self._size}>"
+
+
+@retry(
+    retry=retry_if_exception_type(_ServerError),
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=4, max=10),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+)
+def fetch_range(
+    fs: "DagsHubFilesystem", path: DagshubPath, url: str, start: int, end: int
+) -> Tuple[bytes, Optional[int]]:
+    """
+    Fetches the bytes ``[start, end)`` of the remote file.
+    Returns the data and the size of the whole file.
+
+    Raises :class:`RangesNotSupported` if the server sent the whole file instead, or a partial response
+    without ``Content-Range``, after storing the file in the project root
+    """
+    headers = {"Range": f"bytes={start}-{end - 1}"}
+    with fs._stats.track("range_request"), fs.http_stream(url, headers=headers) as resp:
+        if resp.status_code == 206:
+            match = content_range_regex.match(resp.headers.get("Content-Range", ""))
+            if match is not None:
+                data = resp.read()
+                fs._stats.incr("bytes_downloaded", len(data))
+                return data, int(match.group("size"))
+        elif resp.status_code == 416:
+            # Range starts after the end of the file, happens for empty files
+            match = content_range_regex.match(resp.headers.get("Content-Range", ""))
+            return b"", int(match.group("size")) if match is not None else 0
+        elif resp.status_code == 200:
+            fs._store_downloaded_file(path, fs._count_downloaded_bytes(resp.iter_bytes(DEFAULT_BLOCK_SIZE)))
+            raise RangesNotSupported()
+        elif resp.status_code == 404:
+            raise FileNotFoundError(f"Error finding {path.relative_path} in repo or on DagsHub")
+        elif resp.status_code >= 500:
+            raise _ServerError(f"Got response code {resp.status_code} while reading {path.relative_path}")
+        else:
+            raise RuntimeError(
+                f"Got response code {resp.status_code} from DagsHub while reading file {path.relative_path}"
+            )
+    # Partial response without Content-Range: the size of the file is unknown, so download it whole
+    logger.debug(f"Got a partial response without Content-Range for {path.relative_path}, downloading the file")
+    full_resp = fs._download_file(path)
+    if full_resp.status_code == 404:
+        raise FileNotFoundError(f"Error finding {path.relative_path} in repo or on DagsHub")
+    elif full_resp.status_code >= 400:
+        raise RuntimeError(
+            f"Got response code {full_resp.status_code} from DagsHub while downloading file {path.relative_path}"
+        )
+    raise RangesNotSupported()
@@ -0,0 +1,163 @@
+import bisect
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from dagshub.streaming.dataclasses import DagshubPath
+
+if TYPE_CHECKING:
+    from dagshub.streaming.filesystem import DagsHubFilesystem
+
+logger = logging.getLogger(__name__)
+
+
+class ReadAheadPolicy:
+    """
+    Detects files of a directory being opened in sorted order,
+    and downloads the next files of that directory in the background.
+
+    Only directories which listings are already cached are considered, this never makes listing requests.
+
+    Args:
+        fs: Filesystem for which the files are downloaded
+        depth: How many of the next files to download once sequential access is detected
+        max_queued: Maximum number of read-ahead downloads that can be queued or running at once.
+            Defaults to ``2 * depth``
+        workers: Number of threads doing the downloads
+    """
+
+    def __init__(
+        self,
+        fs: "DagsHubFilesystem",
+        depth: int,
+        max_queued: Optional[int] = None,
+        workers: Optional[int] = None,
+    ):
+        self._fs = fs
+        self.depth = depth
+        self.max_queued = max_queued or 2 * depth
+        self.workers = workers or min(depth, 8)
+        # Created on first use, and again after shutdown(), the filesystem can be used after cleanup()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Key: directory, value: index of the last opened file in the sorted list of files
+        self._last_index: Dict[str, int] = {}
+        # Key: directory, value: (listing it was generated from, sorted names of files)
+        self._sorted_files: Dict[str, Tuple[int, List[str]]] = {}
+        # Files that are being downloaded by the read-ahead right now
+        self._queued: Set[Path] = set()
+        # Files that were read ahead, but weren't opened yet
+        self._read_ahead: Set[Path] = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.failed = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the read-ahead statistics:
+
+        - ``hits`` - opened files that were already read ahead (or were being read ahead at the time)
+        - ``misses`` - opened files that had to be downloaded on the spot
+        - ``prefetched`` - files downloaded by the read-ahead
+        - ``failed`` - read-ahead downloads that failed
+        - ``unused`` - files downloaded by the read-ahead which weren't opened yet
+        - ``queued`` - read-ahead downloads that are queued or running right now
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "prefetched": self.prefetched,
+                "failed": self.failed,
+                "unused": len(self._read_ahead - self._queued),
+                "queued": len(self._queued),
+            }
+
+    def on_open(self, path: DagshubPath, was_local: bool):
+        """
+        Records that a file is being opened for reading, and schedules read-ahead if the access is sequential.
+
+        Args:
+            path: Path of the opened file
+            was_local: Whether the file already existed on disk before the open
+        """
+        parent = path.relative_path.parent
+        parent_str = parent.as_posix()
+        files = self._get_sorted_files(parent_str)
+
+        with self._lock:
+            if path.absolute_path in self._read_ahead:
+                self._read_ahead.discard(path.absolute_path)
+                self.hits += 1
+            elif not was_local:
+                self.misses += 1
+
+            if files is None:
+                return
+            idx = bisect.bisect_left(files, path.name)
+            if idx >= len(files) or files[idx] != path.name:
+                return
+            last_idx = self._last_index.get(parent_str)
+            self._last_index[parent_str] = idx
+            if last_idx is None or not (last_idx < idx <= last_idx + self.depth):
+                return
+
+            to_fetch = []
+            for name in files[idx + 1 : idx + 1 + self.depth]:
+                if len(self._queued) >= self.max_queued:
+                    break
+                sibling = DagshubPath(
+                    self._fs,
+                    path.absolute_path.parent / name,
+                    path.relative_path.parent / name,
+                    path.original_path.parent / name,
+                )
+                if sibling.absolute_path in self._queued or sibling.absolute_path in self._read_ahead:
+                    continue
+                self._queued.add(sibling.absolute_path)
+                self._read_ahead.add(sibling.absolute_path)
+                to_fetch.append(sibling)
+            if to_fetch and self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="dagshub-readahead")
+            # Submitted under the lock, so a concurrent shutdown() can't shut the executor down in between
+            futures = [(sibling, self._executor.submit(self._fs._prefetch_file, sibling)) for sibling in to_fetch]
+
+        # A future that is already done runs the callback right away, and the callback takes the lock
+        for sibling, future in futures:
+            future.add_done_callback(lambda f, p=sibling: self._on_done(p, f))
+
+    def _on_done(self, path: DagshubPath, future: Future):
+        with self._lock:
+            self._queued.discard(path.absolute_path)
+            exc = future.exception() if not future.cancelled() else None
+            if future.cancelled() or exc is not None:
+                self.failed += 1
+                self._read_ahead.discard(path.absolute_path)
+                if exc is not None:
+                    logger.debug(f"Read-ahead of {path.relative_path} failed: {exc}")
+            elif future.result():
+                self.prefetched += 1
+            else:
+                # File was already on disk, nothing was read ahead
+                self._read_ahead.discard(path.absolute_path)
+
+    def _get_sorted_files(self, dir_path: str) -> Optional[List[str]]:
+        listing, hit = self._fs._check_listdir_cache(dir_path, include_size=False)
+        if not hit or listing is None:
+            return None
+        cached = self._sorted_files.get(dir_path)
+        if cached is not None and cached[0] == id(listing):
+            return cached[1]
+        files = sorted(Path(entry.path).name for entry in listing if entry.type == "file")
+        self._sorted_files[dir_path] = (id(listing), files)
+        return files
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
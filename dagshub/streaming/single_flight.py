@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Makes sure that only one call with the same key is running at a time.
+
+    The first caller for a key runs the function, callers that come in while it's still running
+    wait for it and get the same result (or the same exception) instead of running the function again.
+    Once the call finishes, the next call with the key runs the function anew.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        # Number of calls that waited for another call instead of running the function themselves
+        self.shared_calls = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.shared_calls += 1
+        if not is_owner:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AsyncSingleFlight(Generic[T]):
+    """
+    Same as :class:`SingleFlight`, but for coroutines running on one event loop
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future[T]"] = {}
+        self.shared_calls = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared_calls += 1
+            # Shielded, so a waiter getting cancelled doesn't cancel the call for everyone else
+            return await asyncio.shield(future)
+        future = asyncio.get_event_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved, the owner raises it anyway
+            future.exception()
+            raise
+        finally:
+            self._calls.pop(key, None)
@@ -0,0 +1,106 @@
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+# Durations are bucketed on a log scale, every bucket is ~19% wider than the previous one.
+# That keeps the percentiles within a few percent of the real value without storing every sample
+HISTOGRAM_MIN_SECONDS = 1e-4
+HISTOGRAM_GROWTH = 2 ** 0.25
+HISTOGRAM_BUCKETS = 96
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations with logarithmic buckets, for getting percentiles in constant memory.
+    Not thread-safe by itself, :class:`StreamingStats` guards it.
+    """
+
+    def __init__(self):
+        self._buckets: List[int] = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        if seconds <= HISTOGRAM_MIN_SECONDS:
+            index = 0
+        else:
+            index = int(math.log(seconds / HISTOGRAM_MIN_SECONDS, HISTOGRAM_GROWTH)) + 1
+        self._buckets[min(index, HISTOGRAM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p: float) -> float:
+        """
+        Returns the upper bound of the bucket which holds the ``p``-th percentile (0-100), capped by the maximum
+        """
+        if self.count == 0:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for index, amount in enumerate(self._buckets):
+            seen += amount
+            if seen >= rank:
+                return min(HISTOGRAM_MIN_SECONDS * HISTOGRAM_GROWTH**index, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class StreamingStats:
+    """
+    Counters and latency histograms of a streaming filesystem.
+
+    - Counters are increased with :func:`incr`
+    - :func:`track` times an operation into the histogram of the same name,
+      counts it in ``<name>_in_flight`` while it runs and in ``<name>_errors`` if it raises
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._histograms: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+
+    def incr(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        self.incr(f"{name}_in_flight")
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.incr(f"{name}_errors")
+            raise
+        finally:
+            duration = time.monotonic() - start
+            with self._lock:
+                self._counters[f"{name}_in_flight"] -= 1
+                self._histograms[name].record(duration)
+
+    def counter(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the counters, and for every tracked operation: count, mean, p50, p99 and max duration in seconds
+        """
+        with self._lock:
+            return {
+                "counters": dict(sorted(self._counters.items())),
+                "latency": {name: hist.summary() for name, hist in sorted(self._histograms.items())},
+            }
@@ -46,6 +46,8 @@ install_requires = [
 extras_require = {
     "jupyter": ["rich[jupyter]~=13.1.0"],
     "fuse": ["fusepy>=3"],
+    "http2": ["httpx[http2]~=0.23.0"],
+    "fsspec": ["fsspec>=2022.5.0"],
 }
 
 # Polyfills for Python 3.7
@@ -79,6 +81,9 @@ setuptools.setup(
     entry_points={
         "console_scripts": [
             "dagshub = dagshub.common.cli:cli"
-        ]
+        ],
+        "fsspec.specs": [
+            "dagshub = dagshub.streaming.fsspec_filesystem:DagsHubFsspecFileSystem"
+        ],
     }
 )
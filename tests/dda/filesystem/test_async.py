@@ -0,0 +1,156 @@
+import asyncio
+import os
+import threading
+
+import pytest
+from httpx import Response
+
+from dagshub.streaming import AsyncDagsHubFilesystem, DagsHubFilesystem
+
+
+def test_alistdir_and_aopen(mock_api, dagshub_repo):
+    mock_api.add_dir("data", [("a.txt", "file"), ("nested", "dir")])
+    mock_api.add_file("data/a.txt", b"content")
+
+    async def run():
+        async with AsyncDagsHubFilesystem() as afs:
+            listing = await afs.alistdir("data")
+            with await afs.aopen("data/a.txt", "rb") as f:
+                content = f.read()
+            return listing, content
+
+    listing, content = asyncio.run(run())
+    assert set(listing) == {"a.txt", "nested"}
+    assert content == b"content"
+    assert os.path.exists("data/a.txt")
+
+
+def test_astat_size_from_listing(mock_api, dagshub_repo):
+    entry = mock_api.generate_list_entry("data/a.txt")
+    entry["size"] = 1234
+    mock_api.route(url=f"{mock_api.api_list_path()}/data?include_size=true").mock(Response(200, json=[entry]))
+    file_route = mock_api.add_file("data/a.txt", b"content")
+
+    async def run():
+        async with AsyncDagsHubFilesystem() as afs:
+            return await afs.astat("data/a.txt")
+
+    assert asyncio.run(run()).st_size == 1234
+    assert not file_route.called
+
+
+def test_aopen_missing_file(mock_api, dagshub_repo):
+    mock_api.add_file("missing.txt", status=404)
+
+    async def run():
+        async with AsyncDagsHubFilesystem() as afs:
+            await afs.aopen("missing.txt")
+
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(run())
+
+
+def test_aprefetch_concurrent(mock_api, dagshub_repo):
+    contents = {f"data/{i}.txt": f"content {i}".encode() for i in range(50)}
+    routes = [mock_api.add_file(path, content) for path, content in contents.items()]
+    mock_api.add_file("data/missing.txt", status=404)
+    paths = list(contents) + ["data/missing.txt"]
+
+    fs = DagsHubFilesystem()
+
+    async def run():
+        async with AsyncDagsHubFilesystem(fs, max_concurrency=8) as afs:
+            # The same files requested multiple times at once are downloaded once
+            return await afs.aprefetch(paths + paths)
+
+    results = asyncio.run(run())
+    assert all(r.ok for r in results if r.path != "data/missing.txt")
+    assert all(isinstance(r.error, FileNotFoundError) for r in results if r.path == "data/missing.txt")
+    assert all(r.call_count == 1 for r in routes)
+    # Shares the caches with the sync filesystem
+    for path, content in contents.items():
+        with fs.open(path, "rb") as f:
+            assert f.read() == content
+
+
+def test_client_closed_with_its_loop(mock_api, dagshub_repo):
+    afs = AsyncDagsHubFilesystem()
+
+    async def get_client():
+        afs._ensure_loop_state()
+        return afs._client
+
+    first = asyncio.run(get_client())
+    assert first.is_closed
+    second = asyncio.run(get_client())
+    assert second is not first
+    assert second.is_closed
+
+
+def test_persistent_cache_used_off_loop(mock_api, dagshub_repo, tmp_path):
+    mock_api.add_dir("data", [("a.txt", "file")])
+    fs = DagsHubFilesystem(persistent_cache=str(tmp_path))
+    loop_thread = []
+    check = fs._check_listdir_cache
+
+    def check_listdir_cache(*args, **kwargs):
+        loop_thread.append(threading.current_thread())
+        return check(*args, **kwargs)
+
+    fs._check_listdir_cache = check_listdir_cache
+
+    async def run():
+        async with AsyncDagsHubFilesystem(fs) as afs:
+            return await afs.alistdir("data"), threading.current_thread()
+
+    listing, main_thread = asyncio.run(run())
+    assert "a.txt" in listing
+    assert loop_thread and main_thread not in loop_thread
+
+
+def test_object_store_and_missing_paths_handled_off_loop(mock_api, dagshub_repo, tmp_path):
+    mock_api.add_dir("data", [("a.txt", "file")])
+    mock_api.add_file("data/a.txt", b"content")
+    mock_api.add_dir("missing", status=404)
+    fs = DagsHubFilesystem(object_store=str(tmp_path / "objects"), persistent_cache=str(tmp_path / "cache"))
+    threads = {}
+
+    def record_thread(name):
+        fn = getattr(fs, name)
+
+        def wrapper(*args, **kwargs):
+            threads.setdefault(name, []).append(threading.current_thread())
+            return fn(*args, **kwargs)
+
+        setattr(fs, name, wrapper)
+
+    for name in ("_object_key", "_finish_download", "_check_listing_response"):
+        record_thread(name)
+
+    async def run():
+        async with AsyncDagsHubFilesystem(fs) as afs:
+            await afs.alistdir("data")
+            with await afs.aopen("data/a.txt", "rb") as f:
+                assert f.read() == b"content"
+            with pytest.raises(FileNotFoundError):
+                await afs.alistdir("missing")
+            return threading.current_thread()
+
+    loop_thread = asyncio.run(run())
+    assert set(threads) == {"_object_key", "_finish_download", "_check_listing_response"}
+    for name, called_from in threads.items():
+        assert loop_thread not in called_from, name
+
+
+def test_astat_size_missing_from_listing(mock_api, dagshub_repo):
+    entry = mock_api.generate_list_entry("data/a.txt")
+    entry["size"] = None
+    mock_api.route(url=f"{mock_api.api_list_path()}/data?include_size=true").mock(Response(200, json=[entry]))
+    mock_api.add_dir("data", [("a.txt", "file")])
+    mock_api.add_file("data/a.txt", b"content")
+
+    async def run():
+        async with AsyncDagsHubFilesystem() as afs:
+            return await afs.astat("data/a.txt")
+
+    assert asyncio.run(run()).st_size == len(b"content")
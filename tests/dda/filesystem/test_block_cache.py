@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+from dagshub.streaming import DagsHubFilesystem
+from dagshub.streaming.block_cache import BlockCache, BlockCachedFile
+
+
+@pytest.fixture
+def fs(mock_api):
+    fs = DagsHubFilesystem()
+    yield fs
+    fs.cleanup()
+
+
+@pytest.fixture
+def block_cache(tmp_path):
+    cache = BlockCache(tmp_path / "blocks", max_bytes=1024 * 1024)
+    yield cache
+    cache.close()
+
+
+def test_block_cache_evicts_least_recently_used(tmp_path):
+    cache = BlockCache(tmp_path, max_bytes=20)
+    cache.put("file", 0, b"a" * 10)
+    cache.put("file", 1, b"b" * 10)
+    assert cache.get("file", 0) == b"a" * 10
+    cache.put("file", 2, b"c" * 10)
+    assert cache.get("file", 1) is None
+    assert cache.get("file", 0) == b"a" * 10
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+    assert not cache.location.exists()
+
+
+def test_reads_only_requested_blocks(mock_api, fs, block_cache):
+    content = bytes(range(256)) * 64
+    route = mock_api.add_range_file("big.bin", content)
+    path = fs._parse_path("big.bin")
+    f = BlockCachedFile(fs, path, block_cache, block_size=1024, readahead_blocks=0)
+    assert f.size == len(content)
+    assert f.read(100, 5000) == content[5000:5100]
+    assert route.call_count == 2
+    assert route.calls.last.request.headers["Range"] == "bytes=4096-5119"
+    # Served from the block cache
+    assert f.read(100, 4200) == content[4200:4300]
+    assert route.call_count == 2
+    assert not os.path.exists(path.absolute_path)
+    f.close()
+
+
+def test_sequential_reads_fetch_ahead(mock_api, fs, block_cache):
+    content = os.urandom(10 * 1024)
+    route = mock_api.add_range_file("big.bin", content)
+    f = BlockCachedFile(fs, fs._parse_path("big.bin"), block_cache, block_size=1024, readahead_blocks=3)
+    assert f.read(1024, 0) == content[:1024]
+    assert f.read(1024, 1024) == content[1024:2048]
+    assert route.calls.last.request.headers["Range"] == "bytes=1024-5119"
+    for offset in range(2048, 5120, 1024):
+        assert f.read(1024, offset) == content[offset : offset + 1024]
+    assert route.call_count == 2
+    f.close()
+
+
+def test_file_materialized_after_all_blocks_read(mock_api, fs, block_cache):
+    content = os.urandom(4000)
+    mock_api.add_range_file("big.bin", content)
+    path = fs._parse_path("big.bin")
+    f = BlockCachedFile(fs, path, block_cache, block_size=1024, readahead_blocks=0)
+    for offset in (3072, 1024, 2048):
+        assert not f.is_local
+        f.read(1024, offset)
+    assert f.is_local
+    with open(path.absolute_path, "rb") as local:
+        assert local.read() == content
+    assert f.read(10, 3990) == content[3990:]
+    assert block_cache.stats()["blocks"] == 0
+    f.close()
+
+
+def test_file_bigger_than_cache_not_refetched(mock_api, fs, tmp_path):
+    content = os.urandom(4000)
+    route = mock_api.add_range_file("big.bin", content)
+    path = fs._parse_path("big.bin")
+    cache = BlockCache(tmp_path / "blocks", max_bytes=2048)
+    f = BlockCachedFile(fs, path, cache, block_size=1024, readahead_blocks=0)
+    for offset in (1024, 2048, 3072):
+        assert f.read(1024, offset) == content[offset : offset + 1024]
+    # The first blocks got evicted, so the file isn't assembled and nothing is downloaded again
+    assert not f.is_local
+    assert not os.path.exists(path.absolute_path)
+    assert route.call_count == 4
+    assert f.read(1024, 2048) == content[2048:3072]
+    f.close()
+    cache.close()
+
+
+def test_small_file_downloaded_right_away(mock_api, fs, block_cache):
+    mock_api.add_range_file("small.txt", b"hello")
+    path = fs._parse_path("small.txt")
+    f = BlockCachedFile(fs, path, block_cache, block_size=1024)
+    assert f.is_local
+    assert f.read(100, 0) == b"hello"
+    f.close()
+
+
+def test_missing_file(mock_api, fs, block_cache):
+    mock_api.add_file("missing.bin", status=404)
+    with pytest.raises(FileNotFoundError):
+        BlockCachedFile(fs, fs._parse_path("missing.bin"), block_cache)
@@ -0,0 +1,44 @@
+import pytest
+
+from dagshub.common import download
+
+
+@pytest.fixture
+def bucket_downloader():
+    calls = []
+
+    def get_fn(bucket, path):
+        calls.append((bucket, path))
+        return b"content from the bucket"
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(download._bucket_downloader_map, "s3", get_fn)
+        yield calls
+
+
+def test_storage_file_downloaded_from_bucket(mock_api, repo_with_hooks, bucket_downloader):
+    route = mock_api.add_file("a.txt", content=b"content from dagshub", is_storage=True)
+    with open(f".dagshub/storage/s3/{mock_api.storage_bucket_path}/a.txt", "rb") as f:
+        assert f.read() == b"content from the bucket"
+    bucket, prefix = mock_api.storage_bucket_path.split("/", 1)
+    assert bucket_downloader == [(bucket, f"{prefix}/a.txt")]
+    assert not route.called
+
+
+def test_falls_back_to_dagshub_when_bucket_fails(mock_api, repo_with_hooks):
+    def get_fn(bucket, path):
+        raise PermissionError("no access")
+
+    route = mock_api.add_file("a.txt", content=b"content from dagshub", is_storage=True)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(download._bucket_downloader_map, "s3", get_fn)
+        with open(f".dagshub/storage/s3/{mock_api.storage_bucket_path}/a.txt", "rb") as f:
+            assert f.read() == b"content from dagshub"
+    assert route.called
+
+
+def test_repo_files_not_downloaded_from_bucket(mock_api, repo_with_hooks, bucket_downloader):
+    mock_api.add_file("a.txt", content=b"content from dagshub")
+    with open("a.txt", "rb") as f:
+        assert f.read() == b"content from dagshub"
+    assert bucket_downloader == []
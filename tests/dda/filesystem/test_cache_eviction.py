@@ -0,0 +1,64 @@
+import os
+
+from dagshub.streaming import DagsHubFilesystem
+
+
+def setup_files(mock_api, num_files=4):
+    names = [f"{i}.bin" for i in range(num_files)]
+    mock_api.add_dir("data", [(name, "file") for name in names])
+    routes = {name: mock_api.add_file(f"data/{name}", b"0123456789") for name in names}
+    return names, routes
+
+
+def test_evicts_least_recently_used(mock_api, dagshub_repo):
+    names, routes = setup_files(mock_api)
+    fs = DagsHubFilesystem(max_cache_bytes=25)
+
+    for name in names[:2]:
+        fs.open(f"data/{name}", "rb").close()
+    # Touch the first file, so the second one is the least recently used
+    fs.open(f"data/{names[0]}", "rb").close()
+    fs.open(f"data/{names[2]}", "rb").close()
+
+    assert os.path.exists(f"data/{names[0]}")
+    assert not os.path.exists(f"data/{names[1]}")
+    assert os.path.exists(f"data/{names[2]}")
+    assert fs.local_cache.stats()["evictions"] == 1
+    assert fs.local_cache.total_bytes <= 25
+
+    # Evicted file is still listed and gets downloaded again
+    assert names[1] in fs.listdir("data")
+    with fs.open(f"data/{names[1]}", "rb") as f:
+        assert f.read() == b"0123456789"
+    assert routes[names[1]].call_count == 2
+    fs.cleanup()
+
+
+def test_doesnt_evict_modified_or_local_files(mock_api, dagshub_repo):
+    names, routes = setup_files(mock_api)
+    os.makedirs("data", exist_ok=True)
+    with open("data/local.bin", "wb") as f:
+        f.write(b"local file" * 10)
+    fs = DagsHubFilesystem(max_cache_bytes=15)
+
+    fs.open(f"data/{names[0]}", "rb").close()
+    with fs.open(f"data/{names[0]}", "ab") as f:
+        f.write(b"changed")
+    fs.open(f"data/{names[1]}", "rb").close()
+    fs.open(f"data/{names[2]}", "rb").close()
+
+    assert os.path.exists("data/local.bin")
+    assert os.path.exists(f"data/{names[0]}")
+    assert not os.path.exists(f"data/{names[1]}")
+    assert os.path.exists(f"data/{names[2]}")
+    fs.cleanup()
+
+
+def test_no_eviction_by_default(mock_api, dagshub_repo):
+    names, routes = setup_files(mock_api)
+    fs = DagsHubFilesystem()
+    for name in names:
+        fs.open(f"data/{name}", "rb").close()
+    assert all(os.path.exists(f"data/{name}") for name in names)
+    assert fs.local_cache.stats()["files"] == len(names)
+    fs.cleanup()
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+from httpx import Response
+
+import dagshub.auth
+from dagshub.auth.token_auth import HTTPBearerAuth
+
+pytest.importorskip("fsspec")
+
+from dagshub.streaming.fsspec_filesystem import DagsHubFsspecFileSystem  # noqa: E402
+
+
+@pytest.fixture
+def fs(mock_api):
+    fs = DagsHubFsspecFileSystem(token="token", skip_instance_cache=True)
+    yield fs
+
+
+@pytest.fixture
+def repo_prefix(mock_api):
+    return f"{mock_api.repourlpath}@{mock_api.current_revision}"
+
+
+def test_ls_with_sizes(mock_api, fs, repo_prefix):
+    mock_api.add_dir("testdir", [("a.txt", "file"), ("subdir", "dir")])
+    listing = fs.ls(f"dagshub://{repo_prefix}/testdir", detail=True)
+    assert {(e["name"], e["type"]) for e in listing} == {
+        (f"{repo_prefix}/testdir/a.txt", "file"),
+        (f"{repo_prefix}/testdir/subdir", "directory"),
+    }
+    assert fs.isdir(f"{repo_prefix}/testdir/subdir")
+    assert fs.isfile(f"{repo_prefix}/testdir/a.txt")
+
+
+def test_ls_missing(mock_api, fs, repo_prefix):
+    mock_api.add_dir("missing", status=404)
+    with pytest.raises(FileNotFoundError):
+        fs.ls(f"{repo_prefix}/missing")
+
+
+def test_root_lists_storages(mock_api, fs, repo_prefix):
+    mock_api.add_dir("", [("a.txt", "file")])
+    names = fs.ls(repo_prefix, detail=False)
+    assert f"{repo_prefix}/.dagshub" in names
+    assert fs.ls(f"{repo_prefix}/.dagshub/storage", detail=False) == [f"{repo_prefix}/.dagshub/storage/s3"]
+
+
+def test_ls_storage(mock_api, fs, repo_prefix):
+    url = f"{mock_api.api_storage_list_path}/testdir?include_size=true&paging=true"
+    mock_api.route(url=url + "&from_token=token1").mock(
+        Response(200, json={"entries": [mock_api.generate_list_entry("testdir/b.txt")], "limit": 1})
+    )
+    mock_api.route(url=url).mock(
+        Response(
+            200,
+            json={"entries": [mock_api.generate_list_entry("testdir/a.txt")], "limit": 1, "next_token": "token1"},
+        )
+    )
+    path = f"{repo_prefix}/.dagshub/storage/s3/{mock_api.storage_bucket_path}/testdir"
+    assert fs.ls(path, detail=False) == [f"{path}/a.txt", f"{path}/b.txt"]
+
+
+def test_cat_file_range(mock_api, fs, repo_prefix):
+    content = bytes(range(256)) * 4
+    mock_api.add_range_file("data.bin", content=content)
+    path = f"{repo_prefix}/data.bin"
+    assert fs.cat_file(path) == content
+    assert fs.cat_file(path, start=10, end=20) == content[10:20]
+    assert fs.cat_file(path, start=len(content) + 10) == b""
+
+
+def test_open_reads_ranges(mock_api, fs, repo_prefix):
+    content = b"0123456789" * 100
+    route = mock_api.add_range_file("data.bin", content=content)
+    mock_api.add_dir("", [("data.bin", "file")])
+    # The listing doesn't have the size of the file, so set it explicitly
+    with fs.open(f"{repo_prefix}/data.bin", block_size=100, cache_type="blockcache", size=len(content)) as f:
+        f.seek(500)
+        assert f.read(10) == content[500:510]
+    assert route.call_count == 1
+    assert route.calls.last.request.headers["Range"] == "bytes=500-599"
+
+
+def test_bulk_cat_and_get(mock_api, fs, repo_prefix, tmp_path):
+    files = {f"file{i}.txt": f"content{i}".encode() for i in range(5)}
+    for name, content in files.items():
+        mock_api.add_file(name, content=content)
+    paths = [f"{repo_prefix}/{name}" for name in files]
+    result = fs.cat(paths)
+    assert result == {f"{repo_prefix}/{name}": content for name, content in files.items()}
+
+    fs.get(paths, str(tmp_path) + "/")
+    for name, content in files.items():
+        assert (tmp_path / name).read_bytes() == content
+
+
+def test_write_not_supported(mock_api, fs, repo_prefix):
+    with pytest.raises(NotImplementedError):
+        fs.open(f"{repo_prefix}/new.txt", "wb")
+
+
+def test_auth_resolved_off_event_loop(mock_api, repo_prefix, monkeypatch):
+    on_loop = []
+
+    def get_authenticator(host=None):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return HTTPBearerAuth("token")
+
+    monkeypatch.setattr(dagshub.auth, "get_authenticator", get_authenticator)
+    mock_api.add_dir("testdir", [("a.txt", "file")])
+    fs = DagsHubFsspecFileSystem(skip_instance_cache=True)
+    assert fs.ls(f"{repo_prefix}/testdir", detail=False) == [f"{repo_prefix}/testdir/a.txt"]
+    assert on_loop == [False]
+
+
+def test_open_without_range_support_downloads_once(mock_api, fs, repo_prefix):
+    content = b"0123456789" * 100
+    route = mock_api.add_file("data.bin", content=content)
+    path = f"{repo_prefix}/data.bin"
+    assert fs.cat_file(path, start=10, end=20) == content[10:20]
+    route.reset()
+    with fs.open(path, block_size=100, cache_type="blockcache", size=len(content)) as f:
+        for offset in range(0, len(content), 100):
+            f.seek(offset)
+            assert f.read(10) == content[offset : offset + 10]
+    assert route.call_count == 1
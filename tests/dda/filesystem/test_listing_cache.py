@@ -0,0 +1,138 @@
+import os
+
+import pytest
+
+from dagshub.common import config
+from dagshub.common.api.responses import ContentAPIEntry
+from dagshub.streaming import DagsHubFilesystem
+from dagshub.streaming.listing_cache import PersistentListingCache
+
+
+@pytest.fixture
+def persistent_cache_location(tmp_path):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(config, "streaming_cache_location", str(tmp_path / "streaming-cache"))
+        yield tmp_path / "streaming-cache"
+
+
+def test_listing_survives_new_filesystem(mock_api, persistent_cache_location):
+    files = [("a.txt", "file"), ("b.txt", "file"), ("dir1", "dir")]
+    path = "testdir"
+    route = mock_api.add_dir(path, files)
+
+    fs = DagsHubFilesystem(persistent_cache=True)
+    assert set(fs.listdir(path)) == {f[0] for f in files}
+    fs.cleanup()
+    assert route.call_count == 1
+    root_calls = mock_api["list_root"].call_count
+
+    fs = DagsHubFilesystem(persistent_cache=True)
+    assert set(fs.listdir(path)) == {f[0] for f in files}
+    fs.cleanup()
+    assert route.call_count == 1
+    assert mock_api["list_root"].call_count == root_calls
+
+
+def test_listing_not_persisted_by_default(mock_api, persistent_cache_location):
+    path = "testdir"
+    route = mock_api.add_dir(path, [("a.txt", "file")])
+
+    for _ in range(2):
+        fs = DagsHubFilesystem()
+        fs.listdir(path)
+        fs.cleanup()
+
+    assert route.call_count == 2
+    assert not persistent_cache_location.exists()
+
+
+def test_storage_listings_are_not_persisted(mock_api, persistent_cache_location):
+    path = "testdir"
+    route = mock_api.add_storage_dir(path, [("a.txt", "file")])
+    storage_path = f".dagshub/storage/s3/{mock_api.storage_bucket_path}/{path}"
+
+    for _ in range(2):
+        fs = DagsHubFilesystem(persistent_cache=True)
+        fs.listdir(storage_path)
+        fs.cleanup()
+
+    assert route.call_count == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Needs fork()")
+def test_listing_shared_with_forked_process(mock_api, persistent_cache_location):
+    path = "testdir"
+    route = mock_api.add_dir(path, [("a.txt", "file")])
+    fs = DagsHubFilesystem(persistent_cache=True)
+    # Parent uses the cache before forking, so the child inherits an open connection
+    fs.listdir(".")
+
+    pid = os.fork()
+    if pid == 0:
+        # Child: fetches the listing and stores it for everyone
+        code = 0
+        try:
+            fs.listdir(path)
+        except BaseException:
+            code = 1
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+
+    # Child's requests don't go through the parent's mock, so check that the parent never asks the API
+    assert fs.listdir(path) == ["a.txt"]
+    assert not route.called
+
+
+def test_missing_paths_shared_between_filesystems(mock_api, persistent_cache_location):
+    route = mock_api.add_dir("missing", status=404)
+
+    fs = DagsHubFilesystem(persistent_cache=True)
+    assert fs._api_listdir(fs._parse_path("missing")) is None
+    fs.cleanup()
+
+    fs = DagsHubFilesystem(persistent_cache=True)
+    assert fs._api_listdir(fs._parse_path("missing")) is None
+    assert fs._api_listdir(fs._parse_path("missing"), include_size=True) is None
+    fs.cleanup()
+    assert route.call_count == 1
+
+
+def test_storage_listings_persisted_with_ttl(mock_api, persistent_cache_location):
+    path = "testdir"
+    route = mock_api.add_storage_dir(path, [("a.txt", "file")])
+    storage_path = f".dagshub/storage/s3/{mock_api.storage_bucket_path}/{path}"
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(config, "streaming_storage_listing_ttl", 60)
+        for _ in range(2):
+            fs = DagsHubFilesystem(persistent_cache=True)
+            assert fs.listdir(storage_path) == ["a.txt"]
+            fs.cleanup()
+
+    assert route.call_count == 1
+
+
+def test_persistent_cache_custom_location(mock_api, tmp_path):
+    mock_api.add_dir("testdir", [("a.txt", "file")])
+    location = tmp_path / "project-cache"
+    fs = DagsHubFilesystem(persistent_cache=location)
+    fs.listdir("testdir")
+    fs.cleanup()
+    assert any(location.iterdir())
+
+
+def test_listing_with_sizes_not_overwritten(tmp_path):
+    cache = PersistentListingCache(tmp_path)
+    sized = [ContentAPIEntry("a.txt", "file", 10, "hash", "dvc", "url", None)]
+    unsized = [ContentAPIEntry("a.txt", "file", None, "hash", "dvc", "url", None)]
+    cache.put("user/repo", "rev", "data", unsized, with_size=False)
+    cache.put("user/repo", "rev", "data", sized, with_size=True)
+    assert cache.get("user/repo", "rev", "data") == (sized, True)
+    cache.put("user/repo", "rev", "data", unsized, with_size=False)
+    assert cache.get("user/repo", "rev", "data") == (sized, True)
+    # Listings with a TTL can always be replaced
+    cache.put("user/repo", "rev", "bucket", sized, with_size=True, ttl=60)
+    cache.put("user/repo", "rev", "bucket", unsized, with_size=False, ttl=60)
+    assert cache.get("user/repo", "rev", "bucket") == (unsized, False)
@@ -3,6 +3,8 @@ import secrets
 import tempfile
 from unittest.mock import MagicMock
 
+from httpx import Response
+
 import pytest
 from pathlib import Path
 
@@ -60,3 +62,68 @@ def test_can_mount_multiple_in_different_dirs(mock_api):
     mock_api.get(url=f"/api/v1/repos/user/repo/content/{sha}/").mock(resp)
 
     _ = DagsHubFilesystem(project_root=other_path, repo_url="https://dagshub.com/user/repo", branch=new_branch)
+
+
+def test_http_client_is_reused(mock_api):
+    mock_api.add_dir("testdir", [("a.txt", "file")])
+    mock_api.add_file("testdir/a.txt")
+    fs = DagsHubFilesystem(max_connections=4)
+    client = fs._http_client
+    fs.listdir("testdir")
+    fs.open("testdir/a.txt").close()
+    assert fs._http_client is client
+    assert not client.is_closed
+
+    fs.cleanup()
+    assert client.is_closed
+
+
+def test_auth_is_resolved_once(mock_api):
+    for i in range(5):
+        mock_api.add_dir(f"dir{i}", [("a.txt", "file")])
+    fs = DagsHubFilesystem()
+    for i in range(5):
+        fs.listdir(f"dir{i}")
+    assert fs.auth_resolutions == 1
+
+
+def test_auth_is_resolved_again_on_401(mock_api):
+    route = mock_api.route(url=f"{mock_api.api_list_path()}/testdir")
+    route.side_effect = [
+        Response(401),
+        Response(200, json=[mock_api.generate_list_entry("testdir/a.txt")]),
+    ]
+    # Token validity check done by the authenticator on a 401
+    mock_api.get(url="/api/v1/user").mock(Response(200, json={}))
+    fs = DagsHubFilesystem()
+    assert fs.listdir("testdir") == ["a.txt"]
+    assert fs.auth_resolutions == 2
+    assert route.call_count == 2
+
+
+def test_parse_path_classification(mock_api, dagshub_repo, tmp_path):
+    fs = DagsHubFilesystem()
+    root = str(fs.project_root)
+
+    outside = fs._parse_path(str(tmp_path / "file.txt"))
+    assert not outside.is_in_repo
+
+    inside = fs._parse_path(os.path.join(root, "data", "file.txt"))
+    assert inside.is_in_repo
+    assert inside.relative_path == Path("data/file.txt")
+
+    # Paths that need normalization still end up in the repo
+    sneaky = fs._parse_path(str(tmp_path) + "/.." * len(tmp_path.parts) + root + "/data/file.txt")
+    assert sneaky.is_in_repo
+    assert sneaky.relative_path == Path("data/file.txt")
+    assert fs._parse_path(root).relative_path == Path(".")
+    assert not fs._parse_path(root + "-other/file.txt").is_in_repo
+
+    # Relative paths depend on the current directory, even though the results are memoized
+    assert fs._parse_path("file.txt").relative_path == Path("file.txt")
+    os.makedirs("data", exist_ok=True)
+    os.chdir("data")
+    try:
+        assert fs._parse_path("file.txt").relative_path == Path("data/file.txt")
+    finally:
+        os.chdir(root)
@@ -0,0 +1,213 @@
+import errno
+import json
+import os
+import sys
+import types
+from pathlib import Path
+
+import dateutil.parser
+import pytest
+from httpx import Response
+
+from dagshub.common import config, download
+
+
+class FuseOSError(OSError):
+    def __init__(self, err):
+        super().__init__(err, os.strerror(err))
+
+
+class Operations:
+    def __call__(self, op, *args):
+        if not hasattr(self, op):
+            raise FuseOSError(errno.EFAULT)
+        return getattr(self, op)(*args)
+
+
+class LoggingMixIn:
+    pass
+
+
+class FUSE:
+    """
+    Records the arguments instead of mounting
+    """
+
+    calls = []
+
+    def __init__(self, operations, mountpoint, **kwargs):
+        FUSE.calls.append((operations, mountpoint, kwargs))
+
+
+@pytest.fixture
+def mount_module(monkeypatch, tmp_path):
+    # libfuse isn't needed to test the operations, they're called directly
+    fuse = types.ModuleType("fuse")
+    fuse.FUSE = FUSE
+    fuse.FuseOSError = FuseOSError
+    fuse.LoggingMixIn = LoggingMixIn
+    fuse.Operations = Operations
+    monkeypatch.setitem(sys.modules, "fuse", fuse)
+    monkeypatch.delitem(sys.modules, "dagshub.streaming.mount", raising=False)
+    monkeypatch.setattr(config, "streaming_cache_location", str(tmp_path / "cache"))
+    FUSE.calls = []
+    import dagshub.streaming.mount as mount_module
+
+    yield mount_module
+    sys.modules.pop("dagshub.streaming.mount", None)
+
+
+@pytest.fixture
+def dh_fuse(mount_module, mock_api, dagshub_repo):
+    fuse = mount_module.DagsHubFUSE(project_root=dagshub_repo.workspace, block_size=4096)
+    yield fuse
+    fuse.destroy("/")
+    fuse.fs.cleanup()
+    os.close(fuse.project_root_fd)
+
+
+def file_info(flags=os.O_RDONLY):
+    return types.SimpleNamespace(flags=flags, fh=0, keep_cache=0, direct_io=0)
+
+
+def add_sized_dir(mock_api, path, files):
+    entries = []
+    for name, size in files.items():
+        entry = mock_api.generate_list_entry(os.path.join(path, name))
+        entry["size"] = size
+        entries.append(entry)
+    route = mock_api.route(url=f"{mock_api.api_list_path()}/{path}?include_size=true")
+    route.mock(Response(200, json=entries))
+    mock_api.add_dir(path, [(name, "file") for name in files])
+    return route
+
+
+def test_project_root_is_reached_through_fd(dh_fuse, dagshub_repo):
+    assert dh_fuse.mountpoint == Path(dagshub_repo.workspace)
+    assert dh_fuse.fs.project_root == Path(f"/proc/self/fd/{dh_fuse.project_root_fd}")
+    assert os.path.samefile(dh_fuse.fs.project_root, dagshub_repo.workspace)
+
+
+def test_local_file_read_with_pread(dh_fuse):
+    with open("local.txt", "wb") as f:
+        f.write(b"0123456789")
+    fi = file_info()
+    assert dh_fuse("open", "/local.txt", fi) == 0
+    assert fi.fh < (1 << 40)
+    assert fi.keep_cache == 1
+    assert dh_fuse("read", "/local.txt", 4, 6, fi) == b"6789"
+    assert dh_fuse("read", "/local.txt", 3, 0, fi) == b"012"
+    assert dh_fuse("getattr", "/local.txt", fi)["st_size"] == 10
+    dh_fuse("release", "/local.txt", fi)
+    with pytest.raises(OSError):
+        os.fstat(fi.fh)
+
+
+def test_remote_file_read_block_by_block(dh_fuse, mock_api):
+    content = os.urandom(10000)
+    route = mock_api.add_range_file("big.bin", content)
+    fi = file_info()
+    dh_fuse("open", "/big.bin", fi)
+    assert fi.fh >= (1 << 40)
+    assert dh_fuse("read", "/big.bin", 100, 5000, fi) == content[5000:5100]
+    assert all("Range" in call.request.headers for call in route.calls)
+    assert not os.path.exists("big.bin")
+    dh_fuse("release", "/big.bin", fi)
+    assert dh_fuse._lazy_files == {}
+
+
+def test_missing_file(dh_fuse, mock_api):
+    mock_api.add_file("missing.bin", status=404)
+    with pytest.raises(FuseOSError) as e:
+        dh_fuse("open", "/missing.bin", file_info())
+    assert e.value.errno == errno.ENOENT
+
+
+def test_write_open_goes_to_local_file(dh_fuse):
+    fi = file_info(os.O_WRONLY | os.O_CREAT)
+    with open("new.txt", "w"):
+        pass
+    dh_fuse("open", "/new.txt", fi)
+    os.write(fi.fh, b"written")
+    dh_fuse("release", "/new.txt", fi)
+    with open("new.txt", "rb") as f:
+        assert f.read() == b"written"
+
+
+def test_bucket_storage_file_not_read_in_blocks(dh_fuse, mock_api):
+    route = mock_api.add_range_file("a.txt", b"content from dagshub", is_storage=True)
+    path = f"/.dagshub/storage/s3/{mock_api.storage_bucket_path}/a.txt"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(download._bucket_downloader_map, "s3", lambda bucket, p: b"content from the bucket")
+        fi = file_info()
+        dh_fuse("open", path, fi)
+    assert fi.fh < (1 << 40)
+    # Storage files can change, the kernel shouldn't keep them
+    assert fi.keep_cache == 0
+    assert dh_fuse("read", path, 100, 0, fi) == b"content from the bucket"
+    assert not route.called
+    dh_fuse("release", path, fi)
+
+
+def test_getattr_size_from_listing(dh_fuse, mock_api):
+    sized_route = add_sized_dir(mock_api, "data", {"a.txt": 10, "b.txt": 2000})
+    file_route = mock_api.add_file("data/b.txt", "aaa")
+    assert set(dh_fuse("readdir", "/data", 0)) >= {".", "..", "a.txt", "b.txt"}
+    attrs = dh_fuse("getattr", "/data/b.txt")
+    assert attrs["st_size"] == 2000
+    assert attrs["st_mtime"] == 0
+    assert dh_fuse("getattr", "/data/a.txt")["st_size"] == 10
+    assert sized_route.call_count == 1
+    assert not file_route.called
+
+
+def test_getattr_commit_mtime(mount_module, mock_api, dagshub_repo):
+    add_sized_dir(mock_api, "data", {"a.txt": 10})
+    commit_route = mock_api.add_commit(mock_api.current_revision)
+    dh_fuse = mount_module.DagsHubFUSE(project_root=dagshub_repo.workspace, commit_mtime=True)
+    try:
+        expected = dateutil.parser.parse("2021-08-10T09:03:32Z").timestamp()
+        assert dh_fuse("getattr", "/data/a.txt")["st_mtime"] == expected
+        assert dh_fuse("getattr", "/data/a.txt")["st_ctime"] == expected
+        # Fetched once per revision
+        assert commit_route.call_count == 1
+    finally:
+        dh_fuse.destroy("/")
+        dh_fuse.fs.cleanup()
+        os.close(dh_fuse.project_root_fd)
+
+
+def test_missing_path_getattr(dh_fuse, mock_api):
+    mock_api.add_dir("missing", status=404)
+    with pytest.raises(FuseOSError) as e:
+        dh_fuse("getattr", "/missing/a.txt")
+    assert e.value.errno == errno.ENOENT
+
+
+def test_special_files(dh_fuse):
+    fi = file_info()
+    dh_fuse("open", "/.dagshub-streaming", fi)
+    assert dh_fuse("read", "/.dagshub-streaming", 100, 0, fi) == b"v0\n"
+    dh_fuse("release", "/.dagshub-streaming", fi)
+
+    fi = file_info()
+    dh_fuse("open", "/.dagshub-streaming-stats", fi)
+    assert fi.direct_io == 1
+    stats = json.loads(dh_fuse("read", "/.dagshub-streaming-stats", 1 << 20, 0, fi))
+    assert "block_cache" in stats
+    assert "auth_resolutions" in stats["counters"]
+    dh_fuse("release", "/.dagshub-streaming-stats", fi)
+    assert dh_fuse._stats_snapshots == {}
+
+
+def test_mount_passes_options_to_fuse(mount_module, mock_api, dagshub_repo):
+    mount_module.mount(debug=True, project_root=dagshub_repo.workspace, attr_timeout=5, entry_timeout=7)
+    operations, mountpoint, kwargs = FUSE.calls[-1]
+    assert mountpoint == str(dagshub_repo.workspace)
+    assert kwargs["raw_fi"] is True
+    assert kwargs["attr_timeout"] == 5
+    assert kwargs["entry_timeout"] == 7
+    assert kwargs["nothreads"] is False
+    operations.destroy("/")
+    operations.fs.cleanup()
+    os.close(operations.project_root_fd)
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from dagshub.streaming import DagsHubFilesystem, negative_cache
+
+
+def test_missing_dir_not_looked_up_again(mock_api, dagshub_repo):
+    route = mock_api.add_dir("missing", status=404)
+    fs = DagsHubFilesystem()
+    for _ in range(3):
+        assert fs._api_listdir(fs._parse_path("missing")) is None
+        # Everything under a missing directory is missing too
+        assert fs._api_listdir(fs._parse_path("missing/nested")) is None
+    assert route.call_count == 1
+    assert fs.negative_cache_saved_lookups == 5
+
+
+def test_missing_file_not_downloaded_again(mock_api, dagshub_repo):
+    route = mock_api.add_file("missing.txt", status=404)
+    fs = DagsHubFilesystem()
+    for _ in range(3):
+        with pytest.raises(FileNotFoundError):
+            fs.open("missing.txt", "rb")
+    assert route.call_count == 1
+
+
+def test_missing_paths_with_hooks(mock_api, dagshub_repo):
+    route = mock_api.add_dir("missing", status=404)
+    fs = DagsHubFilesystem()
+    fs.install_hooks()
+    try:
+        for _ in range(5):
+            assert not os.path.exists("missing/config.yaml")
+    finally:
+        fs.uninstall_hooks()
+    assert route.call_count == 1
+
+
+def test_negative_cache_expires(mock_api, dagshub_repo, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(negative_cache.time, "monotonic", lambda: now[0])
+    route = mock_api.add_dir("missing", status=404)
+    fs = DagsHubFilesystem(negative_cache_ttl=10)
+    fs._api_listdir(fs._parse_path("missing"))
+    now[0] += 5
+    fs._api_listdir(fs._parse_path("missing"))
+    assert route.call_count == 1
+    now[0] += 6
+    fs._api_listdir(fs._parse_path("missing"))
+    assert route.call_count == 2
+    assert fs.negative_cache_saved_lookups == 1
+
+
+def test_negative_cache_disabled(mock_api, dagshub_repo):
+    route = mock_api.add_dir("missing", status=404)
+    fs = DagsHubFilesystem(negative_cache_ttl=0)
+    fs._api_listdir(fs._parse_path("missing"))
+    fs._api_listdir(fs._parse_path("missing"))
+    assert route.call_count == 2
+    assert fs.negative_cache_saved_lookups == 0
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import stat
+import tempfile
+
+from httpx import Response
+
+from dagshub.streaming import DagsHubFilesystem
+
+
+def _add_hashed_file(mock_api, path, content, content_hash):
+    entry = mock_api.generate_list_entry(path)
+    entry["hash"] = content_hash
+    mock_api.add_dir(os.path.dirname(path)).mock(Response(200, json=[entry]))
+    return mock_api.add_file(path, content)
+
+
+def test_object_shared_between_filesystems(mock_api, dagshub_repo):
+    content = b"shared content"
+    file_route = _add_hashed_file(mock_api, "data/a.txt", content, hashlib.md5(content).hexdigest())
+    store_dir = tempfile.mkdtemp()
+    other_root = tempfile.mkdtemp()
+
+    fs = DagsHubFilesystem(object_store=store_dir)
+    fs.listdir("data")
+    with fs.open("data/a.txt", "rb") as f:
+        assert f.read() == content
+    assert file_route.call_count == 1
+    assert os.stat("data/a.txt").st_nlink == 2
+
+    other_fs = DagsHubFilesystem(project_root=other_root, repo_url="https://dagshub.com/user/repo",
+                                 object_store=store_dir)
+    other_fs.listdir(os.path.join(other_root, "data"))
+    with other_fs.open(os.path.join(other_root, "data/a.txt"), "rb") as f:
+        assert f.read() == content
+    # Second filesystem got the file from the store
+    assert file_route.call_count == 1
+
+
+def test_write_does_not_change_stored_object(mock_api, dagshub_repo):
+    content = b"original"
+    content_hash = hashlib.md5(content).hexdigest()
+    _add_hashed_file(mock_api, "data/a.txt", content, content_hash)
+    store_dir = tempfile.mkdtemp()
+
+    fs = DagsHubFilesystem(object_store=store_dir)
+    fs.listdir("data")
+    fs.open("data/a.txt", "rb").close()
+    with fs.open("data/a.txt", "wb") as f:
+        f.write(b"changed")
+
+    obj_path = fs.object_store.object_path(f"dvc/{content_hash}")
+    with open(obj_path, "rb") as f:
+        assert f.read() == content
+    assert stat.S_IMODE(os.stat(obj_path).st_mode) == 0o444
+
+
+def test_content_not_matching_hash_not_stored(mock_api, dagshub_repo):
+    _add_hashed_file(mock_api, "data/a.txt", b"truncat", hashlib.md5(b"truncated").hexdigest())
+    store_dir = tempfile.mkdtemp()
+
+    fs = DagsHubFilesystem(object_store=store_dir)
+    fs.listdir("data")
+    with fs.open("data/a.txt", "rb") as f:
+        assert f.read() == b"truncat"
+    assert not fs.object_store.has(f"dvc/{hashlib.md5(b'truncated').hexdigest()}")
+
+
+def test_git_blob_hash_verified(mock_api, dagshub_repo):
+    content = b"git content"
+    blob_hash = hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+    entry = mock_api.generate_list_entry("data/a.txt")
+    entry["hash"] = blob_hash
+    entry["versioning"] = "git"
+    mock_api.add_dir("data").mock(Response(200, json=[entry]))
+    mock_api.add_file("data/a.txt", content)
+    store_dir = tempfile.mkdtemp()
+
+    fs = DagsHubFilesystem(object_store=store_dir)
+    fs.listdir("data")
+    fs.open("data/a.txt", "rb").close()
+    assert fs.object_store.has(f"git/{blob_hash}")
+
+
+def test_unhashed_files_skip_store(mock_api, dagshub_repo):
+    mock_api.add_dir("data", [("a.txt", "file")])
+    mock_api.add_file("data/a.txt", b"content")
+    store_dir = tempfile.mkdtemp()
+
+    fs = DagsHubFilesystem(object_store=store_dir)
+    fs.listdir("data")
+    with fs.open("data/a.txt", "rb") as f:
+        assert f.read() == b"content"
+    assert os.listdir(store_dir) == []
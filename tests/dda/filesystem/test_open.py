@@ -1,6 +1,10 @@
 import os.path
+import secrets
+
+import httpx
 import pytest
 from dagshub.streaming import DagsHubFilesystem
+from dagshub.streaming.filesystem import DOWNLOAD_CHUNK_SIZE
 
 
 def test_sets_current_revision(mock_api):
@@ -64,3 +68,30 @@ def test_nested_open_throws_nonexistent_dir(mock_api, repo_with_hooks):
     with pytest.raises(FileNotFoundError):
         with open(path, "w") as f:
             f.write(content)
+
+
+def test_open_streams_large_file(mock_api, repo_with_hooks):
+    path = "big.bin"
+    content = secrets.token_bytes(DOWNLOAD_CHUNK_SIZE * 3 + 17)
+    mock_api.add_file(path, content)
+    with open(path, "rb") as f:
+        assert f.read() == content
+    assert not any(p.endswith(".dagshub-download") for p in os.listdir("."))
+
+
+class InterruptedStream(httpx.SyncByteStream):
+    def __iter__(self):
+        yield b"partial content"
+        raise httpx.ReadError("Connection dropped")
+
+
+def test_interrupted_download_leaves_no_file(mock_api, repo_with_hooks):
+    path = "nested/interrupted.bin"
+    mock_api.add_dir("nested")
+    mock_api.route(url=f"{mock_api.api_raw_path()}/{path}").mock(
+        httpx.Response(200, stream=InterruptedStream())
+    )
+    with pytest.raises(httpx.ReadError):
+        open(path, "rb")
+    assert os.path.isdir(os.path.dirname(path))
+    assert os.listdir(os.path.dirname(path)) == []
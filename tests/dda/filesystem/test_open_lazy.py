@@ -0,0 +1,128 @@
+import io
+import os
+import secrets
+
+import pytest
+from httpx import Response
+
+from dagshub.streaming import DagsHubFilesystem
+
+
+@pytest.fixture
+def fs(mock_api, dagshub_repo):
+    fs = DagsHubFilesystem()
+    yield fs
+    fs.cleanup()
+
+
+def test_reads_footer_without_downloading(mock_api, fs):
+    path = "data.parquet"
+    content = secrets.token_bytes(10 * 1024 * 1024 + 5)
+    route = mock_api.add_range_file(path, content)
+
+    with fs.open_lazy(path, block_size=64 * 1024) as f:
+        f.seek(-8, io.SEEK_END)
+        assert f.read() == content[-8:]
+        f.seek(1000)
+        assert f.read(100) == content[1000:1100]
+
+    assert not os.path.exists(path)
+    # First block + last block, the second read is served from the cache
+    assert route.call_count == 2
+    for call in route.calls:
+        assert call.request.headers["Range"].startswith("bytes=")
+
+
+def test_sequential_reads_whole_file(mock_api, fs):
+    path = "data.bin"
+    content = secrets.token_bytes(1024 * 1024 + 13)
+    route = mock_api.add_range_file(path, content)
+
+    with fs.open_lazy(path, block_size=4096) as f:
+        chunks = []
+        while True:
+            chunk = f.read(1000)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    assert b"".join(chunks) == content
+    # Read-ahead makes it so there are less requests than blocks
+    assert route.call_count < len(content) // 4096
+
+
+def test_text_mode(mock_api, fs):
+    path = "file.txt"
+    mock_api.add_range_file(path, b"line1\nline2\n")
+    with fs.open_lazy(path, "r") as f:
+        assert f.readlines() == ["line1\n", "line2\n"]
+
+
+def test_empty_file(mock_api, fs):
+    path = "empty.txt"
+    mock_api.add_range_file(path, b"")
+    with fs.open_lazy(path) as f:
+        assert f.read() == b""
+
+
+def test_falls_back_to_download_without_range_support(mock_api, fs):
+    path = "no_ranges.bin"
+    content = b"Hello, streaming world!"
+    route = mock_api.add_file(path, content)
+    with fs.open_lazy(path) as f:
+        f.seek(7)
+        assert f.read() == content[7:]
+    assert route.call_count == 1
+    with open(path, "rb") as f:
+        assert f.read() == content
+    assert fs.stats()["counters"]["bytes_downloaded"] == len(content)
+
+
+def test_missing_file(mock_api, fs):
+    mock_api.add_file("missing.bin", status=404)
+    with pytest.raises(FileNotFoundError):
+        fs.open_lazy("missing.bin")
+
+
+def test_write_modes_not_supported(fs):
+    with pytest.raises(ValueError):
+        fs.open_lazy("a.txt", "wb")
+
+
+def test_lazy_open_mode_in_hooks(mock_api, dagshub_repo):
+    path = "lazy.bin"
+    content = secrets.token_bytes(100000)
+    mock_api.add_range_file(path, content)
+    fs = DagsHubFilesystem(lazy_open=True)
+    fs.install_hooks()
+    try:
+        with open(path, "rb") as f:
+            f.seek(50000)
+            assert f.read(10) == content[50000:50010]
+    finally:
+        fs.uninstall_hooks()
+    assert not os.path.exists(path)
+
+
+def test_read_bigger_than_cache(mock_api, fs):
+    path = "data.bin"
+    content = secrets.token_bytes(100 * 1024)
+    mock_api.add_range_file(path, content)
+    with fs.open_lazy(path, block_size=1024) as f:
+        assert f.read(len(content)) == content
+
+
+def test_partial_response_without_content_range(mock_api, fs):
+    path = "data.bin"
+    content = secrets.token_bytes(10000)
+    route = mock_api.route(url=f"{mock_api.api_raw_path()}/{path}")
+
+    def respond(request):
+        if "Range" in request.headers:
+            return Response(206, content=content[:4096])
+        return Response(200, content=content)
+
+    route.mock(side_effect=respond)
+
+    with fs.open_lazy(path, block_size=4096) as f:
+        assert f.raw.is_local
+        assert f.read() == content
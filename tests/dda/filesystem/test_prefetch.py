@@ -0,0 +1,180 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from httpx import Response
+
+from dagshub.streaming import DagsHubFilesystem
+
+
+def test_prefetch_tree_serves_walk_from_memory(mock_api, dagshub_repo):
+    routes = [
+        mock_api.add_dir("data", [("a", "dir"), ("b", "dir"), ("top.txt", "file")]),
+        mock_api.add_dir("data/a", [("nested", "dir"), ("1.txt", "file")]),
+        mock_api.add_dir("data/a/nested", [("2.txt", "file")]),
+        mock_api.add_dir("data/b", [("3.txt", "file")]),
+    ]
+    fs = DagsHubFilesystem()
+    listed = fs.prefetch_tree("data", workers=4)
+    assert listed == 4
+    assert all(r.call_count == 1 for r in routes)
+    assert fs.remote_tree["data/a"] == {"nested": "dir", "1.txt": "file"}
+
+    fs.install_hooks()
+    try:
+        walked = {root: set(files) for root, dirs, files in os.walk("data")}
+    finally:
+        fs.uninstall_hooks()
+
+    assert walked == {
+        "data": {"top.txt"},
+        os.path.join("data", "a"): {"1.txt"},
+        os.path.join("data", "a", "nested"): {"2.txt"},
+        os.path.join("data", "b"): {"3.txt"},
+    }
+    assert all(r.call_count == 1 for r in routes)
+
+
+def test_prefetch_tree_max_depth(mock_api, dagshub_repo):
+    top = mock_api.add_dir("data", [("a", "dir")])
+    nested = mock_api.add_dir("data/a", [("nested", "dir")])
+    deepest = mock_api.add_dir("data/a/nested", [("2.txt", "file")])
+
+    fs = DagsHubFilesystem()
+    assert fs.prefetch_tree("data", max_depth=1) == 2
+    assert top.called
+    assert nested.called
+    assert not deepest.called
+
+
+def test_prefetch_tree_includes_storages(mock_api, dagshub_repo):
+    bucket_route = mock_api.route(url=f"{mock_api.api_storage_list_path}?paging=true")
+    bucket_route.mock(Response(200, json={"entries": [mock_api.generate_list_entry("a.txt")], "limit": 1}))
+    fs = DagsHubFilesystem()
+    fs.prefetch_tree(".dagshub")
+    assert bucket_route.called
+
+
+def test_prefetch_files(mock_api, dagshub_repo):
+    contents = {f"data/{i}.txt": f"content {i}".encode() for i in range(10)}
+    routes = [mock_api.add_file(path, content) for path, content in contents.items()]
+    mock_api.add_file("data/missing.txt", status=404)
+    progress = []
+
+    fs = DagsHubFilesystem()
+    paths = list(contents.keys()) + ["data/missing.txt"]
+    results = fs.prefetch(paths, workers=4, on_progress=progress.append)
+
+    assert [r.path for r in results] == paths
+    assert len(progress) == len(paths)
+    assert all(r.ok and r.downloaded for r in results[:-1])
+    assert isinstance(results[-1].error, FileNotFoundError)
+    for path, content in contents.items():
+        with open(path, "rb") as f:
+            assert f.read() == content
+    assert all(r.call_count == 1 for r in routes)
+
+    # Second prefetch doesn't download anything
+    results = fs.prefetch(contents.keys())
+    assert not any(r.downloaded for r in results)
+    assert all(r.call_count == 1 for r in routes)
+
+
+def test_open_waits_for_inflight_prefetch(mock_api, dagshub_repo):
+    path = "slow.txt"
+    content = b"slow content"
+    download_started = threading.Event()
+    finish_download = threading.Event()
+
+    def slow_response(request):
+        download_started.set()
+        finish_download.wait(5)
+        return Response(200, content=content)
+
+    route = mock_api.route(url=f"{mock_api.api_raw_path()}/{path}")
+    route.mock(side_effect=slow_response)
+
+    fs = DagsHubFilesystem()
+    download_file = fs._download_file
+    download_calls = []
+    opener_downloading = threading.Event()
+
+    def tracked_download_file(p):
+        download_calls.append(p)
+        if len(download_calls) == 2:
+            opener_downloading.set()
+        return download_file(p)
+
+    fs._download_file = tracked_download_file
+
+    with ThreadPoolExecutor(max_workers=1) as tp:
+        prefetch_future = tp.submit(fs.prefetch, [path])
+        assert download_started.wait(5)
+        # Open on another thread, it should wait for the prefetch instead of starting a new download
+        with ThreadPoolExecutor(max_workers=1) as opener:
+            open_future = opener.submit(lambda: fs.open(path, "rb").read())
+            # Only let the prefetch finish once the open is also downloading the file
+            assert opener_downloading.wait(5)
+            finish_download.set()
+            assert open_future.result(5) == content
+        assert prefetch_future.result(5)[0].downloaded
+    assert route.call_count == 1
+    assert fs._download_flight.shared_calls == 1
+
+
+def test_concurrent_listings_are_made_once(mock_api, dagshub_repo):
+    path = "slow_dir"
+    listing_started = threading.Event()
+    finish_listing = threading.Event()
+
+    def slow_response(request):
+        listing_started.set()
+        finish_listing.wait(5)
+        return Response(200, json=[mock_api.generate_list_entry(f"{path}/a.txt")])
+
+    route = mock_api.route(url=f"{mock_api.api_list_path()}/{path}")
+    route.mock(side_effect=slow_response)
+
+    fs = DagsHubFilesystem()
+    with ThreadPoolExecutor(max_workers=8) as tp:
+        futures = [tp.submit(fs.listdir, path) for _ in range(8)]
+        assert listing_started.wait(5)
+        finish_listing.set()
+        results = [f.result(5) for f in futures]
+    assert all(r == ["a.txt"] for r in results)
+    assert route.call_count == 1
+
+
+def test_concurrent_opens_download_once(mock_api, dagshub_repo):
+    path = "slow.txt"
+    content = b"slow content"
+    download_started = threading.Event()
+    finish_download = threading.Event()
+
+    def slow_response(request):
+        download_started.set()
+        finish_download.wait(5)
+        return Response(200, content=content)
+
+    route = mock_api.route(url=f"{mock_api.api_raw_path()}/{path}")
+    route.mock(side_effect=slow_response)
+
+    fs = DagsHubFilesystem()
+
+    def read():
+        with fs.open(path, "rb") as f:
+            return f.read()
+
+    with ThreadPoolExecutor(max_workers=8) as tp:
+        futures = [tp.submit(read) for _ in range(8)]
+        assert download_started.wait(5)
+        finish_download.set()
+        assert all(f.result(5) == content for f in futures)
+    assert route.call_count == 1
+
+
+def test_prefetch_outside_repo_error_has_path(mock_api, dagshub_repo):
+    fs = DagsHubFilesystem()
+    [result] = fs.prefetch(["/tmp/outside.txt"])
+    assert isinstance(result.error, ValueError)
+    assert "/tmp/outside.txt" in str(result.error)
@@ -0,0 +1,113 @@
+import time
+
+from dagshub.streaming import DagsHubFilesystem
+
+
+def wait_for_readahead(fs, timeout=5):
+    start = time.time()
+    while fs.readahead.stats()["queued"] > 0:
+        if time.time() - start > timeout:
+            raise TimeoutError("Read-ahead didn't finish")
+        time.sleep(0.01)
+
+
+def setup_dir(mock_api, num_files=10):
+    names = [f"{i:03}.txt" for i in range(num_files)]
+    mock_api.add_dir("data", [(name, "file") for name in names])
+    routes = {name: mock_api.add_file(f"data/{name}", f"content {name}") for name in names}
+    return names, routes
+
+
+def test_sequential_access_reads_ahead(mock_api, dagshub_repo):
+    names, routes = setup_dir(mock_api)
+    fs = DagsHubFilesystem(readahead=3)
+    fs.listdir("data")
+
+    for name in names[:2]:
+        with fs.open(f"data/{name}") as f:
+            assert f.read() == f"content {name}"
+    wait_for_readahead(fs)
+    assert fs.readahead.stats()["prefetched"] == 3
+    assert all(routes[name].called for name in names[2:5])
+    assert not routes[names[5]].called
+
+    for name in names[2:5]:
+        with fs.open(f"data/{name}") as f:
+            assert f.read() == f"content {name}"
+    wait_for_readahead(fs)
+    stats = fs.readahead.stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 3
+    assert all(route.call_count <= 1 for route in routes.values())
+    fs.cleanup()
+
+
+def test_random_access_doesnt_read_ahead(mock_api, dagshub_repo):
+    names, routes = setup_dir(mock_api)
+    fs = DagsHubFilesystem(readahead=3)
+    fs.listdir("data")
+
+    for name in [names[7], names[1], names[5]]:
+        fs.open(f"data/{name}").close()
+    wait_for_readahead(fs)
+    assert fs.readahead.stats()["prefetched"] == 0
+    assert sum(route.call_count for route in routes.values()) == 3
+    fs.cleanup()
+
+
+def test_no_readahead_without_cached_listing(mock_api, dagshub_repo):
+    names, routes = setup_dir(mock_api)
+    fs = DagsHubFilesystem(readahead=3)
+
+    for name in names[:3]:
+        fs.open(f"data/{name}").close()
+    wait_for_readahead(fs)
+    assert fs.readahead.stats()["prefetched"] == 0
+    assert fs.readahead.stats()["misses"] == 3
+    fs.cleanup()
+
+
+def test_reads_ahead_after_uninstall_hooks(mock_api, dagshub_repo):
+    names, routes = setup_dir(mock_api)
+    fs = DagsHubFilesystem(readahead=2)
+    fs.install_hooks()
+    fs.uninstall_hooks()
+    fs.listdir("data")
+
+    for name in names[:3]:
+        with fs.open(f"data/{name}") as f:
+            assert f.read() == f"content {name}"
+    wait_for_readahead(fs)
+    assert fs.readahead.stats()["prefetched"] > 0
+
+
+def test_shutdown_while_scheduling_read_ahead(mock_api, dagshub_repo):
+    names, routes = setup_dir(mock_api)
+    fs = DagsHubFilesystem(readahead=2)
+    fs.listdir("data")
+    policy = fs.readahead
+    lock = policy._lock
+    shutdown_on_release = []
+
+    class ShutdownOnReleaseLock:
+        """
+        Shuts the read-ahead down right after on_open() releases the lock, as a concurrent cleanup() could
+        """
+
+        def __enter__(self):
+            lock.acquire()
+
+        def __exit__(self, *args):
+            lock.release()
+            if shutdown_on_release:
+                shutdown_on_release.clear()
+                policy.shutdown()
+
+    policy._lock = ShutdownOnReleaseLock()
+    fs.open(f"data/{names[0]}").close()
+    shutdown_on_release.append(True)
+    with fs.open(f"data/{names[1]}") as f:
+        assert f.read() == f"content {names[1]}"
+    wait_for_readahead(fs)
+    assert policy.stats()["queued"] == 0
+    fs.cleanup()
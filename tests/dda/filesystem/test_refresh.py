@@ -0,0 +1,84 @@
+import os
+import time
+
+from httpx import Response
+
+from dagshub.streaming import DagsHubFilesystem
+
+NEW_REVISION = "1" * 40
+
+
+def move_branch(mock_api, revision):
+    route = mock_api["branch"]
+    body = route.return_value.json()
+    body["commit"]["id"] = revision
+    route.return_value = Response(200, json=body)
+
+
+def test_refresh_noop_when_branch_didnt_move(mock_api):
+    fs = DagsHubFilesystem()
+    revision = fs._current_revision
+    assert fs.refresh() == []
+    assert fs._current_revision == revision
+    fs.cleanup()
+
+
+def test_refresh_invalidates_only_changed_files(mock_api):
+    mock_api.add_file("a.txt", content="old a")
+    mock_api.add_file("b.txt", content="old b")
+    fs = DagsHubFilesystem()
+    for name in ("a.txt", "b.txt"):
+        with fs.open(name) as f:
+            f.read()
+
+    # a.txt changed, c.txt got deleted, everything else stayed the same
+    new_root = mock_api.add_dir(
+        "",
+        [("a.txt", "file", "new_hash"), ("b.txt", "file", "some_hash"), ("a.txt.dvc", "file", "some_hash")],
+        revision=NEW_REVISION,
+    )
+    move_branch(mock_api, NEW_REVISION)
+    mock_api.add_file("a.txt", content="new a", revision=NEW_REVISION)
+
+    assert sorted(fs.refresh()) == ["a.txt", "c.txt"]
+    assert fs._current_revision == NEW_REVISION
+    assert not os.path.exists("a.txt")
+    assert os.path.exists("b.txt")
+
+    listing = fs.listdir(".")
+    assert {"a.txt", "b.txt", "a.txt.dvc"} <= set(listing)
+    assert "c.txt" not in listing
+    assert new_root.call_count == 1
+    with fs.open("a.txt") as f:
+        assert f.read() == "new a"
+    fs.cleanup()
+
+
+def test_refresh_keeps_locally_modified_files(mock_api):
+    mock_api.add_file("a.txt", content="old a")
+    fs = DagsHubFilesystem()
+    with fs.open("a.txt") as f:
+        f.read()
+    with open("a.txt", "a") as f:
+        f.write(" and local changes")
+
+    mock_api.add_dir("", [("a.txt", "file", "new_hash")], revision=NEW_REVISION)
+    move_branch(mock_api, NEW_REVISION)
+
+    assert fs.refresh() == ["a.txt", "a.txt.dvc", "b.txt", "c.txt"]
+    with open("a.txt") as f:
+        assert f.read() == "old a and local changes"
+    assert not fs.local_cache.is_tracked(fs.project_root / "a.txt")
+    fs.cleanup()
+
+
+def test_refresh_poller(mock_api):
+    mock_api.add_dir("", [("a.txt", "file", "some_hash")], revision=NEW_REVISION)
+    fs = DagsHubFilesystem(refresh_interval=0.05)
+    move_branch(mock_api, NEW_REVISION)
+    deadline = time.monotonic() + 5
+    while fs._current_revision != NEW_REVISION and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert fs._current_revision == NEW_REVISION
+    fs.cleanup()
+    assert fs._refresh_poller is None
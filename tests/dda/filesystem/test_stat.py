@@ -0,0 +1,66 @@
+import os
+
+from httpx import Response
+
+from dagshub.streaming import DagsHubFilesystem
+
+
+def _add_sized_dir(mock_api, path, files):
+    entries = []
+    for name, size in files.items():
+        entry = mock_api.generate_list_entry(os.path.join(path, name))
+        entry["size"] = size
+        entries.append(entry)
+    route = mock_api.route(url=f"{mock_api.api_list_path()}/{path}?include_size=true")
+    route.mock(Response(200, json=entries))
+    return route
+
+
+def test_stat_size_from_listing(mock_api, repo_with_hooks):
+    sizes = {"a.txt": 10, "b.txt": 2000, "empty.txt": 0}
+    sized_route = _add_sized_dir(mock_api, "data", sizes)
+    mock_api.add_dir("data", [(name, "file") for name in sizes])
+    file_routes = [mock_api.add_file(f"data/{name}", "aaa") for name in sizes]
+
+    for name, size in sizes.items():
+        assert os.path.getsize(f"data/{name}") == size
+    assert sized_route.call_count == 1
+    assert not any(r.called for r in file_routes)
+
+
+def test_stat_size_without_hooks(mock_api, dagshub_repo):
+    _add_sized_dir(mock_api, "data", {"a.txt": 42})
+    mock_api.add_dir("data", [("a.txt", "file")])
+    fs = DagsHubFilesystem()
+    assert fs.stat("data/a.txt").st_size == 42
+
+
+def test_stat_indexes_listing_once(mock_api, dagshub_repo):
+    sizes = {f"{i}.txt": i for i in range(100)}
+    _add_sized_dir(mock_api, "data", sizes)
+    mock_api.add_dir("data", [(name, "file") for name in sizes])
+    fs = DagsHubFilesystem()
+    assert fs.stat("data/0.txt").st_size == 0
+    index = fs._listing_indexes["data"]
+    for name, size in sizes.items():
+        assert fs.stat(f"data/{name}").st_size == size
+    assert fs._listing_indexes["data"] is index
+
+
+def test_stat_size_missing_from_listing(mock_api, dagshub_repo):
+    _add_sized_dir(mock_api, "data", {"a.txt": None})
+    mock_api.add_dir("data", [("a.txt", "file")])
+    file_route = mock_api.add_file("data/a.txt", "aaa")
+    fs = DagsHubFilesystem()
+    assert fs.stat("data/a.txt").st_size == 3
+    assert file_route.call_count == 1
+
+
+def test_stat_size_when_sized_listing_fails(mock_api, dagshub_repo):
+    route = mock_api.route(url=f"{mock_api.api_list_path()}/data?include_size=true")
+    route.mock(Response(500))
+    mock_api.add_dir("data", [("a.txt", "file")])
+    file_route = mock_api.add_file("data/a.txt", "aaa")
+    fs = DagsHubFilesystem()
+    assert fs.stat("data/a.txt").st_size == 3
+    assert file_route.call_count == 1
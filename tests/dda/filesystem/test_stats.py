@@ -0,0 +1,65 @@
+import json
+import os
+
+from dagshub.streaming import DagsHubFilesystem
+from dagshub.streaming.stats import LatencyHistogram, StreamingStats
+
+
+def test_histogram_percentiles():
+    hist = LatencyHistogram()
+    for _ in range(98):
+        hist.record(0.01)
+    hist.record(1.0)
+    hist.record(2.0)
+    # Buckets are ~19% wide
+    assert 0.01 <= hist.percentile(50) < 0.012
+    assert 1.0 <= hist.percentile(99) < 1.2
+    assert hist.percentile(100) == 2.0
+    assert hist.summary()["count"] == 100
+
+
+def test_track_counts_in_flight_and_errors():
+    stats = StreamingStats()
+    with stats.track("listing"):
+        assert stats.counter("listing_in_flight") == 1
+    try:
+        with stats.track("listing"):
+            raise RuntimeError()
+    except RuntimeError:
+        pass
+    snapshot = stats.snapshot()
+    assert snapshot["counters"]["listing_in_flight"] == 0
+    assert snapshot["counters"]["listing_errors"] == 1
+    assert snapshot["latency"]["listing"]["count"] == 2
+
+
+def test_stats_count_downloads_and_listings(mock_api, dagshub_repo):
+    mock_api.add_dir("data", [("a.txt", "file")])
+    mock_api.add_file("data/a.txt", content="12345")
+    fs = DagsHubFilesystem()
+    fs.listdir("data")
+    fs.listdir("data")
+    with fs.open("data/a.txt", "rb") as f:
+        f.read()
+    with fs.open("data/a.txt", "rb") as f:
+        f.read()
+
+    stats = fs.stats()
+    counters = stats["counters"]
+    assert counters["listing_cache_hits"] >= 1
+    assert counters["file_cache_misses"] == 1
+    assert counters["file_cache_hits"] == 1
+    assert counters["bytes_downloaded"] == 5
+    assert counters["download_in_flight"] == 0
+    assert stats["latency"]["download"]["count"] == 1
+    assert stats["local_cache"]["files"] == 1
+
+
+def test_stats_file(mock_api, repo_with_hooks):
+    assert ".dagshub-streaming-stats" in os.listdir(".")
+    with open(".dagshub-streaming", "rb") as f:
+        assert f.read() == b"v0\n"
+    with open(".dagshub-streaming-stats") as f:
+        stats = json.load(f)
+    assert "auth_resolutions" in stats["counters"]
+    assert "listing" in stats["latency"]
@@ -223,10 +223,38 @@ class MockApi(MockRouter):
         route.mock(Response(status, content=content))
         return route
 
+    def add_range_file(self, path, content=b"aaa", is_storage=False, revision=None) -> Route:
+        """
+        Add a file to the api that also supports HTTP Range requests on the raw endpoint
+        """
+        if is_storage:
+            route = self.route(url=f"{self.api_storage_raw_path}/{path}")
+        else:
+            route = self.route(url=f"{self.api_raw_path(revision)}/{path}")
+
+        def respond(request):
+            range_header = request.headers.get("Range")
+            if range_header is None:
+                return Response(200, content=content)
+            start, end = range_header[len("bytes="):].split("-")
+            start = int(start)
+            end = min(int(end), len(content) - 1) if end else len(content) - 1
+            if start >= len(content):
+                return Response(416, headers={"Content-Range": f"bytes */{len(content)}"})
+            return Response(
+                206,
+                content=content[start:end + 1],
+                headers={"Content-Range": f"bytes {start}-{end}/{len(content)}"},
+            )
+
+        route.mock(side_effect=respond)
+        return route
+
     def add_dir(self, path, contents=[], status=200, is_storage=False, revision=None) -> Route:
         """
         Add a directory to the api (only accessible via the content endpoint)
         We don't keep a tree of added dirs, so it's not dynamic
+        Contents are tuples of (name, type) or (name, type, hash)
         """
 
         # TODO: add branch
@@ -235,7 +263,7 @@ class MockApi(MockRouter):
         else:
             route = self.route(url=f"{self.api_list_path(revision)}/{path}")
         content = [
-            self.generate_list_entry(os.path.join(path, c[0]), c[1]) for c in contents
+            self.generate_list_entry(os.path.join(path, c[0]), *c[1:]) for c in contents
         ]
         route.mock(Response(status, json=content))
         return route
@@ -267,12 +295,12 @@ class MockApi(MockRouter):
         route.mock(Response(200))
         return route
 
-    def generate_list_entry(self, path, entry_type="file"):
+    def generate_list_entry(self, path, entry_type="file", entry_hash="8586da76f372efa83d832a9d0e664817.dir"):
         return {
             "path": path,
             "type": entry_type,
             "size": 0,
-            "hash": "8586da76f372efa83d832a9d0e664817.dir",
+            "hash": entry_hash,
             "versioning": "dvc",
             "download_url": f"https://dagshub.com/{self.repourlpath}/raw/{self.current_revision}/{path}",
             "content_url": f"https://dagshub.com/{self.repourlpath}/content/{self.current_revision}/{path}",
@@ -1,6 +1,11 @@
+import threading
+
+import dacite
 import pytest
 
+from dagshub.common.api.responses import ContentAPIEntry, StorageAPIEntry
 from dagshub.common.download import download_url_to_bucket_path
+from dagshub.common.util import prefetching_pages
 
 
 @pytest.mark.parametrize("in_url, expected", [
@@ -19,3 +24,43 @@ def test_bucket_downloader_path_extraction(in_url, expected):
 def test_bucket_download_path_extraction_fail(in_url):
     actual = download_url_to_bucket_path(in_url)
     assert actual is None
+
+
+def test_content_entry_decoder_matches_dacite():
+    raw = {
+        "path": "dir/file.txt",
+        "type": "file",
+        "size": 10,
+        "hash": "8586da76f372efa83d832a9d0e664817",
+        "versioning": "dvc",
+        "download_url": "https://dagshub.com/user/repo/raw/main/dir/file.txt",
+    }
+    assert ContentAPIEntry.from_dict(raw) == dacite.from_dict(ContentAPIEntry, raw)
+    with pytest.raises(ValueError):
+        ContentAPIEntry.from_dict({"path": "dir/file.txt"})
+
+
+def test_storage_entry_decoder_matches_dacite():
+    raw = {"name": "bucket/prefix", "protocol": "s3", "list_path": "s3/bucket/prefix"}
+    entry = StorageAPIEntry.from_dict(raw)
+    assert entry == dacite.from_dict(StorageAPIEntry, raw)
+    assert str(entry.path_in_mount) == ".dagshub/storage/s3/bucket/prefix"
+    with pytest.raises(ValueError):
+        StorageAPIEntry.from_dict({"name": "bucket"})
+
+
+def test_prefetching_pages():
+    pages = {None: ("a", "t1"), "t1": ("b", "t2"), "t2": ("c", None)}
+    requested = {token: threading.Event() for token in pages}
+
+    def fetch_page(token):
+        requested[token].set()
+        return pages[token]
+
+    result = []
+    for page in prefetching_pages(fetch_page, lambda p: p[1]):
+        # The next page is requested while the current one is still being processed
+        if page[1] is not None:
+            assert requested[page[1]].wait(timeout=5)
+        result.append(page[0])
+    assert result == ["a", "b", "c"]